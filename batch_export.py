@@ -0,0 +1,241 @@
+"""
+Export many mindmaps with several formatters in one run.
+
+Reading the maps and writing the outputs run in threads, so they overlap the
+parsing and formatting, which run in a process pool. A bounded queue between
+the readers and the pool keeps only a few maps in memory at a time.
+
+Each map is parsed once per batch: all its formatters share the parsed tree
+and the node property cache in the worker process, and every worker keeps the
+last parsed trees by content, so identical maps are not parsed again.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import io
+import math
+import os
+import sys
+import time
+import multiprocessing
+import xml.etree.ElementTree as xml
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Sequence, TextIO, Tuple
+
+from mindmap.cache import NodePropertyCache
+from mindmap.reader import MapReader
+
+
+class ParsedTreeCache:
+    """Least recently used parsed trees, keyed by the digest of their source."""
+
+    def __init__(self, max_size: int = 8) -> None:
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._trees: OrderedDict[str, xml.Element] = OrderedDict()
+
+    def get(self, source: bytes) -> xml.Element:
+        """Return the root node of the map, parsing it only if not cached."""
+        key = hashlib.sha256(source).hexdigest()
+        tree = self._trees.get(key)
+        if tree is not None:
+            self.hits += 1
+            self._trees.move_to_end(key)
+            return tree
+
+        self.misses += 1
+        tree = MapReader.from_bytes(source)
+        self._trees[key] = tree
+        if len(self._trees) > self.max_size:
+            self._trees.popitem(last=False)
+        return tree
+
+
+# Parsed trees of the current worker process
+_worker_trees = ParsedTreeCache()
+
+
+def export_source(source: bytes, formatter_names: Sequence[str]) -> Dict[str, str]:
+    """Parse a map and export it with every formatter. Runs in a pool worker.
+
+    :return: the output of each formatter
+    """
+    root = _worker_trees.get(source)
+    outputs: Dict[str, str] = {}
+    with NodePropertyCache.activate():
+        for name in formatter_names:
+            buffer = io.StringIO()
+            module = __import__(name)
+            module.Formatter(output=buffer).export(root)
+            outputs[name] = buffer.getvalue()
+    return outputs
+
+
+@dataclass
+class FileResult:
+    """Outcome of exporting one map: its latency, outputs or error."""
+
+    path: str
+    latency: float = 0.0
+    output_paths: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+
+
+@dataclass
+class BatchReport:
+    results: List[FileResult]
+    elapsed: float
+
+    @property
+    def failures(self) -> List[FileResult]:
+        return [result for result in self.results if result.error is not None]
+
+    def latency_percentile(self, percent: float) -> float:
+        """Nearest-rank percentile of the per-file latencies, in seconds."""
+        latencies = sorted(result.latency for result in self.results)
+        if not latencies:
+            return 0.0
+        rank = max(1, math.ceil(percent / 100 * len(latencies)))
+        return latencies[rank - 1]
+
+    def format_lines(self) -> List[str]:
+        lines = [f"{result.path}: {result.error}" for result in self.failures]
+        lines.append(
+            f"Exported {len(self.results)} maps ({len(self.failures)} failed) "
+            f"in {self.elapsed:.2f}s"
+        )
+        percentiles = ", ".join(
+            f"{label} {self.latency_percentile(percent) * 1000:.1f}ms"
+            for label, percent in (("p50", 50), ("p90", 90), ("p99", 99), ("max", 100))
+        )
+        lines.append(f"Per-file latency: {percentiles}")
+        return lines
+
+
+class BatchExporter:
+    """
+    Exports maps into `output_dir` as `<map name>.<formatter>.txt`.
+
+    :param workers: processes parsing and formatting the maps
+    :param queue_size: maps read ahead of the workers; bounds the memory used
+    """
+
+    def __init__(
+        self,
+        formatter_names: Sequence[str],
+        output_dir: str,
+        workers: Optional[int] = None,
+        queue_size: Optional[int] = None,
+    ) -> None:
+        self.formatter_names = list(formatter_names)
+        self.output_dir = output_dir
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = queue_size or 2 * self.workers
+
+    def run(self, paths: Sequence[str]) -> BatchReport:
+        return asyncio.run(self.export(paths))
+
+    async def export(self, paths: Sequence[str]) -> BatchReport:
+        started = time.perf_counter()
+        os.makedirs(self.output_dir, exist_ok=True)
+        results = [FileResult(path) for path in paths]
+        output_names: Dict[str, str] = {}
+        for result in results:
+            name = _output_name(result.path)
+            if name in output_names:
+                result.error = f"output names clash with {output_names[name]}"
+            else:
+                output_names[name] = result.path
+        pending = (result for result in results if result.error is None)
+        queue: asyncio.Queue[Optional[Tuple[FileResult, float, bytes]]] = asyncio.Queue(
+            maxsize=self.queue_size
+        )
+
+        # Forking once the reader threads run could deadlock the workers
+        start_method = (
+            "forkserver"
+            if "forkserver" in multiprocessing.get_all_start_methods()
+            else "spawn"
+        )
+        with ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context(start_method),
+        ) as pool:
+            readers = [
+                asyncio.ensure_future(self._read_maps(pending, queue))
+                for _ in range(self.workers)
+            ]
+            exporters = [
+                asyncio.ensure_future(self._export_maps(queue, pool))
+                for _ in range(self.workers)
+            ]
+            await asyncio.gather(*readers)
+            for _ in exporters:
+                await queue.put(None)
+            await asyncio.gather(*exporters)
+
+        return BatchReport(results, time.perf_counter() - started)
+
+    async def _read_maps(
+        self,
+        pending: Iterator[FileResult],
+        queue: asyncio.Queue[Optional[Tuple[FileResult, float, bytes]]],
+    ) -> None:
+        # The readers share the iterator, so each map is read once
+        for result in pending:
+            started = time.perf_counter()
+            try:
+                source = await asyncio.to_thread(_read_bytes, result.path)
+            except OSError as error:
+                result.error = str(error)
+                result.latency = time.perf_counter() - started
+                continue
+            await queue.put((result, started, source))
+
+    async def _export_maps(
+        self,
+        queue: asyncio.Queue[Optional[Tuple[FileResult, float, bytes]]],
+        pool: ProcessPoolExecutor,
+    ) -> None:
+        loop = asyncio.get_running_loop()
+        while (item := await queue.get()) is not None:
+            result, started, source = item
+            try:
+                outputs = await loop.run_in_executor(
+                    pool, export_source, source, self.formatter_names
+                )
+                result.output_paths = await asyncio.to_thread(
+                    self._write_outputs, result.path, outputs
+                )
+            except Exception as error:
+                result.error = f"{type(error).__name__}: {error}"
+            result.latency = time.perf_counter() - started
+
+    def _write_outputs(self, path: str, outputs: Dict[str, str]) -> List[str]:
+        name = _output_name(path)
+        output_paths = []
+        for formatter_name, text in outputs.items():
+            output_path = os.path.join(self.output_dir, f"{name}.{formatter_name}.txt")
+            with open(output_path, "w") as file:
+                file.write(text)
+            output_paths.append(output_path)
+        return output_paths
+
+
+def _output_name(path: str) -> str:
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def _read_bytes(path: str) -> bytes:
+    with open(path, "rb") as file:
+        return file.read()
+
+
+def print_report(report: BatchReport, file: TextIO = sys.stderr) -> None:
+    for line in report.format_lines():
+        print(line, file=file)
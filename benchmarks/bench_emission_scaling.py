@@ -0,0 +1,97 @@
+"""Benchmark how titles, leaf_as_text and latex_slides scale with the map.
+
+Every output line is produced once, so the time grows linearly with the size
+of the output, on deep as well as on wide maps: growing the map 4x should not
+grow the time more than 8x (a quadratic emission grows it ~16x).
+
+Usage: python -m benchmarks.bench_emission_scaling [--size 1000] [--factor 4]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+import xml.etree.ElementTree as xml
+from types import ModuleType
+from typing import Callable, List, Optional
+
+import latex_slides
+import leaf_as_text
+import titles
+
+FORMATTERS = [titles, leaf_as_text, latex_slides]
+
+
+def deep_map(depth: int) -> xml.Element:
+    """A chain of `depth` branches, each with one leaf next to the next branch."""
+    root = xml.Element("node", TEXT="Root")
+    current = root
+    for i in range(depth):
+        xml.SubElement(current, "node", TEXT=f"Leaf {i}")
+        current = xml.SubElement(current, "node", TEXT=f"Branch {i}")
+    return root
+
+
+def wide_map(width: int) -> xml.Element:
+    """`width` branches of one leaf each under the root, with style noise."""
+    root = xml.Element("node", TEXT="Root")
+    xml.SubElement(xml.SubElement(root, "hook", NAME="MapStyle"), "properties")
+    for i in range(width):
+        branch = xml.SubElement(root, "node", TEXT=f"Branch {i}")
+        xml.SubElement(branch, "font", SIZE="10")
+        xml.SubElement(branch, "node", TEXT=f"Leaf {i}")
+    return root
+
+
+def render(module: ModuleType, root: xml.Element) -> List[str]:
+    formatter = module.Formatter()
+    formatter.parse(root)
+    lines: List[str] = formatter.format()
+    return lines
+
+
+def best_time(module: ModuleType, root: xml.Element, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        render(module, root)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def time_ratio(
+    module: ModuleType,
+    build: Callable[[int], xml.Element],
+    size: int,
+    factor: int,
+    repeat: int,
+) -> float:
+    """Growth of the time over growth of the output, for a `factor` times
+    larger map: about 1 when the emission is linear."""
+    small = build(size)
+    large = build(size * factor)
+    # Titles repeat '#' once per level: normalize by output size
+    small_size = sum(len(line) + 1 for line in render(module, small))
+    large_size = sum(len(line) + 1 for line in render(module, large))
+    work_ratio = max(factor, large_size / small_size)
+    ratio = best_time(module, large, repeat) / best_time(module, small, repeat)
+    return ratio / work_ratio
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=1000)
+    parser.add_argument("--factor", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    print(f"{'formatter':<14} {'map':<6} {'time / output growth':>21}")
+    for build in (wide_map, deep_map):
+        for module in FORMATTERS:
+            ratio = time_ratio(module, build, args.size, args.factor, args.repeat)
+            map_name = build.__name__.removesuffix("_map")
+            print(f"{module.__name__:<14} {map_name:<6} {ratio:>21.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Benchmark orgmode_date_sections with date blocks rendered in a process pool.
+
+Usage: python -m benchmarks.bench_parallel_dates [--years 3] [--jobs 1 2 4 8]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import time
+import xml.etree.ElementTree as xml
+from datetime import date, timedelta
+from typing import List, Optional
+
+import orgmode_date_sections
+
+DATE_OBJECT = "org.freeplane.features.format.FormattedDate|{}T00:00+0400|date"
+DATETIME_OBJECT = "org.freeplane.features.format.FormattedDate|{}T{}+0400|datetime"
+
+
+def build_map(years: int) -> xml.Element:
+    """Build a map with one date node per day, each with four sections."""
+    root = xml.Element("node", TEXT="Root")
+    first_day = date(2023, 1, 1)
+    for offset in range(365 * years):
+        day = (first_day + timedelta(days=offset)).isoformat()
+        date_node = xml.SubElement(
+            root, "node", TEXT=day, OBJECT=DATE_OBJECT.format(day)
+        )
+
+        worklog = xml.SubElement(date_node, "node", TEXT="WORKLOG")
+        for p in range(5):
+            project = xml.SubElement(worklog, "node", TEXT=f"Project {p}")
+            for t in range(4):
+                xml.SubElement(project, "node", TEXT=f"Did thing {t}")
+            xml.SubElement(project, "node", TEXT="! Follow up")
+
+        times = xml.SubElement(date_node, "node", TEXT="TIMES")
+        for hour in range(8, 18):
+            entry = xml.SubElement(
+                times,
+                "node",
+                TEXT=f"{hour}:00",
+                OBJECT=DATETIME_OBJECT.format(day, f"{hour:02d}:00"),
+            )
+            xml.SubElement(entry, "icon", BUILTIN="stop-sign")
+            xml.SubElement(entry, "node", TEXT=f"Work block {hour}")
+
+        todo = xml.SubElement(date_node, "node", TEXT="TODO")
+        for t in range(3):
+            item = xml.SubElement(todo, "node", TEXT=f"Task {t}")
+            note = xml.SubElement(item, "richcontent", TYPE="NOTE")
+            items = xml.SubElement(
+                xml.SubElement(xml.SubElement(note, "html"), "body"), "ul"
+            )
+            xml.SubElement(items, "li").text = "Context"
+
+        learnlog = xml.SubElement(date_node, "node", TEXT="LEARNLOG")
+        xml.SubElement(learnlog, "node", TEXT="Something new")
+    return root
+
+
+def time_format(root: xml.Element, jobs: int) -> float:
+    formatter = orgmode_date_sections.Formatter(jobs=jobs)
+    formatter.parse(root)
+    started = time.perf_counter()
+    formatter.format()
+    return time.perf_counter() - started
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--jobs", nargs="+", type=int, default=[1, 2, 4, 8])
+    args = parser.parse_args(argv)
+
+    root = build_map(args.years)
+    print(f"{os.cpu_count()} CPUs, {365 * args.years} dates")
+    serial = time_format(root, 1)
+    print(f"{'jobs':>4} {'format (ms)':>12} {'speedup':>8}")
+    for jobs in args.jobs:
+        elapsed = serial if jobs == 1 else time_format(root, jobs)
+        print(f"{jobs:>4} {elapsed * 1000:>12.1f} {serial / elapsed:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Benchmark rendering of TODO nodes carrying HTML notes.
+
+Usage: python -m benchmarks.bench_todo_notes [--sizes 1000 5000 20000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+import xml.etree.ElementTree as xml
+from typing import List, Optional
+
+import orgmode_date_sections
+
+DATE_OBJECT = "org.freeplane.features.format.FormattedDate|2026-01-24T00:00+0400|date"
+
+
+def build_map(todo_count: int) -> xml.Element:
+    """Build a map with one date whose TODO section has `todo_count` noted nodes."""
+    root = xml.Element("node", TEXT="Root")
+    date_node = xml.SubElement(root, "node", TEXT="24/01/2026", OBJECT=DATE_OBJECT)
+    todo_section = xml.SubElement(date_node, "node", TEXT="TODO")
+    for i in range(todo_count):
+        todo = xml.SubElement(todo_section, "node", TEXT=f"Task {i}")
+        note = xml.SubElement(todo, "richcontent", TYPE="NOTE")
+        html = xml.SubElement(note, "html")
+        xml.SubElement(html, "head")
+        body = xml.SubElement(html, "body")
+        items = xml.SubElement(body, "ul")
+        first = xml.SubElement(items, "li")
+        first.text = f"Context for task {i}"
+        nested = xml.SubElement(xml.SubElement(first, "ul"), "li")
+        nested.text = "Nested detail with "
+        bold = xml.SubElement(nested, "b")
+        bold.text = "markup"
+        xml.SubElement(items, "li").text = "Follow-up"
+    return root
+
+
+def time_render(root: xml.Element, repeat: int) -> float:
+    """Return the best wall time of parse + format over `repeat` runs."""
+    best = float("inf")
+    for _ in range(repeat):
+        formatter = orgmode_date_sections.Formatter()
+        started = time.perf_counter()
+        formatter.parse(root)
+        formatter.format()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", nargs="+", type=int, default=[1000, 5000, 20000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    print(f"{'TODO nodes':>10} {'best (ms)':>10} {'per node (us)':>14}")
+    for size in args.sizes:
+        elapsed = time_render(build_map(size), args.repeat)
+        print(f"{size:>10} {elapsed * 1000:>10.1f} {elapsed / size * 1e6:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Benchmark the 3-phase ordering on wide sections.
+
+Usage: python -m benchmarks.bench_wide_sections [--sizes 10000 50000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+import xml.etree.ElementTree as xml
+from typing import Callable, List, Optional
+
+import orgmode_date_sections
+import orgmode_lists
+from worklog.helpers import HierarchicalNodeProcessor
+
+DATE_OBJECT = "org.freeplane.features.format.FormattedDate|2026-01-24T00:00+0400|date"
+
+
+def build_map(width: int) -> xml.Element:
+    """Build a map with one WORKLOG section of `width` mixed children."""
+    root = xml.Element("node", TEXT="Root")
+    date_node = xml.SubElement(root, "node", TEXT="24/01/2026", OBJECT=DATE_OBJECT)
+    section = xml.SubElement(date_node, "node", TEXT="WORKLOG")
+    for i in range(width):
+        kind = i % 3
+        if kind == 0:
+            xml.SubElement(section, "node", TEXT=f"Leaf {i}")
+        elif kind == 1:
+            branch = xml.SubElement(section, "node", TEXT=f"Branch {i}")
+            xml.SubElement(branch, "font", SIZE="10")
+            xml.SubElement(branch, "node", TEXT=f"Child {i}")
+        else:
+            xml.SubElement(section, "node", TEXT=f" ! Todo {i}")
+    return root
+
+
+def best_time(run: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def run_date_sections(root: xml.Element) -> None:
+    formatter = orgmode_date_sections.Formatter()
+    formatter.parse(root)
+    formatter.format()
+
+
+def run_lists(root: xml.Element) -> None:
+    formatter = orgmode_lists.Formatter()
+    formatter.parse(root)
+    formatter.format()
+
+
+def run_processor(root: xml.Element) -> None:
+    section = root[0][0]
+    HierarchicalNodeProcessor.process_hierarchical_order(section, lambda node: None, ())
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", nargs="+", type=int, default=[10000, 50000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    cases = [
+        ("orgmode_date_sections", run_date_sections),
+        ("orgmode_lists", run_lists),
+        ("process_hierarchical_order", run_processor),
+    ]
+    print(f"{'case':<28} {'children':>9} {'best (ms)':>10}")
+    for size in args.sizes:
+        root = build_map(size)
+        for name, run in cases:
+            elapsed = best_time(lambda: run(root), args.repeat)
+            print(f"{name:<28} {size:>9} {elapsed * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
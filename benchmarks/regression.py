@@ -0,0 +1,208 @@
+"""Catch benchmark slowdowns against a stored baseline.
+
+`save` runs the benchmark suite and writes the results to a JSON baseline.
+`check` runs the suite again with the baseline settings and fails if the
+median time of any formatter stage grew by more than `--max-regression`
+percent. Differences below the noise of the trials (three times their median
+absolute deviation) or below `--min-seconds` are ignored, and regressed cases
+are measured again before failing.
+
+Baselines depend on the machine: save one on the machine that checks.
+
+Usage: python -m benchmarks.regression save|check [--baseline PATH] ...
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from benchmarks.suite import FORMATTERS, STAGES, CaseResult, run_suite
+from mindmap.generator import GeneratorConfig
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+@dataclass(frozen=True)
+class Regression:
+    """A formatter stage whose median time grew beyond the threshold."""
+
+    formatter: str
+    days: int
+    stage: str
+    baseline: float
+    current: float
+
+    @property
+    def percent(self) -> float:
+        return (self.current - self.baseline) / self.baseline * 100
+
+    def format_line(self) -> str:
+        return (
+            f"{self.formatter} ({self.days} days) {self.stage}: "
+            f"{self.baseline * 1000:.1f}ms -> {self.current * 1000:.1f}ms "
+            f"(+{self.percent:.0f}%)"
+        )
+
+
+def median_absolute_deviation(values: Sequence[float]) -> float:
+    center = statistics.median(values)
+    return statistics.median(abs(value - center) for value in values)
+
+
+def compare(
+    baseline: Sequence[CaseResult],
+    current: Sequence[CaseResult],
+    max_regression: float,
+    min_seconds: float,
+) -> List[Regression]:
+    """Return the formatter stages of `current` slower than in `baseline`."""
+    baseline_cases = {(case.formatter, case.days): case for case in baseline}
+    regressions: List[Regression] = []
+    for case in current:
+        base = baseline_cases.get((case.formatter, case.days))
+        if base is None:
+            continue
+        for stage in STAGES:
+            before, after = base.trials[stage], case.trials[stage]
+            base_median = statistics.median(before)
+            current_median = statistics.median(after)
+            noise = 3 * max(
+                median_absolute_deviation(before), median_absolute_deviation(after)
+            )
+            growth = current_median - base_median
+            if (
+                growth > max(noise, min_seconds)
+                and growth > base_median * max_regression / 100
+            ):
+                regressions.append(
+                    Regression(
+                        case.formatter, case.days, stage, base_median, current_median
+                    )
+                )
+    return regressions
+
+
+def save_baseline(
+    path: str, settings: Dict[str, Any], results: Sequence[CaseResult]
+) -> None:
+    with open(path, "w") as file:
+        json.dump(
+            {"settings": settings, "results": [asdict(result) for result in results]},
+            file,
+            indent=2,
+        )
+
+
+def load_baseline(path: str) -> Tuple[Dict[str, Any], List[CaseResult]]:
+    with open(path) as file:
+        data = json.load(file)
+    return data["settings"], [CaseResult(**result) for result in data["results"]]
+
+
+def run_with_settings(
+    settings: Dict[str, Any], cases: Optional[Sequence[Tuple[str, int]]] = None
+) -> List[CaseResult]:
+    """Run the suite, or only the given (formatter, days) cases of it."""
+    with tempfile.TemporaryDirectory() as workdir:
+        if cases is None:
+            return run_suite(
+                settings["days"],
+                settings["formatters"],
+                settings["repeat"],
+                GeneratorConfig(seed=settings["seed"]),
+                workdir,
+            )
+        results: List[CaseResult] = []
+        for formatter_name, days in cases:
+            results.extend(
+                run_suite(
+                    [days],
+                    [formatter_name],
+                    settings["repeat"],
+                    GeneratorConfig(seed=settings["seed"]),
+                    workdir,
+                )
+            )
+        return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("action", choices=("save", "check"))
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument(
+        "--days", nargs="+", type=int, default=[30, 90], help="save only"
+    )
+    parser.add_argument(
+        "--formatters",
+        nargs="+",
+        choices=FORMATTERS,
+        default=list(FORMATTERS),
+        help="save only",
+    )
+    parser.add_argument("--repeat", type=int, default=7, help="save only")
+    parser.add_argument("--seed", type=int, default=0, help="save only")
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        default=10.0,
+        help="Fail when a median time grows by more than this percentage",
+    )
+    parser.add_argument(
+        "--min-seconds",
+        type=float,
+        default=0.001,
+        help="Ignore median time growth below this many seconds",
+    )
+    args = parser.parse_args(argv)
+
+    if args.action == "save":
+        settings = {
+            "days": args.days,
+            "formatters": args.formatters,
+            "repeat": args.repeat,
+            "seed": args.seed,
+        }
+        save_baseline(args.baseline, settings, run_with_settings(settings))
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(
+            f"No baseline at {args.baseline}; "
+            "run `python -m benchmarks.regression save` first",
+            file=sys.stderr,
+        )
+        return 2
+
+    settings, baseline = load_baseline(args.baseline)
+    regressions = compare(
+        baseline, run_with_settings(settings), args.max_regression, args.min_seconds
+    )
+    if regressions:
+        # Measure the regressed cases again to rule out a burst of load
+        suspects = list(dict.fromkeys((r.formatter, r.days) for r in regressions))
+        regressions = compare(
+            baseline,
+            run_with_settings(settings, suspects),
+            args.max_regression,
+            args.min_seconds,
+        )
+    for regression in regressions:
+        print(regression.format_line(), file=sys.stderr)
+    if regressions:
+        print(f"{len(regressions)} benchmark regressions", file=sys.stderr)
+        return 1
+    print(f"No regression above {args.max_regression:g}% against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,240 @@
+"""Benchmark every formatter, stage by stage, over generated maps of growing size.
+
+Each (formatter, size) case runs in a fresh process, so its peak RSS is its
+own. The read, parse, format and print stages are timed separately (best of
+`--repeat` runs), then run once more under tracemalloc for their allocation
+peaks. A power law is fitted to the times of each formatter over the sizes,
+and formatters growing faster than `--max-exponent` are flagged.
+
+Usage: python -m benchmarks.suite [--days 30 90 270] [--formatters titles ...]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional, Sequence, TextIO, Tuple
+
+from main import read_mindmap
+from mindmap.generator import GeneratorConfig, MapGenerator
+from run_metrics import peak_rss
+
+FORMATTERS = (
+    "titles",
+    "leaf_as_text",
+    "latex_slides",
+    "orgmode",
+    "orgmode_lists",
+    "orgmode_date_sections",
+    "json_formatter",
+    "markdown_outline",
+    "html_outline",
+)
+
+STAGES = ("read", "parse", "format", "print")
+
+
+@dataclass
+class CaseResult:
+    """Measurements of one formatter over one map."""
+
+    formatter: str
+    days: int
+    nodes: int
+    # Best wall time of each stage, in seconds
+    seconds: Dict[str, float]
+    # Wall times of every trial of each stage, in seconds
+    trials: Dict[str, List[float]]
+    # tracemalloc peak of each stage, in bytes
+    traced_peaks: Dict[str, int]
+    # Peak resident set size of the process running the case, in bytes
+    peak_rss: Optional[int]
+
+    @property
+    def formatter_seconds(self) -> float:
+        """Time spent in the formatter itself: parse, format and print."""
+        return sum(self.seconds[stage] for stage in STAGES if stage != "read")
+
+
+def run_stages(formatter_name: str, path: str, out: TextIO) -> Dict[str, float]:
+    """Run the export pipeline once, returning the wall time of each stage."""
+    timings: Dict[str, float] = {}
+    started = time.perf_counter()
+    root = read_mindmap(path)
+    timings["read"] = time.perf_counter() - started
+
+    formatter = __import__(formatter_name).Formatter(output=out)
+    started = time.perf_counter()
+    formatter.parse(root)
+    timings["parse"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    formatter.lines = formatter.format()
+    timings["format"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    formatter.print()
+    timings["print"] = time.perf_counter() - started
+    return timings
+
+
+def trace_stages(formatter_name: str, path: str, out: TextIO) -> Dict[str, int]:
+    """Run the export pipeline once under tracemalloc, returning stage peaks."""
+    peaks: Dict[str, int] = {}
+    tracemalloc.start()
+    try:
+        root = read_mindmap(path)
+        peaks["read"] = tracemalloc.get_traced_memory()[1]
+
+        formatter = __import__(formatter_name).Formatter(output=out)
+        tracemalloc.reset_peak()
+        formatter.parse(root)
+        peaks["parse"] = tracemalloc.get_traced_memory()[1]
+
+        tracemalloc.reset_peak()
+        formatter.lines = formatter.format()
+        peaks["format"] = tracemalloc.get_traced_memory()[1]
+
+        tracemalloc.reset_peak()
+        formatter.print()
+        peaks["print"] = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return peaks
+
+
+def run_case(formatter_name: str, path: str, days: int, repeat: int) -> CaseResult:
+    """Measure one formatter over one map. Meant to run in its own process."""
+    with open(os.devnull, "w") as out:
+        runs = [run_stages(formatter_name, path, out) for _ in range(repeat)]
+        traced_peaks = trace_stages(formatter_name, path, out)
+
+    return CaseResult(
+        formatter=formatter_name,
+        days=days,
+        nodes=sum(1 for _ in read_mindmap(path).iter("node")),
+        seconds={stage: min(run[stage] for run in runs) for stage in STAGES},
+        trials={stage: [run[stage] for run in runs] for stage in STAGES},
+        traced_peaks=traced_peaks,
+        peak_rss=peak_rss(),
+    )
+
+
+def scaling_exponent(points: Sequence[Tuple[float, float]]) -> float:
+    """Least-squares slope of log(time) over log(size): time ~ size ** slope."""
+    logs = [(math.log(size), math.log(max(seconds, 1e-9))) for size, seconds in points]
+    mean_x = sum(x for x, _ in logs) / len(logs)
+    mean_y = sum(y for _, y in logs) / len(logs)
+    spread = sum((x - mean_x) ** 2 for x, _ in logs)
+    if spread == 0:
+        return 0.0
+    return sum((x - mean_x) * (y - mean_y) for x, y in logs) / spread
+
+
+def run_suite(
+    days: Sequence[int],
+    formatters: Sequence[str],
+    repeat: int,
+    config: GeneratorConfig,
+    workdir: str,
+) -> List[CaseResult]:
+    results: List[CaseResult] = []
+    context = multiprocessing.get_context("spawn")
+    for day_count in days:
+        path = os.path.join(workdir, f"generated_{day_count}.mm")
+        MapGenerator(
+            GeneratorConfig(**{**asdict(config), "days": day_count})
+        ).write_file(path)
+        for formatter_name in formatters:
+            # A fresh process per case keeps the peak RSS of the cases apart
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                results.append(
+                    executor.submit(
+                        run_case, formatter_name, path, day_count, repeat
+                    ).result()
+                )
+    return results
+
+
+def scaling_exponents(results: Sequence[CaseResult]) -> Dict[str, float]:
+    """Scaling exponent of the time of each formatter over the map sizes."""
+    exponents: Dict[str, float] = {}
+    for formatter_name in dict.fromkeys(result.formatter for result in results):
+        points = [
+            (result.nodes, result.formatter_seconds)
+            for result in results
+            if result.formatter == formatter_name
+        ]
+        if len(points) >= 2:
+            exponents[formatter_name] = scaling_exponent(points)
+    return exponents
+
+
+def format_report(results: Sequence[CaseResult], max_exponent: float) -> List[str]:
+    header = f"{'formatter':<22} {'nodes':>8}" + "".join(
+        f" {stage + ' (ms)':>12}" for stage in STAGES
+    )
+    lines = [header + f" {'traced (MB)':>12} {'RSS (MB)':>9}"]
+    for result in results:
+        traced = max(result.traced_peaks.values()) / 2**20
+        rss = f"{result.peak_rss / 2**20:>9.1f}" if result.peak_rss else f"{'-':>9}"
+        lines.append(
+            f"{result.formatter:<22} {result.nodes:>8}"
+            + "".join(f" {result.seconds[stage] * 1000:>12.1f}" for stage in STAGES)
+            + f" {traced:>12.1f} {rss}"
+        )
+
+    lines.append("")
+    lines.append(f"{'formatter':<22} {'exponent':>8}")
+    for formatter_name, exponent in scaling_exponents(results).items():
+        flag = "  SUPER-LINEAR" if exponent > max_exponent else ""
+        lines.append(f"{formatter_name:<22} {exponent:>8.2f}{flag}")
+    return lines
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--days", nargs="+", type=int, default=[30, 90, 270])
+    parser.add_argument(
+        "--formatters", nargs="+", choices=FORMATTERS, default=list(FORMATTERS)
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--max-exponent",
+        type=float,
+        default=1.2,
+        help="Flag formatters whose time grows faster than size ** N",
+    )
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        results = run_suite(
+            args.days,
+            args.formatters,
+            args.repeat,
+            GeneratorConfig(seed=args.seed),
+            workdir,
+        )
+
+    for line in format_report(results, args.max_exponent):
+        print(line)
+
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump([asdict(result) for result in results], file, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+from mindmap_exporter import MindmapExporter
+import csv
+import itertools
+import xml.etree.ElementTree as xml
+from mindmap.reader import DateReader, DateTimeReader
+from worklog.entries import TimeEntryCollector
+from worklog.helpers import DurationFormatter
+
+HEADER = ("date", "section", "project", "task", "start", "end", "minutes", "tags")
+
+
+class Formatter(MindmapExporter):
+    """
+    Exports the time entries of the map as a CSV timesheet, one row per
+    entry.
+
+    Days are written in date order, and rows are written to the output as
+    the entries of each day are found, so the memory used does not grow with
+    the number of entries: only the entries of the day being written are
+    held, to fill their missing end times with the rules of the orgmode
+    formatter.
+
+    Entries are extracted like the orgmode formatter does: a project is only
+    reported from the first node having its name (`first_projects`), so the
+    minutes add up to the orgmode totals.
+    """
+
+    def parse(self, tree: xml.Element) -> None:
+        self.result = tree
+
+    def format(self) -> list[str]:
+        # The rows are streamed by print()
+        return []
+
+    def print(self) -> None:
+        writer = csv.writer(self.out, lineterminator="\n")
+        writer.writerow(HEADER)
+        # The date nodes are sorted, not their entries
+        days = []
+        for node in DateReader.find_all_date_nodes(self.result):
+            date_value = DateReader.read_date(node)
+            if date_value is not None and not DateTimeReader.is_datetime_node(node):
+                days.append((date_value.value, node))
+        days.sort(key=lambda day: day[0])
+        projects = TimeEntryCollector.first_projects(self.result)
+        entries = (
+            entry
+            for _, node in days
+            for _, entry in TimeEntryCollector.iter_date_entry_nodes(node, projects)
+        )
+        # End times are only filled from entries of the same day, which follow
+        # each other
+        for _, day_entries in itertools.groupby(entries, key=lambda entry: entry.date):
+            for entry in TimeEntryCollector.fill_missing_end_times(list(day_entries)):
+                writer.writerow(
+                    (
+                        entry.date.isoformat(),
+                        entry.section_name,
+                        entry.project,
+                        entry.task_name,
+                        entry.start.strftime("%H:%M"),
+                        entry.end.strftime("%H:%M") if entry.end else "",
+                        DurationFormatter.calculate_duration_minutes(
+                            {"start": entry.start, "end": entry.end}
+                        ),
+                        ":".join(entry.tags),
+                    )
+                )
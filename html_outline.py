@@ -0,0 +1,82 @@
+from outline_exporter import OutlineExporter
+import xml.etree.ElementTree as xml
+from html import escape
+from typing import List, Optional, TextIO
+from outline_exporter import IndexEntry, iter_outline, node_link, node_text
+
+
+class Formatter(OutlineExporter):
+    """
+    Exports the map as a static HTML page: the root as the title, its
+    children as `<h2>` headings and the nodes under them as nested lists.
+    Nodes with a link are written as anchors. The page has no script nor
+    stylesheet.
+
+    With `chunk_dir`, each top-level branch (or month of dates, with
+    `split="month"`) is written to its own `.html` page, with an
+    `index.html` linking them, so a browser only loads the part it shows.
+    """
+
+    extension = ".html"
+
+    def write_document(
+        self,
+        out: TextIO,
+        title: str,
+        nodes: List[xml.Element],
+        index: Optional[str] = None,
+    ) -> int:
+        _write_page_start(out, title)
+        if index is not None:
+            out.write(f'<nav><a href="{escape(index)}">Index</a></nav>\n')
+        out.write(f"<h1>{escape(title)}</h1>\n")
+        written = 0
+        for starting, depth, node in iter_outline(nodes):
+            if not starting:
+                out.write("</ul>\n" if depth == 0 else "</ul>\n</li>\n")
+                continue
+            written += 1
+            has_children = any(child.tag == "node" for child in node)
+            if depth == 0:
+                out.write(f"<h2>{_html_text(node)}</h2>\n")
+                if has_children:
+                    out.write("<ul>\n")
+            elif has_children:
+                out.write(f"<li>{_html_text(node)}\n<ul>\n")
+            else:
+                out.write(f"<li>{_html_text(node)}</li>\n")
+        _write_page_end(out)
+        return written
+
+    def write_index(self, out: TextIO, title: str, entries: List[IndexEntry]) -> None:
+        _write_page_start(out, title)
+        out.write(f"<h1>{escape(title)}</h1>\n<ul>\n")
+        for entry in entries:
+            out.write(
+                f'<li><a href="{escape(entry.file_name)}">{escape(entry.title)}</a> '
+                f"({entry.nodes} nodes)</li>\n"
+            )
+        out.write("</ul>\n")
+        _write_page_end(out)
+
+
+def _write_page_start(out: TextIO, title: str) -> None:
+    out.write(
+        "<!DOCTYPE html>\n"
+        '<html lang="en">\n'
+        "<head>\n"
+        '<meta charset="utf-8">\n'
+        f"<title>{escape(title)}</title>\n"
+        "</head>\n"
+        "<body>\n"
+    )
+
+
+def _write_page_end(out: TextIO) -> None:
+    out.write("</body>\n</html>\n")
+
+
+def _html_text(node: xml.Element) -> str:
+    text = escape(node_text(node))
+    link = node_link(node)
+    return f'<a href="{escape(link)}">{text}</a>' if link else text
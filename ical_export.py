@@ -0,0 +1,163 @@
+from mindmap_exporter import MindmapExporter
+import hashlib
+import xml.etree.ElementTree as xml
+from datetime import datetime, timezone
+from typing import Iterator, List, Optional, TextIO
+from output_cache import write_if_changed
+from worklog.entries import TimeEntryCollector
+from worklog.models import TaskEntry
+
+PRODID = "-//mindmap-formatter//ical_export//EN"
+# Content lines longer than this many octets are folded (RFC 5545, 3.1)
+MAX_LINE_OCTETS = 75
+
+
+class Formatter(MindmapExporter):
+    """
+    Exports the time entries of the WORKLOG and TIMES sections as iCalendar
+    events: a VEVENT per entry, from its start to its end time when it has
+    one, summarized by its description (or `project / task`).
+
+    The calendar is written to the output event by event. With a
+    `watermark` file, only the entries modified since the last export are
+    written (the MODIFIED stamp of the start node or of any node under it is
+    newer than the watermark), and the watermark is moved to the newest
+    stamp seen by commit(), once the caller has written the output. A
+    watermark file that cannot be read as a stamp is ignored: every entry is
+    exported and the file is rewritten. Events keep the ID of their node as
+    UID, so a calendar importing them updates the events it already has.
+    Removed entries are not reported.
+    """
+
+    def __init__(
+        self, output: Optional[TextIO] = None, watermark: Optional[str] = None
+    ) -> None:
+        """
+        :param watermark: file keeping the newest MODIFIED stamp exported, in
+            milliseconds; every entry is exported when it does not exist
+        """
+        super().__init__(output)
+        self.watermark = watermark
+        # Newest stamp exported, written to the watermark by commit()
+        self._pending_watermark: Optional[int] = None
+
+    def parse(self, tree: xml.Element) -> None:
+        self.result = tree
+
+    def format(self) -> list[str]:
+        # The events are streamed by print()
+        return []
+
+    def print(self) -> None:
+        since = _read_watermark(self.watermark) if self.watermark else None
+        newest = since or 0
+        self._write_line("BEGIN:VCALENDAR")
+        self._write_line("VERSION:2.0")
+        self._write_line(f"PRODID:{PRODID}")
+        self._write_line("CALSCALE:GREGORIAN")
+        for start_node, entry in TimeEntryCollector.iter_entry_nodes(self.result):
+            modified = _newest_stamp(start_node)
+            newest = max(newest, modified)
+            if since is not None and modified <= since:
+                continue
+            for line in _event_lines(start_node, entry, modified):
+                self._write_line(line)
+        self._write_line("END:VCALENDAR")
+        self._pending_watermark = newest if newest != since else None
+
+    def commit(self) -> None:
+        if self.watermark and self._pending_watermark is not None:
+            write_if_changed(self.watermark, f"{self._pending_watermark}\n")
+            self._pending_watermark = None
+
+    def _write_line(self, line: str) -> None:
+        self.out.write(_fold(line) + "\r\n")
+
+
+def _event_lines(
+    start_node: xml.Element, entry: TaskEntry, modified: int
+) -> Iterator[str]:
+    # Without MODIFIED stamp, the start of the entry keeps the output
+    # reproducible
+    stamp = (
+        datetime.fromtimestamp(modified / 1000, timezone.utc)
+        if modified
+        else entry.start.replace(tzinfo=timezone.utc)
+    )
+    yield "BEGIN:VEVENT"
+    yield f"UID:{_uid(start_node, entry)}"
+    yield f"DTSTAMP:{stamp.strftime('%Y%m%dT%H%M%SZ')}"
+    # Maps hold local times: the events are floating
+    yield f"DTSTART:{entry.start.strftime('%Y%m%dT%H%M%S')}"
+    if entry.end is not None and entry.end > entry.start:
+        yield f"DTEND:{entry.end.strftime('%Y%m%dT%H%M%S')}"
+    yield f"SUMMARY:{_escape(entry.label())}"
+    categories = [entry.section_name, *entry.tags]
+    yield f"CATEGORIES:{','.join(_escape(name) for name in categories)}"
+    if entry.comments:
+        description = "\n".join(entry.comments)
+        yield f"DESCRIPTION:{_escape(description)}"
+    yield "END:VEVENT"
+
+
+def _uid(start_node: xml.Element, entry: TaskEntry) -> str:
+    node_id = start_node.get("ID")
+    if node_id:
+        return f"{node_id}@mindmap"
+    # Without ID, the event is known by its start and summary
+    digest = hashlib.blake2b(
+        f"{entry.start.isoformat()}\0{entry.label()}".encode(), digest_size=8
+    ).hexdigest()
+    return f"{digest}@mindmap"
+
+
+def _newest_stamp(start_node: xml.Element) -> int:
+    """Return the newest MODIFIED of the node and the nodes under it, or 0."""
+    stamps: List[int] = [0]
+    for node in start_node.iter("node"):
+        modified = node.get("MODIFIED", "")
+        if modified.isdigit():
+            stamps.append(int(modified))
+    return max(stamps)
+
+
+def _escape(text: str) -> str:
+    """Escape a TEXT value (RFC 5545, 3.3.11)."""
+    return (
+        text.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\n", "\\n")
+    )
+
+
+def _fold(line: str) -> str:
+    """Split a content line into lines of at most 75 octets, without cutting
+    a UTF-8 character; continuation lines start with a space."""
+    if len(line.encode("utf-8")) <= MAX_LINE_OCTETS:
+        return line
+    parts: List[str] = []
+    current = ""
+    size = 0
+    # Continuation lines lose one octet to their leading space
+    limit = MAX_LINE_OCTETS
+    for char in line:
+        char_size = len(char.encode("utf-8"))
+        if size + char_size > limit:
+            parts.append(current)
+            current, size, limit = "", 0, MAX_LINE_OCTETS - 1
+        current += char
+        size += char_size
+    parts.append(current)
+    return "\r\n ".join(parts)
+
+
+def _read_watermark(path: str) -> Optional[int]:
+    try:
+        with open(path) as file:
+            return int(file.read().strip() or 0)
+    except FileNotFoundError:
+        return None
+    except ValueError:
+        # Corrupt or truncated (UnicodeDecodeError is a ValueError too)
+        return None
@@ -6,10 +6,11 @@ from typing import Any, Dict, List, Optional
 
 
 class Formatter(MindmapExporter):
-    def export(self, tree: xml.Element) -> None:
-        result = self._convert_node_to_dict(tree)
-        output = json.dumps(result, indent=2, ensure_ascii=False)
-        print(output)
+    def parse(self, tree: xml.Element) -> None:
+        self.result = self._convert_node_to_dict(tree)
+
+    def format(self) -> list[str]:
+        return json.dumps(self.result, indent=2, ensure_ascii=False).split("\n")
 
     def _convert_node_to_dict(self, node: xml.Element) -> Dict[str, Any]:
         node_dict: Dict[str, Any] = {}
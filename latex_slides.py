@@ -1,5 +1,6 @@
 from mindmap_exporter import MindmapExporter
 import xml.etree.ElementTree as xml
+from mindmap.reader import NodeTreeHelper
 
 
 class Formatter(MindmapExporter):
@@ -12,32 +13,26 @@ class Formatter(MindmapExporter):
     def _format_tree_as_titles(self, root: xml.Element, level: int) -> list[str]:
         lines: list[str] = []
 
-        if "TEXT" not in root.attrib:
-            for child in root:
-                lines.extend(self._format_tree_as_titles(child, level))
-            return lines
+        for node, node_level, entering in NodeTreeHelper.walk_titled_nodes(root, level):
+            if not entering:
+                if node_level == 2:
+                    lines.append("\\end{itemize}")
+                    lines.append("\\end{frame}")
+                continue
 
-        node_text = root.attrib["TEXT"]
-        if level == 1:
-            lines.append(f"""
+            node_text = node.attrib["TEXT"]
+            if node_level == 1:
+                lines.append(f"""
 \\section{{{node_text}}}
 """)
-        elif level == 2:
-            lines.append(f"""
+            elif node_level == 2:
+                lines.append(f"""
 \\begin{{frame}}
     \\frametitle{{{node_text}}}
 """)
-            lines.append("\\begin{itemize}")
+                lines.append("\\begin{itemize}")
 
-        elif level == 3:
-            lines.append(f"    \\item {node_text}")
-
-        for child in root:
-            if child.tag == "node":
-                lines.extend(self._format_tree_as_titles(child, level + 1))
-
-        if level == 2:
-            lines.append("\\end{itemize}")
-            lines.append("\\end{frame}")
+            elif node_level == 3:
+                lines.append(f"    \\item {node_text}")
 
         return lines
@@ -1,5 +1,6 @@
 from mindmap_exporter import MindmapExporter
 import xml.etree.ElementTree as xml
+from mindmap.reader import NodeTreeHelper
 
 
 class Formatter(MindmapExporter):
@@ -12,19 +13,14 @@ class Formatter(MindmapExporter):
     def _format_tree_as_titles(self, root: xml.Element, level: int) -> list[str]:
         lines: list[str] = []
 
-        if "TEXT" not in root.attrib:
-            for child in root:
-                lines.extend(self._format_tree_as_titles(child, level))
-            return lines
+        for node, node_level, entering in NodeTreeHelper.walk_titled_nodes(root, level):
+            if not entering:
+                continue
 
-        node_children = [child for child in root if child.tag == "node"]
-
-        if len(node_children) != 0:
-            lines.append(("#" * level) + " " + root.attrib["TEXT"])
-            for child in node_children:
-                lines.extend(self._format_tree_as_titles(child, level + 1))
-        else:
-            lines.append(root.attrib["TEXT"])
-            lines.append("")
+            if not NodeTreeHelper.is_leaf(node):
+                lines.append(("#" * node_level) + " " + node.attrib["TEXT"])
+            else:
+                lines.append(node.attrib["TEXT"])
+                lines.append("")
 
         return lines
@@ -1,6 +1,50 @@
 import argparse
+import cProfile
+import io
+import re
+import sqlite3
+import sys
 import xml.etree.ElementTree as xml
-from typing import Optional, TextIO
+from typing import Any, Dict, List, Optional, TextIO, Tuple, cast
+
+from contextlib import ExitStack
+from datetime import date, datetime
+
+from batch_export import BatchExporter, print_report
+from mindmap.cache import CacheStats, NodePropertyCache
+from mindmap.phases import PhaseRecorder
+from mindmap.reader import MapReader
+from mindmap_diff import MapDiff
+from mindmap_exporter import MindmapExporter
+from node_query import SECTIONS, NodeFilter, NodeIndex
+from outline_exporter import SPLITS
+from output_cache import OutputCache, replace_if_changed, write_if_changed
+from run_metrics import CountingWriter, RunMetrics
+from search_index import SearchIndex
+from worklog_merge import MergeInput, WorklogMerger
+from worklog.entries import TimeEntryCollector
+from worklog.interval_index import IntervalIndex
+from worklog.validation import TimeEntryValidator, TimeIssue
+
+
+def read_mindmap(path: str) -> xml.Element:
+    with open(path, "r") as file:
+        tree = xml.parse(file)
+        """
+        Skip the topmost node, a container for the head of the mindmap
+        :param tree: the whole mindmap
+        :return: the head of the mindmap, with its children
+        """
+        map_root = tree.getroot()
+        # Handle both Freemind and FreePlane formats
+        # Freemind: <map><node>...</node></map>
+        # FreePlane: <map><bookmarks>...</bookmarks><node>...</node></map>
+        return get_root_node(map_root)
+
+
+def get_root_node(map_root: xml.Element) -> xml.Element:
+    """Backward-compatible wrapper for MapReader.get_root_node()."""
+    return MapReader.get_root_node(map_root)
 
 
 class MindMapFormatter:
@@ -9,61 +53,560 @@ class MindMapFormatter:
         statement_path: str,
         formatter_name: str,
         output_file: Optional[TextIO] = None,
+        check: bool = False,
+        debug_cache: bool = False,
+        formatter_options: Optional[Dict[str, Any]] = None,
+        timings: bool = False,
+        profile: Optional[str] = None,
+        trace_memory: bool = False,
+        metrics: bool = False,
     ) -> None:
         self.path = statement_path
         self.program = formatter_name
         self.output_file = output_file
+        self.check = check
+        self.debug_cache = debug_cache
+        # Extra keyword arguments for the Formatter constructor
+        self.formatter_options = formatter_options or {}
+        self.timings = timings
+        # cProfile statistics file
+        self.profile = profile
+        self.trace_memory = trace_memory
+        self.collect_metrics = metrics
+        self.issues: List[TimeIssue] = []
+        self.metrics: Optional[RunMetrics] = None
+        self.formatter: Optional[MindmapExporter] = None
 
     def read(self) -> None:
-        with open(self.path, "r") as file:
-            tree = xml.parse(file)
-            """
-            Skip the topmost node, a container for the head of the mindmap
-            :param tree: the whole mindmap
-            :return: the head of the mindmap, with its children
-            """
-            map_root = tree.getroot()
-            # Handle both Freemind and FreePlane formats
-            # Freemind: <map><node>...</node></map>
-            # FreePlane: <map><bookmarks>...</bookmarks><node>...</node></map>
-            root = self._get_root_node(map_root)
-            self._print_tree(root)
+        recorder = PhaseRecorder(trace_memory=self.trace_memory)
+        # The output is only wrapped to measure it when metrics are collected;
+        # formatters only call its write() and flush()
+        counter = CountingWriter(self.output_file) if self.collect_metrics else None
+        output = cast(TextIO, counter) if counter is not None else self.output_file
+        with ExitStack() as stack:
+            if self.timings or self.trace_memory or self.collect_metrics:
+                stack.enter_context(recorder.activate())
+            if self.profile is not None:
+                profiler = cProfile.Profile()
+                # Callbacks run last in, first out: disable, then dump
+                stack.callback(profiler.dump_stats, self.profile)
+                stack.callback(profiler.disable)
+                profiler.enable()
+            root, formatter, cache_stats = self._read_and_export(output)
+        self.formatter = formatter
+        if counter is not None:
+            self.metrics = RunMetrics.collect(
+                self.path,
+                self.program,
+                root,
+                counter.bytes_written,
+                cache_stats,
+                recorder,
+                issues=len(self.issues),
+            )
+        if self.timings or self.trace_memory:
+            for line in recorder.format_lines():
+                print(line, file=sys.stderr)
 
-    def _get_root_node(self, map_root: xml.Element) -> xml.Element:
-        """
-        Extract the root node from the map, handling both Freemind and FreePlane formats.
+    def commit(self) -> None:
+        """Let the formatter persist its state once the output was written."""
+        if self.formatter is not None:
+            self.formatter.commit()
 
-        :param map_root: the map element
-        :return: the root node element
-        """
-        for child in map_root:
-            if child.tag == "node":
-                return child
-        raise ValueError("No node element found in map")
+    def _read_and_export(
+        self, output: Optional[TextIO]
+    ) -> Tuple[xml.Element, MindmapExporter, CacheStats]:
+        with PhaseRecorder.phase("read"):
+            root = read_mindmap(self.path)
+        # Memoizing node properties only pays off when the check and the export
+        # both read the dates of the tree; a single export runs without cache
+        with ExitStack() as stack:
+            cache: Optional[NodePropertyCache] = None
+            if self.check or self.debug_cache:
+                cache = stack.enter_context(NodePropertyCache.activate())
+            if self.check:
+                with PhaseRecorder.phase("check"):
+                    self._check_time_entries(root)
+            formatter = self._print_tree(root, output)
+        stats = cache.stats() if cache is not None else CacheStats(hits=0, misses=0)
+        if self.debug_cache:
+            print(stats.format_line(), file=sys.stderr)
+        return root, formatter, stats
+
+    def _check_time_entries(self, root: xml.Element) -> None:
+        """Validate the time entries and report every issue on stderr."""
+        entries = TimeEntryCollector.fill_missing_end_times(
+            TimeEntryCollector.collect(root)
+        )
+        self.issues = TimeEntryValidator.validate(entries)
+        for issue in self.issues:
+            print(issue.format_line(), file=sys.stderr)
+
+    def _get_root_node(self, map_root: xml.Element) -> xml.Element:
+        """Backward-compatible wrapper for get_root_node()."""
+        return get_root_node(map_root)
 
-    def _print_tree(self, root: xml.Element) -> None:
+    def _print_tree(
+        self, root: xml.Element, output: Optional[TextIO]
+    ) -> MindmapExporter:
         module = __import__(self.program)
-        formatter = module.Formatter(output=self.output_file)
+        formatter: MindmapExporter = module.Formatter(
+            output=output, **self.formatter_options
+        )
         formatter.export(root)
+        return formatter
 
 
-if __name__ == "__main__":
+def export_command(argv: List[str]) -> int:
     parser = argparse.ArgumentParser()
     # Configuration
     parser.add_argument("--input", required=True)
     parser.add_argument("--formatter", required=True, default="print_as_titles")
     parser.add_argument("--output", default=None, help="Output file (default: stdout)")
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Report overlapping, gapped and empty time entries on stderr; "
+        "exit with status 1 if any are found",
+    )
+    parser.add_argument(
+        "--debug-cache",
+        action="store_true",
+        help="Print the node property cache hits and misses on stderr",
+    )
+    parser.add_argument(
+        "--timings",
+        action="store_true",
+        help="Print the wall and CPU time of each export phase on stderr",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="FILE",
+        default=None,
+        help="Profile the export with cProfile and write the statistics to FILE",
+    )
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="Print the peak memory and top allocations of each export phase on stderr",
+    )
+    parser.add_argument(
+        "--metrics",
+        metavar="FILE",
+        default=None,
+        help="Write the metrics of the run to FILE as JSON",
+    )
+    parser.add_argument(
+        "--metrics-log",
+        metavar="FILE",
+        default=None,
+        help="Append the metrics of the run to the NDJSON log FILE",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=None,
+        help="Reuse the output of a previous export of the same map, formatter "
+        "code and options from this directory (ignored with diagnostic options)",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="Render date blocks in N processes (orgmode_date_sections only)",
+    )
+    parser.add_argument(
+        "--database",
+        metavar="FILE",
+        default=None,
+        help="SQLite database to write the time entries to (sqlite_export only)",
+    )
+    parser.add_argument(
+        "--upsert",
+        action="store_true",
+        help="Only rewrite the changed dates of the map in the database, keeping "
+        "the other maps, instead of rebuilding it (sqlite_export only)",
+    )
+    parser.add_argument(
+        "--watermark",
+        metavar="FILE",
+        default=None,
+        help="Only export the entries modified since the stamp kept in FILE, "
+        "then update it (ical_export only)",
+    )
+    parser.add_argument(
+        "--chunk-dir",
+        metavar="DIR",
+        default=None,
+        help="Split the outline into files written to DIR, with an index page "
+        "(markdown_outline and html_outline only)",
+    )
+    parser.add_argument(
+        "--split",
+        choices=SPLITS,
+        default=None,
+        help="Write a file per top-level branch (default) or per month of dates "
+        "(with --chunk-dir)",
+    )
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     args.formatter = args.formatter.removesuffix(".py")
 
-    # Open output file if specified, otherwise use stdout
-    output_file: Optional[TextIO] = None
+    formatter_options: Dict[str, Any] = {}
+    if args.jobs is not None:
+        if args.formatter != "orgmode_date_sections":
+            parser.error("--jobs is only supported by orgmode_date_sections")
+        if args.jobs < 1:
+            parser.error("--jobs must be at least 1")
+        formatter_options["jobs"] = args.jobs
+    if args.formatter == "sqlite_export":
+        if args.database is None:
+            parser.error("--database is required with sqlite_export")
+        formatter_options["database"] = args.database
+        formatter_options["upsert"] = args.upsert
+    if args.formatter == "ical_export" and args.watermark is not None:
+        formatter_options["watermark"] = args.watermark
+    if args.split is not None and args.chunk_dir is None:
+        parser.error("--split requires --chunk-dir")
+    if (
+        args.formatter in ("markdown_outline", "html_outline")
+        and args.chunk_dir is not None
+    ):
+        formatter_options["chunk_dir"] = args.chunk_dir
+        formatter_options["split"] = args.split or "branch"
+
+    diagnostics = (
+        args.check
+        or args.debug_cache
+        or args.timings
+        or args.profile
+        or args.trace_memory
+        or args.metrics
+        or args.metrics_log
+    )
+    # Formatters writing a database, a watermark or chunk files must always run
+    side_effects = (
+        args.database is not None
+        or args.watermark is not None
+        or args.chunk_dir is not None
+    )
+    if args.cache_dir and not diagnostics and not side_effects:
+        return _export_with_cache(args, formatter_options)
+
+    with ExitStack() as stack:
+        # The output is streamed to a temporary file, which only replaces the
+        # output file once the export succeeded, and only if its content changes
+        output_file = (
+            stack.enter_context(replace_if_changed(args.output))
+            if args.output
+            else None
+        )
+        mindmap_formatter = MindMapFormatter(
+            args.input,
+            args.formatter,
+            output_file,
+            check=args.check,
+            debug_cache=args.debug_cache,
+            formatter_options=formatter_options,
+            timings=args.timings,
+            profile=args.profile,
+            trace_memory=args.trace_memory,
+            metrics=bool(args.metrics or args.metrics_log),
+        )
+        mindmap_formatter.read()
+        if output_file is None:
+            sys.stdout.flush()
+    mindmap_formatter.commit()
+
+    if mindmap_formatter.metrics is not None:
+        if args.metrics:
+            mindmap_formatter.metrics.write(args.metrics)
+        if args.metrics_log:
+            mindmap_formatter.metrics.append(args.metrics_log)
+
+    return 1 if mindmap_formatter.issues else 0
+
+
+def _export_with_cache(args: argparse.Namespace, options: Dict[str, Any]) -> int:
+    """Export through the output cache: the formatter only runs on a miss."""
+    with open(args.input, "rb") as file:
+        source = file.read()
+    cache = OutputCache(args.cache_dir)
+    key = cache.key(source, args.formatter, options)
+
+    text = cache.get(key)
+    if text is None:
+        buffer = io.StringIO()
+        MindMapFormatter(
+            args.input, args.formatter, buffer, formatter_options=options
+        ).read()
+        text = buffer.getvalue()
+        cache.put(key, text)
+
     if args.output:
-        output_file = open(args.output, "w")
+        write_if_changed(args.output, text)
+    else:
+        sys.stdout.write(text)
+    return 0
 
+
+def _parse_timestamp(value: str) -> datetime:
     try:
-        MindMapFormatter(args.input, args.formatter, output_file).read()
-    finally:
-        if output_file:
-            output_file.close()
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"invalid timestamp '{value}', expected YYYY-MM-DD[ HH:MM]"
+        ) from None
+
+
+def _parse_date(value: str) -> date:
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"invalid date '{value}', expected YYYY-MM-DD"
+        ) from None
+
+
+def query_command(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog="main.py query",
+        description="List the time entries running at a moment or during a range, "
+        "or the nodes selected by tag, TODO marker, section, date and text",
+    )
+    parser.add_argument("--input", required=True)
+    moment = parser.add_mutually_exclusive_group()
+    moment.add_argument("--at", type=_parse_timestamp, metavar="TIMESTAMP")
+    moment.add_argument(
+        "--between", nargs=2, type=_parse_timestamp, metavar=("START", "END")
+    )
+    nodes = parser.add_argument_group("node filters (all must match)")
+    nodes.add_argument(
+        "--tag",
+        action="append",
+        default=[],
+        help="Icon tag, e.g. stop-sign or StopSign; may be repeated",
+    )
+    nodes.add_argument("--todo", action="store_true", help="Only TODO (!) nodes")
+    nodes.add_argument(
+        "--section",
+        action="append",
+        default=[],
+        help=f"Only nodes in this section ({', '.join(SECTIONS)}); may be repeated",
+    )
+    nodes.add_argument("--date-from", type=_parse_date, metavar="YYYY-MM-DD")
+    nodes.add_argument("--date-to", type=_parse_date, metavar="YYYY-MM-DD")
+    nodes.add_argument("--regex", help="Regular expression searched in the node text")
+    nodes.add_argument(
+        "--formatter",
+        help="Render the selected nodes, in their context, with this formatter",
+    )
+    args = parser.parse_args(argv)
+
+    node_filter = NodeFilter(
+        tags=tuple(args.tag),
+        todo=args.todo,
+        sections=tuple(args.section),
+        date_from=args.date_from,
+        date_to=args.date_to,
+        pattern=args.regex,
+    )
+    if args.at is None and args.between is None:
+        if node_filter.is_empty():
+            parser.error("one of --at, --between or a node filter is required")
+        if args.regex is not None:
+            try:
+                re.compile(args.regex)
+            except re.error as error:
+                parser.error(f"invalid --regex: {error}")
+        return _query_nodes(read_mindmap(args.input), node_filter, args.formatter)
+    if not node_filter.is_empty() or args.formatter:
+        parser.error("--at and --between cannot be combined with node filters")
+
+    root = read_mindmap(args.input)
+    index = IntervalIndex(
+        TimeEntryCollector.fill_missing_end_times(TimeEntryCollector.collect(root))
+    )
+    matches = index.at(args.at) if args.at else index.between(*args.between)
+
+    for entry in matches:
+        tags = f" :{':'.join(entry.tags)}:" if entry.tags else ""
+        print(
+            f"{entry.date.isoformat()} {entry.format_span()} [{entry.section_name}]{tags}"
+        )
+    return 0
+
+
+def _query_nodes(
+    root: xml.Element, node_filter: NodeFilter, formatter_name: Optional[str]
+) -> int:
+    index = NodeIndex(root)
+    positions = index.select(node_filter)
+    if formatter_name is None:
+        for position in positions:
+            print(index.match(position).format_line())
+        return 0
+
+    module = __import__(formatter_name.removesuffix(".py"))
+    formatter: MindmapExporter = module.Formatter()
+    if positions:
+        formatter.export(index.prune(positions))
+    return 0
+
+
+def batch_command(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog="main.py batch",
+        description="Export many maps with one or more formatters",
+    )
+    parser.add_argument("inputs", nargs="+", metavar="INPUT")
+    parser.add_argument(
+        "--formatter",
+        action="append",
+        required=True,
+        help="Formatter to export every map with; may be repeated",
+    )
+    parser.add_argument("--output-dir", required=True)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Processes parsing and formatting maps (default: CPU count)",
+    )
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=None,
+        help="Maps read ahead of the workers (default: twice the workers)",
+    )
+    args = parser.parse_args(argv)
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.queue_size is not None and args.queue_size < 1:
+        parser.error("--queue-size must be at least 1")
+
+    exporter = BatchExporter(
+        [name.removesuffix(".py") for name in args.formatter],
+        args.output_dir,
+        workers=args.workers,
+        queue_size=args.queue_size,
+    )
+    report = exporter.run(args.inputs)
+    print_report(report)
+    return 1 if report.failures else 0
+
+
+def diff_command(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog="main.py diff",
+        description=(
+            "List the nodes added, removed, moved or edited and the time entries "
+            "changed between two revisions of a map; exits with 1 if they differ"
+        ),
+    )
+    parser.add_argument("old", metavar="OLD")
+    parser.add_argument("new", metavar="NEW")
+    args = parser.parse_args(argv)
+
+    with open(args.old, "rb") as old_file, open(args.new, "rb") as new_file:
+        diff = MapDiff.between(old_file.read(), new_file.read())
+    for line in diff.format_lines():
+        print(line)
+    return 1 if diff else 0
+
+
+def search_command(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog="main.py search",
+        description="Search the text and notes of nodes in a full-text index of maps",
+    )
+    parser.add_argument(
+        "query",
+        nargs="?",
+        metavar="QUERY",
+        help='FTS5 query: words, prefix*, "a phrase", text:word, note:word',
+    )
+    parser.add_argument(
+        "--index", required=True, help="SQLite index file, created if missing"
+    )
+    parser.add_argument(
+        "--update",
+        action="append",
+        default=[],
+        metavar="MAP",
+        help="Bring the index of this map up to date first; may be repeated",
+    )
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args(argv)
+    if args.query is None and not args.update:
+        parser.error("a QUERY or --update is required")
+
+    with SearchIndex(args.index) as index:
+        for path in args.update:
+            print(index.update(path).format_line(), file=sys.stderr)
+        if args.query is None:
+            return 0
+        try:
+            hits = index.search(args.query, args.limit)
+        except sqlite3.OperationalError as error:
+            print(f"Invalid query '{args.query}': {error}", file=sys.stderr)
+            return 2
+    for hit in hits:
+        print(hit.format_line())
+    return 0
+
+
+def merge_command(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog="main.py merge",
+        description=(
+            "Merge the orgmode worklogs of several maps into one, "
+            "with a sub-heading per person under each date"
+        ),
+    )
+    parser.add_argument(
+        "inputs",
+        nargs="+",
+        metavar="[NAME=]INPUT",
+        help="Map of one person, named after the file unless NAME is given",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Processes extracting the worklogs of the maps (default: 1)",
+    )
+    parser.add_argument("--date-from", type=_parse_date, metavar="YYYY-MM-DD")
+    parser.add_argument("--date-to", type=_parse_date, metavar="YYYY-MM-DD")
+    args = parser.parse_args(argv)
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+
+    merger = WorklogMerger(
+        [MergeInput.parse(spec) for spec in args.inputs],
+        jobs=args.jobs,
+        date_from=args.date_from,
+        date_to=args.date_to,
+    )
+    for line in merger.iter_lines():
+        print(line)
+    return 0
+
+
+SUBCOMMANDS = {
+    "query": query_command,
+    "batch": batch_command,
+    "diff": diff_command,
+    "search": search_command,
+    "merge": merge_command,
+}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = sys.argv[1:] if argv is None else argv
+    if args and args[0] in SUBCOMMANDS:
+        return SUBCOMMANDS[args[0]](args[1:])
+    return export_command(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
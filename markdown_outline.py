@@ -0,0 +1,53 @@
+from outline_exporter import OutlineExporter
+import xml.etree.ElementTree as xml
+from typing import List, Optional, TextIO
+from outline_exporter import IndexEntry, iter_outline, node_link, node_text
+
+
+class Formatter(OutlineExporter):
+    """
+    Exports the map as a Markdown outline: the root as the title, its
+    children as `##` headings and the nodes under them as nested lists.
+    Nodes with a link are written as Markdown links.
+
+    With `chunk_dir`, each top-level branch (or month of dates, with
+    `split="month"`) is written to its own `.md` file, with an `index.md`
+    linking them.
+    """
+
+    extension = ".md"
+
+    def write_document(
+        self,
+        out: TextIO,
+        title: str,
+        nodes: List[xml.Element],
+        index: Optional[str] = None,
+    ) -> int:
+        out.write(f"# {title}\n")
+        if index is not None:
+            out.write(f"\n[Index]({index})\n")
+        written = 0
+        for starting, depth, node in iter_outline(nodes):
+            if not starting:
+                continue
+            written += 1
+            if depth == 0:
+                out.write(f"\n## {_markdown_text(node)}\n\n")
+            else:
+                out.write(f"{'  ' * (depth - 1)}- {_markdown_text(node)}\n")
+        return written
+
+    def write_index(self, out: TextIO, title: str, entries: List[IndexEntry]) -> None:
+        out.write(f"# {title}\n\n")
+        for entry in entries:
+            out.write(f"- [{entry.title}]({entry.file_name}) ({entry.nodes} nodes)\n")
+
+
+def _markdown_text(node: xml.Element) -> str:
+    text = node_text(node)
+    link = node_link(node)
+    if link is None:
+        return text
+    # Links with spaces, as relative file names, must be enclosed in <>
+    return f"[{text}](<{link}>)" if " " in link else f"[{text}]({link})"
@@ -1,15 +1,36 @@
 """Mindmap reading and tree traversal utilities."""
 
-from mindmap.reader import NodeTreeHelper, DateReader, DateTimeReader
+from mindmap.reader import (
+    MapReader,
+    NodeTreeHelper,
+    DateReader,
+    DateTimeReader,
+    NoteReader,
+)
+from mindmap.cache import NodePropertyCache, CacheStats
+from mindmap.hashing import SubtreeHashes, changed_keys
+from mindmap.phases import PhaseRecorder, PhaseStats
 from mindmap.models import DateValue, DateTimeValue, TimeEntry, Section, DateEntry
 
+# The command-line modules (mindmap.generator, mindmap.org_import) are not
+# imported here, so that running them with `python -m` does not import them
+# twice
+
 __all__ = [
+    "MapReader",
     "NodeTreeHelper",
     "DateReader",
     "DateTimeReader",
+    "NoteReader",
     "DateValue",
     "DateTimeValue",
     "TimeEntry",
     "Section",
     "DateEntry",
+    "NodePropertyCache",
+    "CacheStats",
+    "SubtreeHashes",
+    "changed_keys",
+    "PhaseRecorder",
+    "PhaseStats",
 ]
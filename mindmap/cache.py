@@ -0,0 +1,123 @@
+"""Memoization of parsed node values shared by several passes over one tree."""
+
+from __future__ import annotations
+
+import xml.etree.ElementTree as xml
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+_active_cache: ContextVar[Optional[NodePropertyCache]] = ContextVar(
+    "node_property_cache", default=None
+)
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    """Hit and miss counters of a node property cache."""
+
+    hits: int
+    misses: int
+
+    def format_line(self) -> str:
+        """Format as: node cache: H hits, M misses (R% hit rate)"""
+        total = self.hits + self.misses
+        rate = 100.0 * self.hits / total if total else 0.0
+        return (
+            f"node cache: {self.hits} hits, {self.misses} misses ({rate:.1f}% hit rate)"
+        )
+
+
+class NodePropertyCache:
+    """Lazily computes node properties (read_date, read_datetime) once.
+
+    Values are keyed by property name and node identity. A cache is only
+    valid while the tree it was filled from is alive, so it is scoped with
+    `activate()` to the passes sharing one tree (the check and the export, the
+    formatters of a batch) and released when they finish. The node is kept
+    next to its value to guard against identity reuse.
+
+    Only properties parsing the node are worth memoizing: a lookup costs more
+    than checks such as is_leaf, and a single export reads each date once, so
+    exports do not activate a cache by themselves.
+    """
+
+    def __init__(self) -> None:
+        self._tables: Dict[str, Dict[int, Tuple[xml.Element, Any]]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def current() -> Optional[NodePropertyCache]:
+        """Return the cache of the running export, if any."""
+        return _active_cache.get()
+
+    @staticmethod
+    @contextmanager
+    def activate() -> Iterator[NodePropertyCache]:
+        """Make a cache active until the block exits, then release it.
+
+        Nested activations share the outer cache.
+        """
+        cache = _active_cache.get()
+        if cache is not None:
+            yield cache
+            return
+
+        cache = NodePropertyCache()
+        token = _active_cache.set(cache)
+        try:
+            yield cache
+        finally:
+            _active_cache.reset(token)
+            cache.release()
+
+    def lookup(
+        self, prop: str, node: xml.Element, compute: Callable[[xml.Element], T]
+    ) -> T:
+        """Return the cached `prop` of node, computing it on the first request."""
+        table = self._tables.get(prop)
+        if table is None:
+            table = self._tables[prop] = {}
+        cached = table.get(id(node))
+        if cached is not None and cached[0] is node:
+            self.hits += 1
+            value: T = cached[1]
+            return value
+
+        self.misses += 1
+        value = compute(node)
+        table[id(node)] = (node, value)
+        return value
+
+    def stats(self) -> CacheStats:
+        return CacheStats(hits=self.hits, misses=self.misses)
+
+    def release(self) -> None:
+        """Drop all cached values (the counters are kept)."""
+        self._tables.clear()
+
+
+def node_property(
+    prop: str,
+) -> Callable[[Callable[[xml.Element], T]], Callable[[xml.Element], T]]:
+    """Decorate a node -> value function so it goes through the active cache.
+
+    Without an active cache the function is called directly.
+    """
+
+    def decorate(compute: Callable[[xml.Element], T]) -> Callable[[xml.Element], T]:
+        @wraps(compute)
+        def lookup(node: xml.Element) -> T:
+            cache = _active_cache.get()
+            if cache is None:
+                return compute(node)
+            return cache.lookup(prop, node, compute)
+
+        return lookup
+
+    return decorate
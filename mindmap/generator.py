@@ -0,0 +1,314 @@
+"""Synthetic FreePlane maps for benchmarking.
+
+The map is written node by node to the output stream, so its size is only
+limited by the disk. The same configuration and seed always produce the same
+file.
+
+Usage: python -m mindmap.generator --output big.mm [--days 3650] [--seed 1] ...
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+from dataclasses import dataclass, fields
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, TextIO, Tuple
+from xml.sax.saxutils import escape, quoteattr
+
+SECTIONS = ("WORKLOG", "TIMES", "TODO", "LEARNLOG")
+
+ICONS = ("yes", "idea", "stop-sign", "unchecked", "checked", "button_ok", "help")
+
+WORDS = (
+    "review design deploy refactor parser export cache index release notes "
+    "meeting backlog benchmark profile fix flaky test migrate schema docs "
+    "investigate report customer sync plan estimate"
+).split()
+
+MONTHS = "Jan Feb Mar Apr May Jun Jul Aug Sep Oct Nov Dec".split()
+
+OBJECT_PREFIX = "org.freeplane.features.format.FormattedDate"
+
+EPOCH = date(1970, 1, 1)
+
+# Length of the working day the time entries start in, from 08:00
+WORKING_MINUTES = 720
+
+
+@dataclass(frozen=True)
+class GeneratorConfig:
+    """Shape of the generated map; counts are per date unless stated otherwise."""
+
+    seed: int = 0
+    start: date = date(2026, 1, 1)
+    days: int = 30
+    sections: Tuple[str, ...] = SECTIONS
+    # WORKLOG projects, each with `tasks` tasks of one time entry
+    projects: int = 3
+    tasks: int = 3
+    # TIMES entries
+    entries_per_day: int = 8
+    # Levels and children per node of the TODO and LEARNLOG trees
+    depth: int = 2
+    fan_out: int = 3
+    # Probabilities of a node having an icon or an HTML note
+    icon_density: float = 0.1
+    note_density: float = 0.05
+    # User-defined styles added to the MapStyle hook
+    style_bloat: int = 0
+
+
+class MapGenerator:
+    """Writes a FreePlane map shaped by a GeneratorConfig."""
+
+    def __init__(self, config: GeneratorConfig) -> None:
+        self.config = config
+        self._random = random.Random(config.seed)
+        self._next_id = 0
+        self._out: Optional[TextIO] = None
+
+    def write_file(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as file:
+            self.write(file)
+
+    def write(self, out: TextIO) -> None:
+        """Write the whole map to `out`."""
+        self._random.seed(self.config.seed)
+        self._next_id = 0
+        self._out = out
+        out.write('<map version="freeplane 1.12.1">\n')
+        out.write(
+            "<!--To view this file, download free mind mapping software "
+            "Freeplane from https://www.freeplane.org -->\n"
+        )
+        self._open_node("Generated Mindmap", self.config.start, STYLE="oval")
+        self._write_map_style()
+
+        month_open = False
+        current_month: Optional[Tuple[int, int]] = None
+        for offset in range(self.config.days):
+            day = self.config.start + timedelta(days=offset)
+            if (day.year, day.month) != current_month:
+                if month_open:
+                    self._close_node()
+                current_month = (day.year, day.month)
+                self._open_node(f"{MONTHS[day.month - 1]}/{day:%y}", day)
+                month_open = True
+            self._write_date(day)
+        if month_open:
+            self._close_node()
+
+        self._close_node()
+        out.write("</map>\n")
+        self._out = None
+
+    # ========== Structure ==========
+
+    def _write_date(self, day: date) -> None:
+        self._open_node(
+            day.strftime("%d/%m/%Y"),
+            day,
+            OBJECT=f"{OBJECT_PREFIX}|{day.isoformat()}T00:00+0400|date",
+        )
+        for section in self.config.sections:
+            self._open_node(section, day)
+            if section == "WORKLOG":
+                self._write_worklog(day)
+            elif section == "TIMES":
+                self._write_times(day)
+            else:
+                self._write_tree(day, self.config.depth, todo=section == "TODO")
+            self._close_node()
+        self._close_node()
+
+    def _write_worklog(self, day: date) -> None:
+        count = self.config.projects * self.config.tasks
+        starts = self._start_times(day, count)
+        for p in range(self.config.projects):
+            self._open_node(f"Project {p} {self._words(2)}", day, decorate=True)
+            for t in range(self.config.tasks):
+                start = starts[p * self.config.tasks + t]
+                self._open_node(self._words(3).capitalize(), day, decorate=True)
+                self._write_time_entry(start, comment=f"Comment: {self._words(4)}")
+                self._close_node()
+            self._close_node()
+
+    def _write_times(self, day: date) -> None:
+        for start in self._start_times(day, self.config.entries_per_day):
+            self._write_time_entry(start, description=self._words(4).capitalize())
+
+    def _write_time_entry(
+        self,
+        start: datetime,
+        description: Optional[str] = None,
+        comment: Optional[str] = None,
+    ) -> None:
+        self._open_node(
+            start.strftime("%d/%m/%Y %H:%M"),
+            start.date(),
+            OBJECT=f"{OBJECT_PREFIX}|{start:%Y-%m-%dT%H:%M}+0400|datetime",
+            decorate=True,
+        )
+        if description:
+            self._leaf(description, start.date())
+        # One entry in ten is left open
+        if self._random.random() >= 0.1:
+            end = start + timedelta(minutes=self._random.randint(5, 90))
+            self._open_node(
+                end.strftime("%d/%m/%Y %H:%M"),
+                start.date(),
+                OBJECT=f"{OBJECT_PREFIX}|{end:%Y-%m-%dT%H:%M}+0400|datetime",
+            )
+            if comment:
+                self._leaf(comment, start.date())
+            self._close_node()
+        self._close_node()
+
+    def _write_tree(self, day: date, depth: int, todo: bool) -> None:
+        if depth < 1:
+            return
+        # Explicit stack of remaining children per level, so depth is unbounded
+        remaining = [self.config.fan_out]
+        while remaining:
+            if remaining[-1] == 0:
+                remaining.pop()
+                if remaining:
+                    self._close_node()
+                continue
+            remaining[-1] -= 1
+            text = self._words(3).capitalize()
+            if todo and self._random.random() < 0.5:
+                text = f"! {text}"
+            if len(remaining) < depth:
+                self._open_node(text, day, decorate=True)
+                remaining.append(self.config.fan_out)
+            else:
+                self._leaf(text, day)
+
+    def _start_times(self, day: date, count: int) -> List[datetime]:
+        """Sorted start times spread over the working day (08:00 - 20:00).
+
+        Each start is drawn in its own slot of the 720 minutes; with more
+        entries than minutes, several starts share a minute.
+        """
+        first = datetime(day.year, day.month, day.day, 8)
+        starts = []
+        for i in range(count):
+            slot_start = i * WORKING_MINUTES // count
+            slot_end = (i + 1) * WORKING_MINUTES // count
+            offset = slot_start + self._random.randrange(max(1, slot_end - slot_start))
+            starts.append(first + timedelta(minutes=offset))
+        return starts
+
+    def _words(self, count: int) -> str:
+        return " ".join(self._random.choice(WORDS) for _ in range(count))
+
+    # ========== XML output ==========
+
+    def _open_node(
+        self, text: str, day: date, decorate: bool = False, **attributes: str
+    ) -> None:
+        assert self._out is not None
+        self._out.write(self._node_tag(text, day, attributes) + ">\n")
+        if decorate:
+            self._write_decorations()
+
+    def _leaf(self, text: str, day: date) -> None:
+        assert self._out is not None
+        icon = self._random.random() < self.config.icon_density
+        note = self._random.random() < self.config.note_density
+        if not icon and not note:
+            self._out.write(self._node_tag(text, day, {}) + "/>\n")
+            return
+        self._out.write(self._node_tag(text, day, {}) + ">\n")
+        self._write_decorations(icon, note)
+        self._close_node()
+
+    def _close_node(self) -> None:
+        assert self._out is not None
+        self._out.write("</node>\n")
+
+    def _node_tag(self, text: str, day: date, attributes: Dict[str, str]) -> str:
+        self._next_id += 1
+        # Stable timestamps: milliseconds of the node's day (UTC) plus its ID
+        created = (day - EPOCH).days * 86_400_000
+        attrs = "".join(f" {k}={quoteattr(v)}" for k, v in attributes.items())
+        return (
+            f'<node TEXT={quoteattr(text)}{attrs} ID="ID_{self._next_id}"'
+            f' CREATED="{created + self._next_id}" MODIFIED="{created + self._next_id}"'
+        )
+
+    def _write_decorations(
+        self, icon: Optional[bool] = None, note: Optional[bool] = None
+    ) -> None:
+        assert self._out is not None
+        if icon is None:
+            icon = self._random.random() < self.config.icon_density
+        if note is None:
+            note = self._random.random() < self.config.note_density
+        if icon:
+            self._out.write(f'<icon BUILTIN="{self._random.choice(ICONS)}"/>\n')
+        if note:
+            items = "".join(
+                f"<li>{escape(self._words(5))}</li>"
+                for _ in range(self._random.randint(1, 4))
+            )
+            self._out.write(
+                '<richcontent TYPE="NOTE" CONTENT-TYPE="xml/">\n'
+                f"<html><head></head><body><ul>{items}</ul></body></html>\n"
+                "</richcontent>\n"
+            )
+
+    def _write_map_style(self) -> None:
+        assert self._out is not None
+        self._out.write(
+            '<hook NAME="MapStyle">\n'
+            '<properties show_icon_for_attributes="true" show_note_icons="true"'
+            ' fit_to_viewport="false" show_icons="BESIDE_NODES"/>\n'
+            "<map_styles>\n"
+            '<stylenode LOCALIZED_TEXT="styles.root_node" STYLE="oval">\n'
+            '<stylenode LOCALIZED_TEXT="styles.predefined" STYLE="bubble">\n'
+            '<stylenode LOCALIZED_TEXT="default" COLOR="#000000" STYLE="fork">\n'
+            '<font NAME="SansSerif" SIZE="10" BOLD="false" ITALIC="false"/>\n'
+            "</stylenode>\n"
+            "</stylenode>\n"
+            '<stylenode LOCALIZED_TEXT="styles.user-defined" STYLE="bubble">\n'
+        )
+        for i in range(self.config.style_bloat):
+            color = f"#{self._random.randrange(0x1000000):06x}"
+            self._out.write(
+                f'<stylenode TEXT="Style {i}" COLOR="{color}" STYLE="fork">\n'
+                '<font NAME="Liberation Sans" SIZE="10" BOLD="true"/>\n'
+                f'<edge COLOR="{color}" WIDTH="2"/>\n'
+                "</stylenode>\n"
+            )
+        self._out.write("</stylenode>\n</stylenode>\n</map_styles>\n</hook>\n")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    defaults = GeneratorConfig()
+    parser = argparse.ArgumentParser(description="Write a synthetic FreePlane map")
+    parser.add_argument("--output", required=True)
+    parser.add_argument("--start", type=date.fromisoformat, default=defaults.start)
+    parser.add_argument(
+        "--sections", nargs="+", choices=SECTIONS, default=list(defaults.sections)
+    )
+    for config_field in fields(GeneratorConfig):
+        if config_field.name in ("start", "sections"):
+            continue
+        parser.add_argument(
+            f"--{config_field.name.replace('_', '-')}",
+            type=type(getattr(defaults, config_field.name)),
+            default=getattr(defaults, config_field.name),
+        )
+    args = parser.parse_args(argv)
+
+    options = vars(args)
+    output = options.pop("output")
+    options["sections"] = tuple(options["sections"])
+    MapGenerator(GeneratorConfig(**options)).write_file(output)
+
+
+if __name__ == "__main__":
+    main()
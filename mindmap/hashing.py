@@ -0,0 +1,110 @@
+"""Merkle hashes of node subtrees, to find what changed between two saves."""
+
+from __future__ import annotations
+
+import hashlib
+import xml.etree.ElementTree as xml
+from typing import Callable, Dict, Hashable, List, Optional, Set, Tuple, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+
+# Attributes that make the content of a node. Everything else on a node
+# (ID, CREATED, MODIFIED, FOLDED, POSITION, STYLE, gaps...) is layout or
+# bookkeeping that changes between saves without a content change.
+CONTENT_ATTRIBUTES = ("TEXT", "OBJECT")
+
+
+class SubtreeHashes:
+    """Content digests of the `<node>` subtrees of one map.
+
+    The digest of a node combines its TEXT and OBJECT, its icons, its
+    richcontent (notes and details) and, in order, the digests of its child
+    nodes. Two subtrees have the same digest exactly when their content is
+    the same, whatever their IDs, timestamps, folding or styles.
+
+    A node is hashed from the digests of its children, so nodes must be
+    added children first: `compute()` does so for a parsed tree, and
+    `MapReader.parse_with_hashes()` while parsing. Each node is hashed once,
+    so the whole map is hashed in linear time.
+    """
+
+    def __init__(self) -> None:
+        self._digests: Dict[int, Tuple[xml.Element, bytes]] = {}
+
+    @staticmethod
+    def compute(root: xml.Element) -> SubtreeHashes:
+        """Hash every node of the tree under `root`, `root` included."""
+        hashes = SubtreeHashes()
+        # Children follow their parent in document order, so the reverse
+        # order has every node after its children
+        for node in reversed(list(root.iter("node"))):
+            hashes.add(node)
+        return hashes
+
+    def add(self, node: xml.Element) -> bytes:
+        """Hash `node`, whose child nodes must already have been added."""
+        # repr() of strings, bytes, None and tuples is unambiguous, so the
+        # fields need no separators or length prefixes.
+        fields: List[object] = [node.get(name) for name in CONTENT_ATTRIBUTES]
+        for child in node:
+            if child.tag == "node":
+                fields.append(self._digests[id(child)][1])
+            elif child.tag == "icon":
+                fields.append(("icon", child.get("BUILTIN")))
+            elif child.tag == "richcontent":
+                fields.append(("richcontent", child.get("TYPE")))
+                fields.extend(
+                    (element.tag, element.text, element.tail, sorted(element.items()))
+                    for element in child.iter()
+                )
+        value = hashlib.blake2b(
+            repr(fields).encode("utf-8", "surrogatepass"), digest_size=16
+        ).digest()
+        self._digests[id(node)] = (node, value)
+        return value
+
+    def get(self, node: xml.Element) -> Optional[bytes]:
+        """Return the digest of `node`, or None if it was not hashed."""
+        entry = self._digests.get(id(node))
+        if entry is None or entry[0] is not node:
+            return None
+        return entry[1]
+
+    def __getitem__(self, node: xml.Element) -> bytes:
+        value = self.get(node)
+        if value is None:
+            raise KeyError(f"node not hashed: {node.get('TEXT', '')!r}")
+        return value
+
+    def __contains__(self, node: object) -> bool:
+        return isinstance(node, xml.Element) and self.get(node) is not None
+
+    def __len__(self) -> int:
+        return len(self._digests)
+
+    def index(
+        self, root: xml.Element, key: Callable[[xml.Element], Optional[K]]
+    ) -> Dict[K, bytes]:
+        """Return the digests of the subtrees under `root` that have a key.
+
+        `key` names the subtrees to follow (a date, a section title...) and
+        returns None for the others. The walk does not descend into keyed
+        subtrees, so e.g. `DateReader.read_date` gives one digest per date
+        block and not per time entry. The digests are plain bytes and can be
+        stored to compare with a later save.
+        """
+        found: Dict[K, bytes] = {}
+        pending = [child for child in reversed(root) if child.tag == "node"]
+        while pending:
+            node = pending.pop()
+            name = key(node)
+            if name is None:
+                pending.extend(child for child in reversed(node) if child.tag == "node")
+            elif name not in found:
+                found[name] = self[node]
+        return found
+
+
+def changed_keys(old: Dict[K, bytes], new: Dict[K, bytes]) -> Set[K]:
+    """Return the keys added, removed or with another digest between two indexes."""
+    return {name for name in old.keys() | new.keys() if old.get(name) != new.get(name)}
@@ -0,0 +1,539 @@
+"""Convert the org output of `orgmode_date_sections` back into a FreePlane map.
+
+The org file is read one `*` block at a time and the map is written block by
+block, so only the nodes of one date block are kept in memory, whatever the
+size of the archive.
+
+- `* [YYYY-MM-DD Day]` headings become date nodes, children of the root
+- `** PROJ NAME` (or `** TODO`) headings become the sections of the date
+- deeper headings and `- ` list items become nodes, nested by their stars
+  and indentation; `TODO` headings outside the TODO section get back their
+  `!` marker, and the list items under a heading of the TODO section become
+  its note
+- the exporter writes the branches of a section (projects, their tasks) as
+  `***` headings of the same level: a heading is nested under the previous
+  one while that one still lacks a branch child, a heading with a body (a
+  task) follows the previous task, and a heading without body (a project)
+  starts again under the section; a time heading holds a single end time,
+  the time items after it are the next entries
+- `- HH:MM - HH:MM: description :tags:` lines of a TIMES section become time
+  entries: a datetime node with its description, icons and end time, unless
+  that end is the start of the next entry, as the exporter writes it for an
+  entry without end
+- the exporter writes each datetime node with children again as a block of
+  its date, listing its children as sections: the blocks following a date
+  block that match a node reading `DD/MM/YYYY HH:MM` make it a datetime node
+  and are not read again; the other times stay text
+
+Usage: python -m mindmap.org_import --input worklog.org --output worklog.mm
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import re
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Callable, Iterable, List, Optional, TextIO, Tuple
+from xml.sax.saxutils import escape, quoteattr
+
+OBJECT_PREFIX = "org.freeplane.features.format.FormattedDate"
+
+HEADING = re.compile(r"(\*+)(?: (.*))?")
+LIST_ITEM = re.compile(r"( *)- ?(.*)")
+KEYWORD = re.compile(r"(PROJ|TODO)(?: (.*))?")
+DATE_HEADING = re.compile(r"\[(\d{4}-\d{2}-\d{2})(?: [^\]]*)?\]")
+DATETIME_TEXT = re.compile(r"\d{2}/\d{2}/\d{4} \d{2}:\d{2}")
+# Sections whose branches with leaf children only are written as list items
+LIST_SECTIONS = ("WORKLOG", "LEARNLOG")
+# Sections without branch headings
+FLAT_SECTIONS = ("TODO", "TIMES")
+# As written by TimeEntry.format_line()
+TIME_ENTRY = re.compile(
+    r"(\d{2}:\d{2}) - (\d{2}:\d{2}|noend)(?:: (.*?))?(?: :((?:[^\s:]+:)+))?"
+)
+
+
+class MapWriter:
+    """Writes a FreePlane map node by node to a text stream.
+
+    The start tag of a node is only ended when its first child or its end
+    comes, so leaf nodes are written as empty elements.
+    """
+
+    def __init__(self, out: TextIO) -> None:
+        self.out = out
+        self.depth = 0
+        # Nodes written so far; also numbers their IDs
+        self.nodes = 0
+        # The start tag of the last opened node is not ended yet
+        self._pending = False
+
+    def begin(self, title: str) -> None:
+        """Write the map element and open the root node."""
+        self.out.write('<map version="freeplane 1.12.1">\n')
+        self.out.write(
+            "<!--To view this file, download free mind mapping software "
+            "Freeplane from https://www.freeplane.org -->\n"
+        )
+        self.open_node(title)
+
+    def end(self) -> None:
+        """Close the nodes still open, the root included, and the map."""
+        while self.depth:
+            self.close_node()
+        self.out.write("</map>\n")
+
+    def open_node(self, text: str, **attributes: str) -> None:
+        self._end_start_tag()
+        self.nodes += 1
+        attrs = "".join(f" {k}={quoteattr(v)}" for k, v in attributes.items())
+        self.out.write(f'<node TEXT={quoteattr(text)}{attrs} ID="ID_{self.nodes}"')
+        self._pending = True
+        self.depth += 1
+
+    def close_node(self) -> None:
+        if self._pending:
+            self.out.write("/>\n")
+            self._pending = False
+        else:
+            self.out.write("</node>\n")
+        self.depth -= 1
+
+    def leaf(self, text: str, **attributes: str) -> None:
+        self.open_node(text, **attributes)
+        self.close_node()
+
+    def icon(self, builtin: str) -> None:
+        """Add an icon to the open node."""
+        self._end_start_tag()
+        self.out.write(f"<icon BUILTIN={quoteattr(builtin)}/>\n")
+
+    def note(self, items: List[Tuple[int, str]]) -> None:
+        """Add an HTML note listing `items` (depth, text) to the open node.
+
+        Items deeper than 0 are nested under the item before them, as
+        NoteReader.read_list_items reads them back.
+        """
+        self._end_start_tag()
+        groups: List[Tuple[str, List[str]]] = []
+        for depth, text in items:
+            if depth and groups:
+                groups[-1][1].append(text)
+            else:
+                groups.append((text, []))
+        html = ""
+        for text, nested in groups:
+            html += f"<li>{escape(text)}"
+            if nested:
+                html += "<ul>"
+                html += "".join(f"<li>{escape(child)}</li>" for child in nested)
+                html += "</ul>"
+            html += "</li>"
+        self.out.write(
+            '<richcontent TYPE="NOTE" CONTENT-TYPE="xml/">\n'
+            f"<html><head></head><body><ul>{html}</ul></body></html>\n"
+            "</richcontent>\n"
+        )
+
+    def _end_start_tag(self) -> None:
+        if self._pending:
+            self.out.write(">\n")
+            self._pending = False
+
+
+@dataclass
+class OrgNode:
+    """A node read from the org lines, kept until its block is written."""
+
+    text: str
+    children: List[OrgNode] = field(default_factory=list)
+    icons: List[str] = field(default_factory=list)
+    # List items (depth, text) written as the HTML note of the node
+    note: List[Tuple[int, str]] = field(default_factory=list)
+    # OBJECT attribute, empty for a text node
+    value: str = ""
+
+
+@dataclass
+class TimeNode:
+    """A node reading `DD/MM/YYYY HH:MM`, a datetime node if its block follows.
+
+    The exporter writes every datetime node with children again as a block of
+    its date, with its children as sections.
+    """
+
+    node: OrgNode
+    start: datetime
+    # End time of a TIMES entry equal to the start of the next one, which the
+    # exporter also writes for an entry without end
+    filled_end: Optional[OrgNode] = None
+
+    def claim(self, day: date, sections: List[str]) -> bool:
+        """Make the node a datetime node if its block has these `sections`."""
+        if self.start.date() != day or not sections:
+            return False
+        texts = [child.text for child in self.node.children]
+        if texts != sections:
+            if self.filled_end is None or [*texts, self.filled_end.text] != sections:
+                return False
+            self.node.children.append(self.filled_end)
+        self.node.value = _datetime_value(self.start)
+        for child in self.node.children:
+            # Its end time
+            if not child.children and DATETIME_TEXT.fullmatch(child.text):
+                child.value = _datetime_value(_read_datetime(child.text))
+        return True
+
+
+class BlockReader:
+    """Reads the lines of one `*` block into a tree of OrgNode."""
+
+    def __init__(self) -> None:
+        # The nodes of the block under the root: its date node, or the lines
+        # before the first heading
+        self.nodes: List[OrgNode] = []
+        # The nodes that may be datetime nodes, in document order
+        self.times: List[TimeNode] = []
+        # Nodes open: ("heading", stars) or ("item", indent), and the nodes
+        self._open: List[Tuple[str, int]] = []
+        self._open_nodes: List[OrgNode] = []
+        # For each open node, whether it is a branch heading still lacking the
+        # branch child that made the exporter write it as a heading
+        self._open_needs_child: List[bool] = []
+        # Branch heading waiting for the next line, which tells whether it has
+        # a body
+        self._held: Optional[str] = None
+        self._date: Optional[date] = None
+        self._section = ""
+        # Entries of the TIMES section being read, with their end time
+        self._entries: List[Tuple[TimeNode, Optional[datetime]]] = []
+
+    def feed(self, line: str) -> None:
+        heading = HEADING.fullmatch(line)
+        if self._held is not None and (heading or line.strip()):
+            self._branch_heading(self._held, has_body=not heading)
+            self._held = None
+        if heading:
+            self._heading(len(heading.group(1)), heading.group(2) or "")
+            return
+        if not line.strip():
+            return
+        item = LIST_ITEM.fullmatch(line)
+        if item:
+            self._item(len(item.group(1)), item.group(2))
+        else:
+            # Body text, such as totals: a node like an item
+            stripped = line.lstrip(" ")
+            self._item(len(line) - len(stripped), stripped)
+
+    def close(self) -> None:
+        if self._held is not None:
+            self._branch_heading(self._held, has_body=False)
+            self._held = None
+        self._end_times()
+
+    def _heading(self, stars: int, title: str) -> None:
+        if stars == 1:
+            day = DATE_HEADING.fullmatch(title)
+            if day:
+                self._date = date.fromisoformat(day.group(1))
+                self._open_node(
+                    ("heading", stars),
+                    OrgNode(
+                        self._date.strftime("%d/%m/%Y"),
+                        value=f"{OBJECT_PREFIX}|{self._date.isoformat()}|date",
+                    ),
+                )
+            else:
+                self._open_node(("heading", stars), OrgNode(title))
+            return
+
+        text = _section_title(title)
+        # TODO headings of other sections were nodes marked with "!"
+        if title.startswith("TODO ") and self._section != "TODO":
+            text = f"! {text}"
+        if stars == 3 and self._section not in FLAT_SECTIONS:
+            if text.startswith("! "):
+                # TODO nodes come after the branches of their parent
+                self._close_while(self._complete_heading)
+                self._mark_branch_child()
+                self._open_node(("heading", stars), OrgNode(text))
+            else:
+                self._held = text
+            return
+        self._close_while(lambda kind, level: kind == "item" or level >= stars)
+        if stars == 2:
+            self._end_times()
+            self._section = text
+        self._open_node(("heading", stars), OrgNode(text))
+
+    def _branch_heading(self, text: str, has_body: bool) -> None:
+        """Open a `***` heading of a section, nested from its position."""
+        self._close_while(lambda kind, level: kind == "item")
+        if has_body:
+            # A task: the previous task is complete, its project is not closed
+            if self._open and self._complete_heading(*self._open[-1]):
+                self._close_while(lambda kind, level: True, count=1)
+        else:
+            # A project: only the headings lacking a branch child stay open
+            self._close_while(self._complete_heading)
+        self._mark_branch_child()
+        self._open_node(("heading", 3), OrgNode(text))
+        self._open_needs_child[-1] = True
+
+    def _complete_heading(self, kind: str, level: int) -> bool:
+        return kind == "heading" and level == 3 and not self._open_needs_child[-1]
+
+    def _mark_branch_child(self) -> None:
+        """Record that the innermost branch heading has a branch child."""
+        for index in range(len(self._open) - 1, -1, -1):
+            if self._open[index] == ("heading", 3):
+                self._open_needs_child[index] = False
+                return
+
+    def _item(self, indent: int, text: str) -> None:
+        if self._section == "TODO" and self._open:
+            kind, level = self._open[-1]
+            # TODO headings are rendered with their notes only, as list items
+            if kind == "heading" and level > 2:
+                self._open_nodes[-1].note.append((1 if indent else 0, text))
+                return
+        self._close_while(lambda kind, level: kind == "item" and level >= indent)
+        if (
+            not indent
+            and self._section in LIST_SECTIONS
+            and self._open
+            and self._complete_heading(*self._open[-1])
+            and DATETIME_TEXT.fullmatch(self._open_nodes[-1].text)
+        ):
+            # A time heading holds its end time: the time items that follow
+            # are the next entries, its siblings
+            self._close_while(lambda kind, level: True, count=1)
+        # A nested item is a branch with leaf children; outside the list
+        # sections, any node under a heading made it a branch
+        if indent or self._section not in LIST_SECTIONS:
+            self._mark_branch_child()
+        entry = TIME_ENTRY.fullmatch(text)
+        if entry and self._section == "TIMES" and self._date is not None:
+            start_text, end_text, description, tags = entry.groups()
+            self._time_entry(
+                indent, start_text, end_text, description or "", tags or ""
+            )
+        else:
+            self._open_node(("item", indent), OrgNode(text))
+
+    def _time_entry(
+        self, indent: int, start_text: str, end_text: str, description: str, tags: str
+    ) -> None:
+        assert self._date is not None
+        start = datetime.combine(
+            self._date, datetime.strptime(start_text, "%H:%M").time()
+        )
+        node = OrgNode(
+            start.strftime("%d/%m/%Y %H:%M"),
+            icons=[_builtin_icon(tag) for tag in tags.split(":") if tag],
+            value=_datetime_value(start),
+        )
+        if description:
+            node.children.append(OrgNode(description))
+        end: Optional[datetime] = None
+        if end_text != "noend":
+            end = datetime.combine(
+                self._date, datetime.strptime(end_text, "%H:%M").time()
+            )
+            if end < start:
+                end += timedelta(days=1)
+        time_node = TimeNode(node, start)
+        self.times.append(time_node)
+        self._entries.append((time_node, end))
+        self._open_node(("item", indent), node)
+
+    def _end_times(self) -> None:
+        """Give the entries of the TIMES section their end node.
+
+        The exporter writes the start of the next entry as the end of an entry
+        without end: such an end is only kept if the block of the entry lists
+        it.
+        """
+        for index, (time_node, end) in enumerate(self._entries):
+            if end is None:
+                continue
+            end_node = OrgNode(
+                end.strftime("%d/%m/%Y %H:%M"), value=_datetime_value(end)
+            )
+            following = self._entries[index + 1 : index + 2]
+            if following and following[0][0].start == end:
+                time_node.filled_end = end_node
+            else:
+                time_node.node.children.append(end_node)
+        self._entries = []
+
+    def _open_node(self, opened: Tuple[str, int], node: OrgNode) -> None:
+        if self._open_nodes:
+            self._open_nodes[-1].children.append(node)
+        else:
+            self.nodes.append(node)
+        if not node.value and DATETIME_TEXT.fullmatch(node.text):
+            self.times.append(TimeNode(node, _read_datetime(node.text)))
+        self._open.append(opened)
+        self._open_nodes.append(node)
+        self._open_needs_child.append(False)
+
+    def _close_while(
+        self, condition: Callable[[str, int], bool], count: Optional[int] = None
+    ) -> None:
+        """Close the innermost nodes while they match, at most `count` of them."""
+        while self._open and condition(*self._open[-1]) and count != 0:
+            self._open.pop()
+            self._open_nodes.pop()
+            self._open_needs_child.pop()
+            if count is not None:
+                count -= 1
+
+
+class OrgImporter:
+    """Turns org lines into nodes of a MapWriter, one `*` block at a time.
+
+    A block is read into nodes; the blocks that follow it and match the
+    children of one of its time nodes, in document order, are the blocks the
+    exporter wrote for its datetime nodes. They make these nodes datetime
+    nodes and are dropped. The first block that does not match is read in
+    turn, and the nodes of the previous one are written.
+    """
+
+    def __init__(self, writer: MapWriter) -> None:
+        self.writer = writer
+        # Lines of the block being fed
+        self._lines: List[str] = []
+        # The last block read, not written yet, and the index of its first
+        # time node still to match
+        self._block: Optional[BlockReader] = None
+        self._next_time = 0
+
+    def feed(self, line: str) -> None:
+        line = line.rstrip("\r\n")
+        heading = HEADING.fullmatch(line)
+        if heading and heading.group(1) == "*" and self._lines:
+            self._end_block()
+        self._lines.append(line)
+
+    def close(self) -> None:
+        if self._lines:
+            self._end_block()
+        self._write_block()
+
+    def _end_block(self) -> None:
+        lines, self._lines = self._lines, []
+        if self._matches_time_node(lines):
+            return
+        self._write_block()
+        self._block = BlockReader()
+        self._next_time = 0
+        for line in lines:
+            self._block.feed(line)
+        self._block.close()
+
+    def _matches_time_node(self, lines: List[str]) -> bool:
+        """Whether `lines` are the block of a time node of the last block."""
+        heading = HEADING.fullmatch(lines[0])
+        day = DATE_HEADING.fullmatch(heading.group(2) or "") if heading else None
+        if self._block is None or day is None:
+            return False
+        sections = []
+        for line in lines[1:]:
+            section = HEADING.fullmatch(line)
+            if section and section.group(1) == "**":
+                sections.append(_section_title(section.group(2) or ""))
+        times = self._block.times
+        for index in range(self._next_time, len(times)):
+            if times[index].claim(date.fromisoformat(day.group(1)), sections):
+                self._next_time = index + 1
+                return True
+        return False
+
+    def _write_block(self) -> None:
+        if self._block is None:
+            return
+        # Nodes to open, None to close the node opened before them
+        stack: List[Optional[OrgNode]] = list(reversed(self._block.nodes))
+        while stack:
+            node = stack.pop()
+            if node is None:
+                self.writer.close_node()
+                continue
+            if node.value:
+                self.writer.open_node(node.text, OBJECT=node.value)
+            else:
+                self.writer.open_node(node.text)
+            for icon in node.icons:
+                self.writer.icon(icon)
+            if node.note:
+                self.writer.note(node.note)
+            stack.append(None)
+            stack.extend(reversed(node.children))
+        self._block = None
+
+
+def _section_title(title: str) -> str:
+    """The text of the node of a `** PROJ NAME` (or `** TODO`) heading."""
+    keyword = KEYWORD.fullmatch(title)
+    if not keyword:
+        return title
+    # `** TODO` is the TODO section itself
+    return keyword.group(2) if keyword.group(2) is not None else keyword.group(1)
+
+
+def _read_datetime(text: str) -> datetime:
+    return datetime.strptime(text, "%d/%m/%Y %H:%M")
+
+
+def _datetime_value(value: datetime) -> str:
+    return f"{OBJECT_PREFIX}|{value:%Y-%m-%dT%H:%M}|datetime"
+
+
+def _builtin_icon(tag: str) -> str:
+    """Undo NodeTreeHelper.extract_tags_from_node: StopSign -> stop-sign."""
+    if "_" in tag:
+        # Names with underscores, as button_ok, only had their parts titled
+        return tag.lower()
+    return "-".join(re.findall(r"[A-Z0-9][^A-Z0-9]*|^[^A-Z0-9]+", tag)).lower()
+
+
+def import_org(lines: Iterable[str], out: TextIO, title: str) -> int:
+    """Write the map of the org `lines` to `out`.
+
+    :return: the number of nodes written, the root included
+    """
+    writer = MapWriter(out)
+    writer.begin(title)
+    importer = OrgImporter(writer)
+    for line in lines:
+        importer.feed(line)
+    importer.close()
+    writer.end()
+    return writer.nodes
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Convert orgmode_date_sections output into a FreePlane map"
+    )
+    parser.add_argument("--input", required=True)
+    parser.add_argument("--output", required=True)
+    parser.add_argument(
+        "--title", default=None, help="Text of the root node (default: input name)"
+    )
+    args = parser.parse_args(argv)
+
+    title = args.title or os.path.splitext(os.path.basename(args.input))[0]
+    with (
+        open(args.input, encoding="utf-8") as org_file,
+        open(args.output, "w", encoding="utf-8") as map_file,
+    ):
+        import_org(org_file, map_file, title)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Wall time, CPU time and allocations of the export phases."""
+
+from __future__ import annotations
+
+import time
+import tracemalloc
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional
+
+_active_recorder: ContextVar[Optional[PhaseRecorder]] = ContextVar(
+    "phase_recorder", default=None
+)
+
+
+@dataclass
+class PhaseStats:
+    """Accumulated measurements of one phase (read, check, parse, format, print)."""
+
+    name: str
+    wall: float = 0.0
+    cpu: float = 0.0
+    calls: int = 0
+    # Largest tracemalloc peak seen during the phase, in bytes
+    peak_memory: int = 0
+    # Formatted top allocation differences of the phase, when tracing memory
+    top_allocations: List[str] = field(default_factory=list)
+
+
+class PhaseRecorder:
+    """Records the phases of the running export.
+
+    `phase()` blocks are no-ops unless a recorder was made active with
+    `activate()`. With `trace_memory`, tracemalloc runs while the recorder is
+    active and each phase keeps its `top` largest allocation differences.
+    """
+
+    def __init__(self, trace_memory: bool = False, top: int = 5) -> None:
+        self.trace_memory = trace_memory
+        self.top = top
+        self.phases: Dict[str, PhaseStats] = {}
+
+    @staticmethod
+    def current() -> Optional[PhaseRecorder]:
+        """Return the recorder of the running export, if any."""
+        return _active_recorder.get()
+
+    @contextmanager
+    def activate(self) -> Iterator[PhaseRecorder]:
+        """Record the phases run until the block exits."""
+        token = _active_recorder.set(self)
+        started_tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        try:
+            yield self
+        finally:
+            if started_tracing:
+                tracemalloc.stop()
+            _active_recorder.reset(token)
+
+    @staticmethod
+    @contextmanager
+    def phase(name: str) -> Iterator[None]:
+        """Measure the block as phase `name` of the active recorder, if any."""
+        recorder = _active_recorder.get()
+        if recorder is None:
+            yield
+            return
+
+        stats = recorder.phases.get(name)
+        if stats is None:
+            stats = recorder.phases[name] = PhaseStats(name)
+        before = None
+        if recorder.trace_memory:
+            before = _take_snapshot()
+            tracemalloc.reset_peak()
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            stats.wall += time.perf_counter() - wall
+            stats.cpu += time.process_time() - cpu
+            stats.calls += 1
+            if before is not None:
+                stats.peak_memory = max(
+                    stats.peak_memory, tracemalloc.get_traced_memory()[1]
+                )
+                differences = _take_snapshot().compare_to(before, "lineno")
+                stats.top_allocations = [
+                    str(difference) for difference in differences[: recorder.top]
+                ]
+
+    def format_lines(self) -> List[str]:
+        """Format the phases as a wall/CPU table, then their top allocations."""
+        lines = [f"{'phase':<8} {'wall (ms)':>10} {'cpu (ms)':>10}"]
+        for stats in self.phases.values():
+            lines.append(
+                f"{stats.name:<8} {stats.wall * 1000:>10.1f} {stats.cpu * 1000:>10.1f}"
+            )
+        lines.append(
+            f"{'total':<8} {sum(s.wall for s in self.phases.values()) * 1000:>10.1f}"
+            f" {sum(s.cpu for s in self.phases.values()) * 1000:>10.1f}"
+        )
+
+        if self.trace_memory:
+            for stats in self.phases.values():
+                lines.append(
+                    f"{stats.name}: peak {stats.peak_memory / 1024:.1f} KiB, "
+                    "top allocations:"
+                )
+                lines.extend(f"  {line}" for line in stats.top_allocations)
+        return lines
+
+
+def _take_snapshot() -> tracemalloc.Snapshot:
+    # Leave out the memory of the snapshots themselves
+    return tracemalloc.take_snapshot().filter_traces(
+        [tracemalloc.Filter(False, tracemalloc.__file__)]
+    )
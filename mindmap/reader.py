@@ -3,19 +3,105 @@
 from __future__ import annotations
 
 import xml.etree.ElementTree as xml
-from typing import List, Optional
+from typing import Iterator, List, Optional, Tuple
 from datetime import datetime
 
+from mindmap.cache import node_property
+from mindmap.hashing import SubtreeHashes
 from mindmap.models import DateValue, DateTimeValue
 
 
+class MapReader:
+    """Reads map files and finds the head node of the mindmap."""
+
+    @staticmethod
+    def get_root_node(map_root: xml.Element) -> xml.Element:
+        """
+        Extract the root node from the map, handling both Freemind and FreePlane formats.
+        Freemind: <map><node>...</node></map>
+        FreePlane: <map><bookmarks>...</bookmarks><node>...</node></map>
+
+        :param map_root: the map element
+        :return: the root node element
+        """
+        for child in map_root:
+            if child.tag == "node":
+                return child
+        raise ValueError("No node element found in map")
+
+    @staticmethod
+    def from_bytes(source: bytes) -> xml.Element:
+        """Parse the content of a map file and return its root node."""
+        return MapReader.get_root_node(xml.fromstring(source))
+
+    @staticmethod
+    def parse_with_hashes(
+        source: bytes, chunk_size: int = 1 << 16
+    ) -> Tuple[xml.Element, SubtreeHashes]:
+        """Parse the content of a map file and hash its nodes in the same pass.
+
+        Each node is hashed as soon as its end tag is parsed, when all its
+        children already are.
+
+        :return: the root node and the digests of all its subtrees
+        """
+        hashes = SubtreeHashes()
+        parser: xml.XMLPullParser[xml.Element] = xml.XMLPullParser(events=("end",))
+        # The map element ends last
+        map_root: Optional[xml.Element] = None
+        for start in range(0, len(source) + 1, chunk_size):
+            if start < len(source):
+                parser.feed(source[start : start + chunk_size])
+            else:
+                parser.close()
+            for event in parser.read_events():
+                element = event[-1]
+                if not isinstance(element, xml.Element):
+                    continue
+                if element.tag == "node":
+                    hashes.add(element)
+                map_root = element
+        if map_root is None:
+            raise ValueError("Empty map")
+        return MapReader.get_root_node(map_root), hashes
+
+
 class NodeTreeHelper:
     """Provides common node tree traversal and classification utilities."""
 
     @staticmethod
     def is_leaf(node: xml.Element) -> bool:
         """Check if node has no node children."""
-        return len(NodeTreeHelper.get_node_children(node)) == 0
+        return node.find("node") is None
+
+    @staticmethod
+    def walk_titled_nodes(
+        root: xml.Element, level: int
+    ) -> Iterator[Tuple[xml.Element, int, bool]]:
+        """Yield (node, level, entering) for the elements with a TEXT, in
+        document order: once entering the node, once after its subtree.
+
+        Elements without TEXT are not yielded, their children are walked at
+        their level. The walk keeps an explicit stack, so deep maps do not hit
+        the recursion limit.
+        """
+        stack: List[Tuple[xml.Element, int, bool]] = [(root, level, True)]
+        while stack:
+            node, node_level, entering = stack.pop()
+            if not entering:
+                yield node, node_level, False
+                continue
+            if "TEXT" not in node.attrib:
+                stack.extend((child, node_level, True) for child in reversed(node))
+                continue
+
+            yield node, node_level, True
+            stack.append((node, node_level, False))
+            stack.extend(
+                (child, node_level + 1, True)
+                for child in reversed(node)
+                if child.tag == "node"
+            )
 
     @staticmethod
     def get_node_children(node: xml.Element) -> List[xml.Element]:
@@ -63,6 +149,7 @@ class DateReader:
                 DateReader._find_date_nodes_recursive(child, date_nodes)
 
     @staticmethod
+    @node_property("read_date")
     def read_date(node: xml.Element) -> Optional[DateValue]:
         """Extract date from node's OBJECT attribute."""
         obj_attr = node.get("OBJECT", "")
@@ -88,6 +175,7 @@ class DateTimeReader:
         return "FormattedDate" in obj_attr and "datetime" in obj_attr
 
     @staticmethod
+    @node_property("read_datetime")
     def read_datetime(node: xml.Element) -> Optional[DateTimeValue]:
         """Parse datetime from node's OBJECT attribute."""
         obj_attr = node.get("OBJECT", "")
@@ -110,3 +198,83 @@ class DateTimeReader:
                 except ValueError:
                     pass
         return None
+
+
+class NoteReader:
+    """Reads nested list items from the HTML notes (richcontent NOTE) of nodes.
+
+    The note is already part of the parsed tree, so its `<html>` element is
+    walked directly instead of being serialized and parsed again as HTML.
+    """
+
+    @staticmethod
+    def find_note_html(node: xml.Element) -> Optional[xml.Element]:
+        """Return the `<html>` element of the first NOTE richcontent, if any."""
+        for child in node:
+            if child.tag == "richcontent" and child.attrib.get("TYPE", "") == "NOTE":
+                html_elem = child.find("html")
+                if html_elem is not None:
+                    return html_elem
+        return None
+
+    @staticmethod
+    def read_list_items(html_elem: xml.Element) -> List[Tuple[int, str]]:
+        """Extract `<li>` texts with their nesting depth, in document order.
+
+        Text is collected for the innermost open `<li>`; a `<li>` is nested
+        under the open `<li>` of an outer `<ul>`. Empty items are skipped,
+        but their children are kept.
+        """
+        root: List[_ListItem] = []
+        NoteReader._walk(html_elem, 0, root, [])
+
+        items: List[Tuple[int, str]] = []
+        pending = [(0, item) for item in reversed(root)]
+        while pending:
+            depth, item = pending.pop()
+            text = "".join(item.parts).strip()
+            if text:
+                items.append((depth, text))
+            pending.extend((depth + 1, child) for child in reversed(item.children))
+        return items
+
+    @staticmethod
+    def _walk(
+        elem: xml.Element,
+        ul_depth: int,
+        root: List[_ListItem],
+        open_items: List[_ListItem],
+    ) -> None:
+        tag = elem.tag.rsplit("}", 1)[-1].lower() if isinstance(elem.tag, str) else ""
+        is_item = False
+        if tag == "ul":
+            ul_depth += 1
+        elif tag == "li":
+            item = _ListItem(ul_depth)
+            if open_items and open_items[-1].depth < ul_depth:
+                open_items[-1].children.append(item)
+            else:
+                root.append(item)
+            open_items.append(item)
+            is_item = True
+
+        if elem.text and open_items:
+            open_items[-1].parts.append(elem.text)
+        for child in elem:
+            NoteReader._walk(child, ul_depth, root, open_items)
+            if child.tail and open_items:
+                open_items[-1].parts.append(child.tail)
+
+        if is_item:
+            open_items.pop()
+
+
+class _ListItem:
+    """A `<li>` being collected by NoteReader."""
+
+    __slots__ = ("depth", "parts", "children")
+
+    def __init__(self, depth: int) -> None:
+        self.depth = depth
+        self.parts: List[str] = []
+        self.children: List[_ListItem] = []
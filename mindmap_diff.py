@@ -0,0 +1,355 @@
+"""
+Compare two revisions of a mindmap by content.
+
+Nodes are matched by their ID and, when IDs do not match, by the digest of
+their subtree. Subtrees with the same digest on both sides are skipped
+without looking inside, so the work is proportional to what changed, not to
+the size of the maps. Layout and bookkeeping attributes (MODIFIED, FOLDED,
+POSITION, styles...) are not content and never show up as changes.
+"""
+
+from __future__ import annotations
+
+import xml.etree.ElementTree as xml
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from mindmap.hashing import SubtreeHashes
+from mindmap.reader import DateReader, DateTimeReader, MapReader, NodeTreeHelper
+from worklog.entries import TimeEntryCollector
+from worklog.models import TaskEntry
+
+PATH_SEPARATOR = " / "
+
+
+@dataclass(frozen=True)
+class NodeChange:
+    """A node added, removed, moved or edited between two revisions."""
+
+    kind: str
+    path: str
+    detail: str = ""
+
+    def format_line(self) -> str:
+        """Format as: kind path[: detail]"""
+        detail = f": {self.detail}" if self.detail else ""
+        return f"{self.kind:<9} {self.path}{detail}"
+
+
+@dataclass(frozen=True)
+class EntryChange:
+    """A time entry only found in one of the revisions."""
+
+    # "+" for an entry of the new revision, "-" for one of the old revision
+    sign: str
+    entry: TaskEntry
+
+    def format_line(self) -> str:
+        """Format as: entry +|- YYYY-MM-DD HH:MM - HH:MM label [SECTION] :tags:"""
+        entry = self.entry
+        tags = f" :{':'.join(entry.tags)}:" if entry.tags else ""
+        return (
+            f"entry {self.sign} {entry.date.isoformat()} {entry.format_span()}"
+            f" [{entry.section_name}]{tags}"
+        )
+
+
+@dataclass
+class MapDiff:
+    """Changes between an old and a new revision of a map."""
+
+    nodes: List[NodeChange] = field(default_factory=list)
+    entries: List[EntryChange] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.nodes or self.entries)
+
+    def format_lines(self) -> List[str]:
+        return [change.format_line() for change in self.nodes] + [
+            change.format_line() for change in self.entries
+        ]
+
+    @staticmethod
+    def between(old_source: bytes, new_source: bytes) -> MapDiff:
+        """Parse and compare two revisions given as the content of map files."""
+        old_root, old_hashes = MapReader.parse_with_hashes(old_source)
+        new_root, new_hashes = MapReader.parse_with_hashes(new_source)
+        return MapDiffer(old_root, old_hashes, new_root, new_hashes).diff()
+
+
+class _Side:
+    """One revision: its tree, digests and lazily built ID and parent maps."""
+
+    def __init__(self, root: xml.Element, hashes: SubtreeHashes) -> None:
+        self.root = root
+        self.hashes = hashes
+        self._by_id: Optional[Dict[str, xml.Element]] = None
+        self._parents: Optional[Dict[xml.Element, xml.Element]] = None
+
+    def find_id(self, node_id: Optional[str]) -> Optional[xml.Element]:
+        if node_id is None:
+            return None
+        if self._by_id is None:
+            self._by_id = {}
+            for node in self.root.iter("node"):
+                self._by_id.setdefault(node.get("ID", ""), node)
+        return self._by_id.get(node_id)
+
+    def path(self, node: xml.Element) -> str:
+        if self._parents is None:
+            self._parents = {
+                child: parent
+                for parent in self.root.iter("node")
+                for child in parent
+                if child.tag == "node"
+            }
+        names = [_name(node)]
+        parent = self._parents.get(node)
+        while parent is not None:
+            names.append(_name(parent))
+            parent = self._parents.get(parent)
+        return PATH_SEPARATOR.join(reversed(names))
+
+
+class MapDiffer:
+    """Finds the changes between two hashed trees.
+
+    The trees are walked together from their roots. A pair of nodes with the
+    same digest is identical and skipped; otherwise its own content is
+    compared and its children are matched by ID, then by digest. Children
+    left unmatched are added or removed, unless the same ID or digest shows
+    up under another parent, in which case the node was moved.
+    """
+
+    def __init__(
+        self,
+        old_root: xml.Element,
+        old_hashes: SubtreeHashes,
+        new_root: xml.Element,
+        new_hashes: SubtreeHashes,
+    ) -> None:
+        self.old = _Side(old_root, old_hashes)
+        self.new = _Side(new_root, new_hashes)
+        self.result = MapDiff()
+        # Unmatched children, with their path
+        self._removed: List[Tuple[xml.Element, str]] = []
+        self._added: List[Tuple[xml.Element, str]] = []
+        # Date nodes whose subtree changed, to compare their time entries
+        self._old_dates: List[xml.Element] = []
+        self._new_dates: List[xml.Element] = []
+
+    def diff(self) -> MapDiff:
+        self._compare(self.old.root, self.new.root, _name(self.new.root))
+        self._match_moves()
+        self._diff_entries()
+        return self.result
+
+    def _compare(self, old: xml.Element, new: xml.Element, path: str) -> None:
+        pending = [(old, new, path)]
+        while pending:
+            old, new, path = pending.pop()
+            if self.old.hashes[old] == self.new.hashes[new]:
+                continue
+            if _is_date(old):
+                self._old_dates.append(old)
+            if _is_date(new):
+                self._new_dates.append(new)
+            for detail in _content_changes(old, new):
+                self._report("edited", path, detail)
+
+            pairs, new_order = self._match_children(old, new, path)
+            if [new_child for _, new_child in pairs] != new_order:
+                self._report("reordered", path)
+            pending.extend(
+                (old_child, new_child, path + PATH_SEPARATOR + _name(new_child))
+                for old_child, new_child in reversed(pairs)
+            )
+
+    def _match_children(
+        self, old: xml.Element, new: xml.Element, path: str
+    ) -> Tuple[List[Tuple[xml.Element, xml.Element]], List[xml.Element]]:
+        """Pair the children of two matched nodes, by ID and then by digest.
+
+        Unpaired children are kept for `_match_moves`.
+
+        :return: the pairs in the order of `old`, and the paired children of
+            `new` in their own order
+        """
+        old_children = NodeTreeHelper.get_node_children(old)
+        new_children = NodeTreeHelper.get_node_children(new)
+        new_by_id = {child.get("ID"): child for child in new_children}
+        paired: Dict[xml.Element, xml.Element] = {}
+        for child in old_children:
+            match = new_by_id.get(child.get("ID")) if child.get("ID") else None
+            if match is not None:
+                paired[child] = match
+
+        if len(paired) < len(old_children):
+            matched = set(paired.values())
+            new_by_digest: Dict[bytes, List[xml.Element]] = {}
+            for child in new_children:
+                if child not in matched:
+                    new_by_digest.setdefault(self.new.hashes[child], []).append(child)
+            for child in old_children:
+                candidates = new_by_digest.get(self.old.hashes[child])
+                if child not in paired and candidates:
+                    paired[child] = candidates.pop(0)
+
+        matched = set(paired.values())
+        self._removed.extend(
+            (child, path + PATH_SEPARATOR + _name(child))
+            for child in old_children
+            if child not in paired
+        )
+        self._added.extend(
+            (child, path + PATH_SEPARATOR + _name(child))
+            for child in new_children
+            if child not in matched
+        )
+        return (
+            [(child, paired[child]) for child in old_children if child in paired],
+            [child for child in new_children if child in matched],
+        )
+
+    def _match_moves(self) -> None:
+        """Report unmatched children as moved, added or removed.
+
+        Moved nodes are compared in turn, which may leave more unmatched
+        children, so this runs until none are left.
+        """
+        while self._added or self._removed:
+            added, self._added = self._added, []
+            removed, self._removed = self._removed, []
+            removed_nodes = {old for old, _ in removed}
+            moves: List[Tuple[xml.Element, xml.Element, str]] = []
+
+            for new, new_path in added:
+                old = self.old.find_id(new.get("ID"))
+                if old is not None and old in removed_nodes:
+                    removed_nodes.discard(old)
+                    moves.append((old, new, new_path))
+            moved_new = {new for _, new, _ in moves}
+            added = [(new, path) for new, path in added if new not in moved_new]
+            removed = [(old, path) for old, path in removed if old in removed_nodes]
+
+            removed_by_digest: Dict[bytes, List[Tuple[xml.Element, str]]] = {}
+            for old, old_path in removed:
+                removed_by_digest.setdefault(self.old.hashes[old], []).append(
+                    (old, old_path)
+                )
+            still_added: List[Tuple[xml.Element, str]] = []
+            for new, new_path in added:
+                candidates = removed_by_digest.get(self.new.hashes[new])
+                if candidates:
+                    old, _ = candidates.pop(0)
+                    removed_nodes.discard(old)
+                    moves.append((old, new, new_path))
+                else:
+                    still_added.append((new, new_path))
+
+            for old, old_path in removed:
+                if old in removed_nodes:
+                    self._report("removed", old_path, _count(old))
+                    self._old_dates.extend(_date_nodes(old))
+            for new, new_path in still_added:
+                self._report("added", new_path, _count(new))
+                self._new_dates.extend(_date_nodes(new))
+            for old, new, new_path in moves:
+                self._report("moved", self.old.path(old), f"to {new_path}")
+                self._compare(old, new, new_path)
+
+    def _diff_entries(self) -> None:
+        old_counts, old_entries = _entries(self._old_dates)
+        new_counts, new_entries = _entries(self._new_dates)
+        changes = self.result.entries
+        for key, count in (old_counts - new_counts).items():
+            changes.extend([EntryChange("-", old_entries[key])] * count)
+        for key, count in (new_counts - old_counts).items():
+            changes.extend([EntryChange("+", new_entries[key])] * count)
+        changes.sort(key=lambda change: (change.entry.start, change.sign == "+"))
+
+    def _report(self, kind: str, path: str, detail: str = "") -> None:
+        self.result.nodes.append(NodeChange(kind, path, detail))
+
+
+_EntryKey = Tuple[object, ...]
+
+
+def _entries(
+    date_nodes: List[xml.Element],
+) -> Tuple[Counter[_EntryKey], Dict[_EntryKey, TaskEntry]]:
+    """Count the time entries under the date nodes by content.
+
+    :return: the count of each entry, and one entry for each count
+    """
+    seen = set()
+    counts: Counter[_EntryKey] = Counter()
+    entries: Dict[_EntryKey, TaskEntry] = {}
+    for date_node in date_nodes:
+        for start_node, entry in TimeEntryCollector.iter_entry_nodes(date_node):
+            # A date node can be nested in another changed date node
+            if id(start_node) in seen:
+                continue
+            seen.add(id(start_node))
+            key = (
+                entry.date,
+                entry.start,
+                entry.end,
+                entry.section_name,
+                entry.project,
+                entry.task_name,
+                tuple(entry.tags),
+            )
+            counts[key] += 1
+            entries.setdefault(key, entry)
+    return counts, entries
+
+
+def _content_changes(old: xml.Element, new: xml.Element) -> List[str]:
+    """Describe how the own content (not the children) of a node changed."""
+    changes = []
+    if old.get("TEXT") != new.get("TEXT"):
+        changes.append(f"text {old.get('TEXT')!r} -> {new.get('TEXT')!r}")
+    if old.get("OBJECT") != new.get("OBJECT"):
+        changes.append(f"object {old.get('OBJECT')!r} -> {new.get('OBJECT')!r}")
+    old_icons = NodeTreeHelper.extract_tags_from_node(old)
+    new_icons = NodeTreeHelper.extract_tags_from_node(new)
+    if old_icons != new_icons:
+        changes.append(f"icons {old_icons} -> {new_icons}")
+    old_rich, new_rich = _richcontent(old), _richcontent(new)
+    for kind in sorted(old_rich.keys() | new_rich.keys()):
+        if kind not in old_rich:
+            changes.append(f"{kind.lower()} added")
+        elif kind not in new_rich:
+            changes.append(f"{kind.lower()} removed")
+        elif old_rich[kind] != new_rich[kind]:
+            changes.append(f"{kind.lower()} changed")
+    return changes
+
+
+def _richcontent(node: xml.Element) -> Dict[str, bytes]:
+    return {
+        child.get("TYPE", ""): xml.tostring(child)
+        for child in node
+        if child.tag == "richcontent"
+    }
+
+
+def _is_date(node: xml.Element) -> bool:
+    return DateReader.read_date(node) is not None and not (
+        DateTimeReader.is_datetime_node(node)
+    )
+
+
+def _date_nodes(root: xml.Element) -> List[xml.Element]:
+    return [node for node in root.iter("node") if _is_date(node)]
+
+
+def _count(node: xml.Element) -> str:
+    size = sum(1 for _ in node.iter("node"))
+    return f"{size} nodes" if size > 1 else ""
+
+
+def _name(node: xml.Element) -> str:
+    return node.get("TEXT", "")
@@ -2,21 +2,43 @@ import sys
 import xml.etree.ElementTree as xml
 from typing import Any, Optional, TextIO
 
+from mindmap.cache import CacheStats, NodePropertyCache
+from mindmap.phases import PhaseRecorder
+
 
 class MindmapExporter:
     def __init__(self, output: Optional[TextIO] = None) -> None:
-        self.out = output if output is not None else sys.stdout
+        self._output = output
         self.lines: list[str] = []
         """
         The parsed result of the XML tree
         :type: Any - depends on the exporter
         """
         self.result: Any = None
+        """
+        Hit and miss counters of the node property cache active during the last
+        export, if any
+        """
+        self.cache_stats: Optional[CacheStats] = None
+
+    @property
+    def out(self) -> TextIO:
+        """
+        The output stream; sys.stdout is looked up when printing if none was given
+        """
+        return self._output if self._output is not None else sys.stdout
 
     def export(self, tree: xml.Element) -> None:
-        self.parse(tree)
-        self.lines = self.format()
-        self.print()
+        with PhaseRecorder.phase("parse"):
+            self.parse(tree)
+        with PhaseRecorder.phase("format"):
+            self.lines = self.format()
+        with PhaseRecorder.phase("print"):
+            self.print()
+        # Node properties are only memoized when the caller activated a cache,
+        # to share them between several passes over the same tree
+        cache = NodePropertyCache.current()
+        self.cache_stats = cache.stats() if cache is not None else None
 
     def parse(self, tree: xml.Element) -> None:
         """
@@ -39,3 +61,10 @@ class MindmapExporter:
         :return: list of formatted output lines
         """
         return self.lines.copy()
+
+    def commit(self) -> None:
+        """
+        Called by the caller once the output of the export was written, to
+        persist state that must only move forward when the output was
+        delivered. Does nothing by default
+        """
@@ -0,0 +1,221 @@
+"""
+Select the nodes of a map by icon tag, TODO marker, section, date range and
+text, and cut the map down to them so any formatter can render the result.
+
+`NodeIndex` walks the map once and keeps, for every attribute a query can
+filter on, the set of nodes having it. A query intersects those sets,
+smallest first, and only matches the text regex against what is left.
+"""
+
+from __future__ import annotations
+
+import bisect
+import re
+import xml.etree.ElementTree as xml
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, List, Optional, Set, Tuple
+
+from mindmap.reader import DateReader, NodeTreeHelper
+from worklog.format import TodoHelper
+
+SECTIONS = ("WORKLOG", "TIMES", "TODO", "LEARNLOG")
+
+
+@dataclass(frozen=True)
+class NodeFilter:
+    """Conditions a node must all meet to be selected."""
+
+    # Icon tags the node must all have, as `stop-sign` or `StopSign`
+    tags: Tuple[str, ...] = ()
+    todo: bool = False
+    # Sections the node may be in (any of them)
+    sections: Tuple[str, ...] = ()
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+    # Searched in the TEXT of the node
+    pattern: Optional[str] = None
+
+    def is_empty(self) -> bool:
+        return self == NodeFilter()
+
+
+@dataclass(frozen=True)
+class NodeMatch:
+    """A selected node, with where it was found."""
+
+    node: xml.Element
+    date: Optional[date]
+    section: Optional[str]
+    path: str
+    tags: List[str]
+
+    def format_line(self) -> str:
+        """Format as: YYYY-MM-DD [SECTION] path :tags:"""
+        day = self.date.isoformat() if self.date else "-" * 10
+        section = f" [{self.section}]" if self.section else ""
+        tags = f" :{':'.join(self.tags)}:" if self.tags else ""
+        return f"{day}{section} {self.path}{tags}"
+
+
+class NodeIndex:
+    """Attributes of the nodes of one map, indexed by node position.
+
+    Nodes are numbered in document order; the root is 0.
+    """
+
+    def __init__(self, root: xml.Element) -> None:
+        self.nodes: List[xml.Element] = []
+        self.parents: List[int] = []
+        self.dates: List[Optional[date]] = []
+        self.sections: List[Optional[str]] = []
+        self.by_tag: Dict[str, Set[int]] = {}
+        self.by_section: Dict[str, Set[int]] = {}
+        self.todo: Set[int] = set()
+        # (date, position) of the dated nodes, sorted for range lookups
+        self._by_date: List[Tuple[date, int]] = []
+        self._build(root)
+
+    def _build(self, root: xml.Element) -> None:
+        # (node, parent position, section the node is in)
+        pending: List[Tuple[xml.Element, int, Optional[str]]] = [(root, -1, None)]
+        while pending:
+            node, parent, section = pending.pop()
+            position = len(self.nodes)
+            self.nodes.append(node)
+            self.parents.append(parent)
+
+            date_value = DateReader.read_date(node)
+            if date_value is not None:
+                node_date: Optional[date] = date_value.value
+            else:
+                node_date = self.dates[parent] if parent >= 0 else None
+            self.dates.append(node_date)
+            if node_date is not None:
+                self._by_date.append((node_date, position))
+
+            self.sections.append(section)
+            if section is not None:
+                self.by_section.setdefault(section, set()).add(position)
+            for tag in NodeTreeHelper.extract_tags_from_node(node):
+                self.by_tag.setdefault(_tag_key(tag), set()).add(position)
+            if TodoHelper.is_todo(node):
+                self.todo.add(position)
+
+            # A section is a child of a date node; its descendants are in it
+            if (
+                section is None
+                and parent >= 0
+                and _is_section(self.nodes[parent], node)
+            ):
+                section = node.get("TEXT", "")
+            pending.extend(
+                (child, position, section)
+                for child in reversed(node)
+                if child.tag == "node"
+            )
+        self._by_date.sort()
+
+    def select(self, node_filter: NodeFilter) -> List[int]:
+        """Return the positions of the nodes meeting the filter, in document order."""
+        candidates: List[Set[int]] = [
+            self.by_tag.get(_tag_key(tag), set()) for tag in node_filter.tags
+        ]
+        if node_filter.todo:
+            candidates.append(self.todo)
+        if node_filter.sections:
+            candidates.append(
+                set().union(
+                    *(self.by_section.get(name, set()) for name in node_filter.sections)
+                )
+            )
+        if node_filter.date_from is not None or node_filter.date_to is not None:
+            candidates.append(self._between(node_filter.date_from, node_filter.date_to))
+
+        if candidates:
+            candidates.sort(key=len)
+            selected = candidates[0].intersection(*candidates[1:])
+        else:
+            selected = set(range(len(self.nodes)))
+        if node_filter.pattern is not None:
+            pattern = re.compile(node_filter.pattern)
+            selected = {
+                position
+                for position in selected
+                if pattern.search(self.nodes[position].get("TEXT", ""))
+            }
+        return sorted(selected)
+
+    def _between(self, start: Optional[date], end: Optional[date]) -> Set[int]:
+        low = 0 if start is None else bisect.bisect_left(self._by_date, (start, -1))
+        high = (
+            len(self._by_date)
+            if end is None
+            else bisect.bisect_right(self._by_date, (end, len(self.nodes)))
+        )
+        return {position for _, position in self._by_date[low:high]}
+
+    def match(self, position: int) -> NodeMatch:
+        node = self.nodes[position]
+        return NodeMatch(
+            node=node,
+            date=self.dates[position],
+            section=self.sections[position],
+            path=self.path(position),
+            tags=NodeTreeHelper.extract_tags_from_node(node),
+        )
+
+    def path(self, position: int) -> str:
+        names = []
+        while position >= 0:
+            names.append(self.nodes[position].get("TEXT", ""))
+            position = self.parents[position]
+        return " / ".join(reversed(names))
+
+    def prune(self, positions: List[int]) -> xml.Element:
+        """Return a copy of the tree with only the given nodes and their ancestors.
+
+        The given nodes keep their whole subtree; ancestors keep their own
+        content (icons, notes...) but only the children leading to them, so
+        formatters render the selection in its context.
+        """
+        selected = set(positions)
+        if 0 in selected:
+            return self.nodes[0]
+        kept: Set[int] = set()
+        for position in positions:
+            parent = self.parents[position]
+            while parent >= 0 and parent not in kept:
+                kept.add(parent)
+                parent = self.parents[parent]
+
+        copies: Dict[int, xml.Element] = {0: _shallow_copy(self.nodes[0])}
+        for position in sorted(kept | selected):
+            parent_copy = copies.get(self.parents[position])
+            if position == 0 or parent_copy is None:
+                # Inside a selected subtree, already included
+                continue
+            if position in selected:
+                parent_copy.append(self.nodes[position])
+            else:
+                copies[position] = _shallow_copy(self.nodes[position])
+                parent_copy.append(copies[position])
+        return copies[0]
+
+
+def _is_section(parent: xml.Element, node: xml.Element) -> bool:
+    return node.get("TEXT", "") in SECTIONS and (
+        DateReader.read_date(parent) is not None
+    )
+
+
+def _tag_key(tag: str) -> str:
+    """Compare icon tags regardless of case and dashes (stop-sign = StopSign)."""
+    return tag.replace("-", "").replace("_", "").lower()
+
+
+def _shallow_copy(node: xml.Element) -> xml.Element:
+    copy = xml.Element(node.tag, node.attrib)
+    copy.text = node.text
+    copy.extend(child for child in node if child.tag != "node")
+    return copy
@@ -1,9 +1,9 @@
 from mindmap_exporter import MindmapExporter
 import xml.etree.ElementTree as xml
 from datetime import datetime, date
-from typing import Optional, List, Dict, Any, Tuple
+from typing import Optional, List, Dict, Any, Iterator, Tuple
 from mindmap.reader import DateReader, DateTimeReader, NodeTreeHelper
-from worklog.helpers import DurationFormatter
+from worklog.helpers import DateTimeHelper, DurationFormatter
 from worklog.format import TodoHelper
 
 
@@ -23,6 +23,42 @@ class Formatter(MindmapExporter, NodeTreeHelper):
             all_projects, all_worklog_entries, dates_seen
         )
 
+    def iter_date_blocks(self) -> Iterator[Tuple[date, list[str]]]:
+        """Yield the dates of the parsed map in order, each with its lines.
+
+        The lines are those `format()` puts under the `** PROJ [date]`
+        heading, without the blank lines ending the date. Each date is
+        formatted from its own projects and entries only, so the dates can be
+        consumed one at a time.
+        """
+        if self.result is None:
+            return
+        all_projects, all_worklog_entries, dates_seen = self.result
+        projects_by_date: Dict[date, List[Dict[str, Any]]] = {}
+        for project_info in all_projects:
+            project_dates = {
+                entry["start"].date()
+                for task_info in project_info["tasks"]
+                for entry in task_info["entries"]
+            }
+            for date_val in project_dates:
+                projects_by_date.setdefault(date_val, []).append(project_info)
+        entries_by_date: Dict[date, List[Dict[str, Any]]] = {}
+        for entry in all_worklog_entries:
+            entries_by_date.setdefault(entry["start"].date(), []).append(entry)
+
+        for date_val in sorted(dates_seen):
+            lines = self._format_orgmode_output(
+                projects_by_date.get(date_val, []),
+                entries_by_date.get(date_val, []),
+                [date_val],
+            )
+            # Skip the Worklog and date headings
+            block = lines[2:]
+            while block and not block[-1]:
+                block.pop()
+            yield date_val, block
+
     def _format_orgmode_output(
         self,
         all_projects: List[Dict[str, Any]],
@@ -331,38 +367,8 @@ class Formatter(MindmapExporter, NodeTreeHelper):
         return None
 
     def _get_task_description(self, time_node: xml.Element) -> tuple[str, list[str]]:
-        children = list(time_node)
-        if len(children) >= 1:
-            tags = []
-            for child in children:
-                if child.tag == "icon":
-                    tags.append(
-                        "".join(
-                            list(
-                                map(
-                                    lambda x: x.title(),
-                                    child.attrib["BUILTIN"].split("-"),
-                                )
-                            )
-                        )
-                    )
-                elif child.tag == "node":
-                    child_time = DateTimeReader.read_datetime(child)
-                    if not child_time:
-                        text = child.get("TEXT", "").strip()
-                        if text:
-                            return text, tags
-                    else:
-                        for grandchild in child:
-                            if grandchild.tag == "node":
-                                grandchild_time = DateTimeReader.read_datetime(
-                                    grandchild
-                                )
-                                if not grandchild_time:
-                                    text = grandchild.get("TEXT", "").strip()
-                                    if text:
-                                        return text, tags
-        return "", []
+        """Backward-compatible wrapper for DateTimeHelper.get_task_description()."""
+        return DateTimeHelper.get_task_description(time_node)
 
     def _extract_comments(self, node: xml.Element) -> List[str]:
         comments: List[str] = []
@@ -1,11 +1,13 @@
 from mindmap_exporter import MindmapExporter
 import xml.etree.ElementTree as xml
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, date
-from typing import Optional, List, Any
-from html.parser import HTMLParser
-from mindmap.reader import DateReader, DateTimeReader, NodeTreeHelper
-from mindmap.models import DateTimeValue, TimeEntry, Section, DateEntry
+from typing import Any, Dict, Iterator, Optional, List, TextIO, Tuple
+from mindmap.reader import DateReader, DateTimeReader, NodeTreeHelper, NoteReader
+from mindmap.models import DateTimeValue, DateValue, TimeEntry, Section, DateEntry
 from worklog.format import TodoHelper
+from worklog.helpers import ClassifiedChildren, HierarchicalNodeProcessor
 
 
 class Formatter(MindmapExporter, NodeTreeHelper):
@@ -21,6 +23,13 @@ class Formatter(MindmapExporter, NodeTreeHelper):
     - Special handling for TODO section name (no PROJ prefix)
     """
 
+    def __init__(self, output: Optional[TextIO] = None, jobs: int = 1) -> None:
+        """
+        :param jobs: number of processes rendering date blocks (1: serial)
+        """
+        super().__init__(output)
+        self.jobs = jobs
+
     def parse(self, tree: xml.Element) -> None:
         """Find all date nodes and extract sections."""
         date_nodes = DateReader.find_all_date_nodes(tree)
@@ -42,18 +51,52 @@ class Formatter(MindmapExporter, NodeTreeHelper):
 
     def format(self) -> list[str]:
         """Format dates and sections into orgmode."""
-        lines = []
+        lines: List[str] = []
         sorted_dates = sorted(self.result, key=lambda x: x.sort_key())
 
-        for date_entry in sorted_dates:
-            lines.append(f"* {date_entry.date.format_header()}")
+        if self.jobs > 1 and len(sorted_dates) > 1:
+            blocks = self._format_date_entries_in_pool(sorted_dates)
+        else:
+            blocks = map(self._format_date_entry, sorted_dates)
 
-            for idx, section in enumerate(date_entry.sections):
-                is_last = idx == len(date_entry.sections) - 1
-                self._process_section(section, lines, is_last=is_last)
+        for block in blocks:
+            lines.extend(block)
 
         return lines
 
+    def _format_date_entry(self, date_entry: DateEntry) -> List[str]:
+        """Format one date with its sections. Dates are rendered independently."""
+        lines = [f"* {date_entry.date.format_header()}"]
+
+        for idx, section in enumerate(date_entry.sections):
+            is_last = idx == len(date_entry.sections) - 1
+            self._process_section(section, lines, is_last=is_last)
+
+        return lines
+
+    def _format_date_entries_in_pool(
+        self, sorted_dates: List[DateEntry]
+    ) -> Iterator[List[str]]:
+        """Render date blocks in a process pool, yielding them in the given order.
+
+        Dates are sent to the workers in chunks of compact picklable payloads,
+        one DatePayload per date, so the workers share no state with the parent
+        whatever the start method of the platform.
+        """
+        chunk = max(1, len(sorted_dates) // (self.jobs * 4))
+        ranges = [
+            (start, min(start + chunk, len(sorted_dates)))
+            for start in range(0, len(sorted_dates), chunk)
+        ]
+
+        payloads = [
+            [DatePayload.pack(date_entry) for date_entry in sorted_dates[lo:hi]]
+            for lo, hi in ranges
+        ]
+        with ProcessPoolExecutor(max_workers=self.jobs) as executor:
+            for blocks in executor.map(_render_date_payloads, payloads):
+                yield from blocks
+
     def _process_section(
         self, section: Section, lines: List[str], is_last: bool = False
     ) -> None:
@@ -188,110 +231,39 @@ class Formatter(MindmapExporter, NodeTreeHelper):
         self, node: xml.Element, lines: List[str], level: int
     ) -> None:
         """Extract richcontent HTML and render as list items."""
-        for child in node:
-            if child.tag == "richcontent":
-                content_type = child.attrib.get("TYPE", "")
-                if content_type == "NOTE":
-                    # Find the HTML content
-                    html_elem = child.find("html")
-                    if html_elem is not None:
-                        html_text = xml.tostring(html_elem, encoding="unicode")
-                        # Parse HTML and extract list items
-                        list_items = self._parse_html_list(html_text)
-
-                        # Check if any item has indentation - if so, indent all items uniformly
-                        has_indented_item = any(
-                            item.startswith("  ") for item in list_items
-                        )
-
-                        # Richcontent is always rendered at level 0
-                        for idx, item in enumerate(list_items):
-                            stripped = item.lstrip(" ")
-                            indent = item[: len(item) - len(stripped)]
-
-                            if has_indented_item:
-                                # If there are nested items, indent all items uniformly
-                                if idx == 0:
-                                    # First item (usually the parent of any nested items)
-                                    lines.append(f"- {stripped}")
-                                else:
-                                    # All other items are indented
-                                    lines.append(f"  - {stripped}")
-                            else:
-                                # No indentation pattern - render as-is
-                                if indent:
-                                    lines.append(f"{indent}- {stripped}")
-                                else:
-                                    lines.append(f"- {stripped}")
-                        # Only process the first richcontent NOTE
-                        break
+        # Only the first richcontent NOTE is rendered
+        html_elem = NoteReader.find_note_html(node)
+        if html_elem is None:
+            return
+
+        list_items = NoteReader.read_list_items(html_elem)
+
+        # Check if any item is nested - if so, indent all items uniformly
+        has_indented_item = any(depth > 0 for depth, _ in list_items)
+
+        # Richcontent is always rendered at level 0
+        for idx, (depth, text) in enumerate(list_items):
+            if has_indented_item:
+                # If there are nested items, indent all items uniformly
+                if idx == 0:
+                    # First item (usually the parent of any nested items)
+                    lines.append(f"- {text}")
+                else:
+                    # All other items are indented
+                    lines.append(f"  - {text}")
+            else:
+                lines.append(f"- {text}")
 
     def _parse_html_list(self, html_text: str) -> List[str]:
-        """Parse HTML and extract list item texts recursively, maintaining nesting."""
-
-        class HTMLListParser(HTMLParser):
-            def __init__(self) -> None:
-                super().__init__()
-                self.root: List[dict[str, Any]] = []  # Root level items
-                self.li_stack: List[dict[str, Any]] = []  # Stack of open list items
-                self.ul_depth = 0  # Current nesting depth
-
-            def handle_starttag(
-                self, tag: str, attrs: List[tuple[str, Optional[str]]]
-            ) -> None:
-                if tag == "ul":
-                    self.ul_depth += 1
-                elif tag == "li":
-                    # Start of a new list item
-                    new_item = {"text": "", "depth": self.ul_depth, "children": []}
-                    # Add to parent's children or to root
-                    if self.li_stack and self.li_stack[-1]["depth"] < self.ul_depth:
-                        self.li_stack[-1]["children"].append(new_item)
-                    else:
-                        self.root.append(new_item)
-                    self.li_stack.append(new_item)
-
-            def handle_endtag(self, tag: str) -> None:
-                if tag == "ul":
-                    self.ul_depth -= 1
-                elif tag == "li":
-                    # End of list item
-                    if self.li_stack:
-                        item = self.li_stack.pop()
-                        item["text"] = item["text"].strip()
-
-            def handle_data(self, data: str) -> None:
-                # Add text to the current item
-                if self.li_stack:
-                    self.li_stack[-1]["text"] += data
-
-        parser = HTMLListParser()
+        """Parse HTML and extract list item texts, indented by nesting depth."""
         try:
-            parser.feed(html_text)
-        except Exception:
-            # If parsing fails, return empty list
-            pass
-
-        # Convert tree to flat list, returning items with depth info
-        def flatten_tree(
-            items: List[dict[str, Any]], depth: int = 0
-        ) -> List[tuple[int, str]]:
-            result = []
-            for item in items:
-                if item["text"]:
-                    result.append((depth, item["text"]))
-                # Add children
-                if item["children"]:
-                    result.extend(flatten_tree(item["children"], depth + 1))
-            return result
-
-        # Convert to final format (indentation in output)
-        flat_items = flatten_tree(parser.root)
-        result = []
-        for depth, text in flat_items:
-            indent = "  " * depth
-            result.append(f"{indent}{text}" if depth > 0 else text)
-        return result
+            html_elem = xml.fromstring(html_text)
+        except xml.ParseError:
+            return []
+        return [
+            f"{'  ' * depth}{text}"
+            for depth, text in NoteReader.read_list_items(html_elem)
+        ]
 
     def _process_hierarchical_section(
         self,
@@ -299,6 +271,7 @@ class Formatter(MindmapExporter, NodeTreeHelper):
         lines: List[str],
         level: int = 0,
         section_name: str = "",
+        children: Optional[ClassifiedChildren] = None,
     ) -> None:
         """
         Process section hierarchically with 3-phase ordering.
@@ -306,59 +279,52 @@ class Formatter(MindmapExporter, NodeTreeHelper):
         - Non-leaf nodes → headers
         - TODO nodes → TODO headers
         """
-        children = NodeTreeHelper.get_node_children(section_node)
+        if children is None:
+            children = HierarchicalNodeProcessor.classify_children(section_node)
 
-        # Phase 1: Leaf items (non-TODO)
-        leaf_non_todo = [
-            c
-            for c in children
-            if NodeTreeHelper.is_leaf(c) and not TodoHelper.is_todo(c)
-        ]
-        for child in leaf_non_todo:
+        for child, is_leaf, is_todo in children.in_order():
             self._format_node_hierarchical(
-                child, lines, level, section_name=section_name
-            )
-
-        # Phase 2: Non-leaf children (non-TODO)
-        nonleaf_non_todo = [
-            c
-            for c in children
-            if not NodeTreeHelper.is_leaf(c) and not TodoHelper.is_todo(c)
-        ]
-        for child in nonleaf_non_todo:
-            self._format_node_hierarchical(
-                child, lines, level, section_name=section_name
-            )
-
-        # Phase 3: TODO children
-        todos = [c for c in children if TodoHelper.is_todo(c)]
-        for child in todos:
-            self._format_node_hierarchical(
-                child, lines, level, section_name=section_name
+                child,
+                lines,
+                level,
+                section_name=section_name,
+                is_leaf=is_leaf,
+                is_todo=is_todo,
             )
 
     def _format_node_hierarchical(
-        self, node: xml.Element, lines: List[str], level: int, section_name: str = ""
+        self,
+        node: xml.Element,
+        lines: List[str],
+        level: int,
+        section_name: str = "",
+        is_leaf: Optional[bool] = None,
+        is_todo: Optional[bool] = None,
     ) -> None:
         """Format a single node hierarchically."""
         text = node.attrib.get("TEXT", "")
-        is_todo = TodoHelper.is_todo(node)
-        is_leaf = NodeTreeHelper.is_leaf(node)
+        # Flags are precomputed when the parent classified its children
+        if is_todo is None:
+            is_todo = TodoHelper.is_todo(node)
+        if is_leaf is None:
+            is_leaf = NodeTreeHelper.is_leaf(node)
 
         # Clean TODO marker
         if is_todo:
             text = TodoHelper.clean_todo_text(text)
 
+        children: Optional[ClassifiedChildren] = None
+        if not is_leaf:
+            children = HierarchicalNodeProcessor.classify_children(node)
+
         # For non-leaf nodes at level 0 in WORKLOG or LEARNLOG, check if all children are leaves
-        # If so, format as list items; otherwise, format as headers
-        is_simple_node = False
-        if not is_leaf and level == 0 and section_name in ("WORKLOG", "LEARNLOG"):
-            children = NodeTreeHelper.get_node_children(node)
-            all_children_are_leaves = all(
-                NodeTreeHelper.is_leaf(c) or TodoHelper.is_todo(c) for c in children
-            )
-            if all_children_are_leaves:
-                is_simple_node = True
+        # (or TODOs). If so, format as list items; otherwise, format as headers
+        is_simple_node = (
+            children is not None
+            and level == 0
+            and section_name in ("WORKLOG", "LEARNLOG")
+            and not children.branches
+        )
 
         # Determine format
         if is_todo:
@@ -383,12 +349,12 @@ class Formatter(MindmapExporter, NodeTreeHelper):
                 lines.append(f"{stars} PROJ {text}")
 
         # Process children recursively for non-leaf nodes
-        if not is_leaf:
+        if children is not None:
             # If this node became a header (not a list item), keep the same level for children
             # Otherwise, increment level for indentation
             next_level = level if not is_simple_node else level + 1
             self._process_hierarchical_section(
-                node, lines, next_level, section_name=section_name
+                node, lines, next_level, section_name=section_name, children=children
             )
 
     def _find_end_time_internal(
@@ -491,3 +457,74 @@ class Formatter(MindmapExporter, NodeTreeHelper):
     def _extract_tags_from_node(self, node: xml.Element) -> List[str]:
         """Backward-compatible wrapper for NodeTreeHelper.extract_tags_from_node()."""
         return NodeTreeHelper.extract_tags_from_node(node)
+
+
+# Element packed as (tag, attributes, text, tail, children)
+PackedElement = Tuple[str, Dict[str, str], Optional[str], Optional[str], List[Any]]
+
+# Elements and attributes the rendering reads; richcontent is kept whole
+_RENDERED_TAGS = ("node", "icon", "richcontent")
+_RENDERED_ATTRIBUTES = ("TEXT", "OBJECT", "BUILTIN", "TYPE")
+
+
+@dataclass(frozen=True)
+class DatePayload:
+    """Picklable form of a DateEntry: the date and its packed sections.
+
+    Only the elements and attributes read by the rendering are kept.
+    """
+
+    date: DateValue
+    sections: List[Tuple[str, PackedElement]]
+
+    @staticmethod
+    def pack(date_entry: DateEntry) -> "DatePayload":
+        return DatePayload(
+            date=date_entry.date,
+            sections=[
+                (section.name, _pack_element(section.node, keep_all=False))
+                for section in date_entry.sections
+            ],
+        )
+
+    def unpack(self) -> DateEntry:
+        return DateEntry(
+            date=self.date,
+            sections=[
+                Section(name=name, node=_unpack_element(packed))
+                for name, packed in self.sections
+            ],
+        )
+
+
+def _pack_element(elem: xml.Element, keep_all: bool) -> PackedElement:
+    if keep_all:
+        attrib = dict(elem.attrib)
+    else:
+        attrib = {k: v for k, v in elem.attrib.items() if k in _RENDERED_ATTRIBUTES}
+    return (
+        elem.tag,
+        attrib,
+        elem.text,
+        elem.tail,
+        [
+            _pack_element(child, keep_all or child.tag == "richcontent")
+            for child in elem
+            if keep_all or child.tag in _RENDERED_TAGS
+        ],
+    )
+
+
+def _unpack_element(packed: PackedElement) -> xml.Element:
+    tag, attrib, text, tail, children = packed
+    elem = xml.Element(tag, attrib)
+    elem.text = text
+    elem.tail = tail
+    elem.extend(_unpack_element(child) for child in children)
+    return elem
+
+
+def _render_date_payloads(payloads: List[DatePayload]) -> List[List[str]]:
+    """Render date blocks sent as payloads."""
+    formatter = Formatter()
+    return [formatter._format_date_entry(payload.unpack()) for payload in payloads]
@@ -1,8 +1,9 @@
 from mindmap_exporter import MindmapExporter
 import xml.etree.ElementTree as xml
-from typing import List
+from typing import List, Optional
 from mindmap.reader import NodeTreeHelper
 from worklog.format import TodoHelper
+from worklog.helpers import HierarchicalNodeProcessor
 
 
 class Formatter(MindmapExporter, NodeTreeHelper):
@@ -15,7 +16,13 @@ class Formatter(MindmapExporter, NodeTreeHelper):
         """Return the formatted lines (already populated during parse)."""
         return self.lines.copy()
 
-    def _parse_node(self, node: xml.Element, level: int) -> None:
+    def _parse_node(
+        self,
+        node: xml.Element,
+        level: int,
+        is_leaf: Optional[bool] = None,
+        is_todo: Optional[bool] = None,
+    ) -> None:
         # Skip elements that don't have TEXT attribute (e.g., font, hook, edge elements)
         if "TEXT" not in node.attrib:
             # Still process children of non-TEXT elements
@@ -24,8 +31,11 @@ class Formatter(MindmapExporter, NodeTreeHelper):
             return
 
         text = node.attrib["TEXT"]
-        is_todo = TodoHelper.is_todo(node)
-        is_leaf = NodeTreeHelper.is_leaf(node)
+        # Flags are precomputed when the parent classified its children
+        if is_todo is None:
+            is_todo = TodoHelper.is_todo(node)
+        if is_leaf is None:
+            is_leaf = NodeTreeHelper.is_leaf(node)
 
         # Clean up TODO marker from text if needed
         if is_todo:
@@ -47,31 +57,11 @@ class Formatter(MindmapExporter, NodeTreeHelper):
             stars = "*" * level
             self.lines.append(f"{stars} PROJ {text}")
 
-        # Process children in three phases
-        children = NodeTreeHelper.get_node_children(node)
-
-        # Phase 1: leaf items (non-TODO)
-        leaf_non_todo = [
-            c
-            for c in children
-            if NodeTreeHelper.is_leaf(c) and not TodoHelper.is_todo(c)
-        ]
-        for child in leaf_non_todo:
-            self._parse_node(child, level + 1)
-
-        # Phase 2: non-leaf children (non-TODO)
-        nonleaf_non_todo = [
-            c
-            for c in children
-            if not NodeTreeHelper.is_leaf(c) and not TodoHelper.is_todo(c)
-        ]
-        for child in nonleaf_non_todo:
-            self._parse_node(child, level + 1)
-
-        # Phase 3: TODO children (leaf or non-leaf)
-        todos = [c for c in children if TodoHelper.is_todo(c)]
-        for child in todos:
-            self._parse_node(child, level + 1)
+        # Process children in three phases: leaf items (non-TODO),
+        # non-leaf children (non-TODO), then TODO children (leaf or non-leaf)
+        children = HierarchicalNodeProcessor.classify_children(node)
+        for child, child_is_leaf, child_is_todo in children.in_order():
+            self._parse_node(child, level + 1, child_is_leaf, child_is_todo)
 
     # ========== Backward-compatible wrapper methods (delegate to NodeTreeHelper) ==========
 
@@ -0,0 +1,224 @@
+"""Shared base of the outline formatters (markdown_outline, html_outline).
+
+The outline of the map is written as one document, or split into chunks, one
+file per top-level branch or per month of dates, with an index page linking
+them. Nodes are written to the output as the tree is walked, and each chunk
+file is closed before the next one is rendered, so only the parsed map is
+held in memory, whatever the size of the output.
+"""
+
+import os
+import re
+import xml.etree.ElementTree as xml
+from dataclasses import dataclass
+from datetime import date
+from itertools import groupby
+from typing import Iterator, List, Optional, TextIO, Tuple
+
+from mindmap.reader import DateReader, DateTimeReader
+from mindmap_exporter import MindmapExporter
+
+SPLITS = ("branch", "month")
+
+# The root branches holding no date node, with --split month
+OTHER_CHUNK = "other"
+
+
+@dataclass(frozen=True)
+class Chunk:
+    """A part of the outline written to its own file."""
+
+    key: str
+    title: str
+    nodes: List[xml.Element]
+
+
+@dataclass(frozen=True)
+class IndexEntry:
+    """A chunk file written, as linked from the index."""
+
+    title: str
+    file_name: str
+    nodes: int
+
+
+@dataclass(frozen=True)
+class ChunkStats:
+    """The chunk files written by one export."""
+
+    directory: str
+    chunks: int
+    nodes: int
+
+    def format_line(self) -> str:
+        return f"{self.chunks} chunks, {self.nodes} nodes written to {self.directory}"
+
+
+class OutlineExporter(MindmapExporter):
+    """
+    Writes the nodes of the map as a nested outline: the children of the
+    root as headings, the nodes under them as nested lists. Nodes without
+    TEXT (rich text nodes) are skipped, their children taking their place.
+
+    With a `chunk_dir`, the outline is split into chunk files written to
+    that directory, next to an index page, and the output only gets a
+    summary line.
+    """
+
+    extension = ""
+
+    def __init__(
+        self,
+        output: Optional[TextIO] = None,
+        chunk_dir: Optional[str] = None,
+        split: str = "branch",
+    ) -> None:
+        """
+        :param chunk_dir: directory the chunk files and the index are written
+            to; the outline is written to the output as one document if None
+        :param split: "branch" for a chunk per child of the root, "month" for
+            a chunk per month of date nodes
+        """
+        super().__init__(output)
+        if split not in SPLITS:
+            raise ValueError(f"Unknown split {split!r}, expected one of {SPLITS}")
+        self.chunk_dir = chunk_dir
+        self.split = split
+
+    def parse(self, tree: xml.Element) -> None:
+        self.result = tree
+
+    def format(self) -> list[str]:
+        # The outline is streamed by print()
+        return []
+
+    def print(self) -> None:
+        title = node_text(self.result) or "Mindmap"
+        if self.chunk_dir is None:
+            branches = [child for child in self.result if child.tag == "node"]
+            self.write_document(self.out, title, branches)
+            return
+
+        os.makedirs(self.chunk_dir, exist_ok=True)
+        index = "index" + self.extension
+        written: List[IndexEntry] = []
+        for chunk in iter_chunks(self.result, self.split):
+            file_name = chunk.key + self.extension
+            path = os.path.join(self.chunk_dir, file_name)
+            with open(path, "w", encoding="utf-8") as file:
+                nodes = self.write_document(file, chunk.title, chunk.nodes, index)
+            written.append(IndexEntry(chunk.title, file_name, nodes))
+        with open(os.path.join(self.chunk_dir, index), "w", encoding="utf-8") as file:
+            self.write_index(file, title, written)
+        stats = ChunkStats(
+            self.chunk_dir, len(written), sum(entry.nodes for entry in written)
+        )
+        print(stats.format_line(), file=self.out)
+
+    def write_document(
+        self,
+        out: TextIO,
+        title: str,
+        nodes: List[xml.Element],
+        index: Optional[str] = None,
+    ) -> int:
+        """Write the outline of `nodes` as a document: each node a heading,
+        its subtree a nested list.
+
+        :param index: file name of the index page to link back to
+        :return: the number of nodes written
+        """
+        raise NotImplementedError()
+
+    def write_index(self, out: TextIO, title: str, entries: List[IndexEntry]) -> None:
+        """Write the page linking the chunk files written."""
+        raise NotImplementedError()
+
+
+def iter_outline(
+    nodes: List[xml.Element], depth: int = 0
+) -> Iterator[Tuple[bool, int, xml.Element]]:
+    """Walk the subtrees of `nodes` in document order.
+
+    Yield (True, depth, node) when a node starts and, for the nodes with
+    children, (False, depth, node) after them. Nodes without TEXT are not
+    yielded, their children are at their depth.
+    """
+    stack: List[Tuple[bool, int, xml.Element]] = [
+        (True, depth, node) for node in reversed(nodes)
+    ]
+    while stack:
+        starting, node_depth, node = stack.pop()
+        if not starting:
+            yield False, node_depth, node
+            continue
+        children = [child for child in reversed(node) if child.tag == "node"]
+        if "TEXT" not in node.attrib:
+            stack.extend((True, node_depth, child) for child in children)
+            continue
+        yield True, node_depth, node
+        if children:
+            stack.append((False, node_depth, node))
+        stack.extend((True, node_depth + 1, child) for child in children)
+
+
+def iter_chunks(root: xml.Element, split: str) -> Iterator[Chunk]:
+    """Yield the chunks of the outline of the map, in the order of the index.
+
+    By branch, each child of the root is a chunk. By month, the date nodes
+    are sorted and grouped by month, each date with its subtree; the children
+    of the root holding no date node are put in a last chunk.
+    """
+    branches = [child for child in root if child.tag == "node"]
+    if split == "branch":
+        for index, branch in enumerate(branches, 1):
+            title = node_text(branch) or f"Branch {index}"
+            yield Chunk(f"{index:03d}-{_slug(title)}", title, [branch])
+        return
+
+    days: List[Tuple[date, xml.Element]] = []
+    others: List[xml.Element] = []
+    for branch in branches:
+        branch_days = _date_nodes(branch)
+        days.extend(branch_days)
+        if not branch_days:
+            others.append(branch)
+    days.sort(key=lambda day: day[0])
+    for (year, month), month_days in groupby(
+        days, key=lambda day: (day[0].year, day[0].month)
+    ):
+        month_start = date(year, month, 1)
+        yield Chunk(
+            f"{month_start:%Y-%m}",
+            f"{month_start:%B %Y}",
+            [node for _, node in month_days],
+        )
+
+    if others:
+        yield Chunk(OTHER_CHUNK, "Other", others)
+
+
+def _date_nodes(node: xml.Element) -> List[Tuple[date, xml.Element]]:
+    """Return the date nodes of the subtree, datetime nodes excluded."""
+    days = []
+    for date_node in DateReader.find_all_date_nodes(node):
+        date_value = DateReader.read_date(date_node)
+        if date_value is not None and not DateTimeReader.is_datetime_node(date_node):
+            days.append((date_value.value, date_node))
+    return days
+
+
+def node_text(node: xml.Element) -> str:
+    """Return the text of the node on one line."""
+    return " ".join(node.get("TEXT", "").split())
+
+
+def node_link(node: xml.Element) -> Optional[str]:
+    """Return the LINK of the node, unless it points to a node of the map."""
+    link = node.get("LINK")
+    return link if link and not link.startswith("#") else None
+
+
+def _slug(text: str) -> str:
+    """Return a file name part for `text`: lowercase words joined by '-'."""
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")[:40] or "node"
@@ -0,0 +1,181 @@
+"""
+Content-addressed cache of formatter outputs, and atomic output writes.
+
+An output is keyed by the digest of the input map, the formatter name, the
+source code of the formatter and of the project modules it imports, and the
+formatter options. On a hit the formatter does not run at all.
+"""
+
+from __future__ import annotations
+
+import ast
+import hashlib
+import importlib.util
+import json
+import os
+import stat
+import tempfile
+from contextlib import contextmanager, suppress
+from typing import Any, Dict, Iterator, List, Optional, TextIO
+
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Outputs are compared with the existing file in chunks of this many bytes
+COMPARE_CHUNK_SIZE = 1 << 20
+
+
+class OutputCache:
+    """Formatter outputs stored as `<directory>/<key[:2]>/<key>`."""
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+
+    @staticmethod
+    def key(source: bytes, formatter_name: str, options: Dict[str, Any]) -> str:
+        digest = hashlib.sha256()
+        digest.update(hashlib.sha256(source).digest())
+        digest.update(formatter_name.encode())
+        digest.update(formatter_source_digest(formatter_name).encode())
+        digest.update(json.dumps(options, sort_keys=True).encode())
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached output for `key`, or None."""
+        try:
+            with open(self._path(key), encoding="utf-8", newline="") as file:
+                return file.read()
+        except FileNotFoundError:
+            return None
+
+    def put(self, key: str, text: str) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        _replace_atomically(path, text, newline="")
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key)
+
+
+def formatter_source_digest(formatter_name: str) -> str:
+    """Digest of the formatter module and the project modules it imports."""
+    digest = hashlib.sha256()
+    for path in _project_sources(formatter_name):
+        with open(path, "rb") as file:
+            digest.update(os.path.relpath(path, PROJECT_ROOT).encode())
+            digest.update(file.read())
+    return digest.hexdigest()
+
+
+def _project_sources(module_name: str) -> List[str]:
+    """Source files of a project module and of the project modules it imports."""
+    found: Dict[str, None] = {}
+    pending = [module_name]
+    while pending:
+        path = _find_project_source(pending.pop())
+        if path is None or path in found:
+            continue
+        found[path] = None
+        with open(path, "rb") as file:
+            tree = ast.parse(file.read(), filename=path)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                pending.extend(alias.name for alias in node.names)
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                pending.append(node.module)
+                pending.extend(f"{node.module}.{alias.name}" for alias in node.names)
+    return sorted(found)
+
+
+def _find_project_source(module_name: str) -> Optional[str]:
+    try:
+        spec = importlib.util.find_spec(module_name)
+    except (ImportError, ValueError):
+        return None
+    if spec is None or not spec.origin or not spec.origin.endswith(".py"):
+        return None
+    origin = os.path.abspath(spec.origin)
+    if not origin.startswith(PROJECT_ROOT + os.sep):
+        return None
+    return origin
+
+
+def write_if_changed(path: str, text: str) -> bool:
+    """Atomically replace the file at `path` with `text`, unless it already has it.
+
+    :return: whether the file was written
+    """
+    try:
+        with open(path, encoding="utf-8", newline="") as file:
+            if file.read() == text:
+                return False
+    except (FileNotFoundError, UnicodeDecodeError):
+        pass
+    _replace_atomically(path, text, newline="")
+    return True
+
+
+@contextmanager
+def replace_if_changed(path: str) -> Iterator[TextIO]:
+    """Stream an output to a temporary file next to `path`, then rename it over
+    `path` if their contents differ.
+
+    The files are compared chunk by chunk, so the output is never held in
+    memory. The temporary file is removed when nothing changed or when the
+    writing fails, leaving `path` as it was.
+    """
+    mode = _file_mode(path)
+    directory = os.path.dirname(os.path.abspath(path))
+    descriptor, temp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with open(descriptor, "w", encoding="utf-8", newline="") as file:
+            yield file
+        if _same_content(temp_path, path):
+            os.unlink(temp_path)
+        else:
+            os.chmod(temp_path, mode)
+            os.replace(temp_path, path)
+    except BaseException:
+        with suppress(FileNotFoundError):
+            os.unlink(temp_path)
+        raise
+
+
+def _same_content(path: str, other_path: str) -> bool:
+    try:
+        if os.path.getsize(path) != os.path.getsize(other_path):
+            return False
+        with open(path, "rb") as file, open(other_path, "rb") as other:
+            while True:
+                chunk = file.read(COMPARE_CHUNK_SIZE)
+                if chunk != other.read(COMPARE_CHUNK_SIZE):
+                    return False
+                if not chunk:
+                    return True
+    except FileNotFoundError:
+        return False
+
+
+def _replace_atomically(path: str, text: str, newline: Optional[str] = None) -> None:
+    """Write to a temporary file next to `path`, then rename it over `path`,
+    keeping the permissions of the file."""
+    mode = _file_mode(path)
+    directory = os.path.dirname(os.path.abspath(path))
+    descriptor, temp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with open(descriptor, "w", encoding="utf-8", newline=newline) as file:
+            file.write(text)
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def _file_mode(path: str) -> int:
+    """Permissions of the file at `path`, or the default ones if it is new."""
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
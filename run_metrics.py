@@ -0,0 +1,148 @@
+"""
+Machine-readable metrics of one export run, written as JSON or appended to
+an NDJSON log.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import xml.etree.ElementTree as xml
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, Optional, TextIO
+
+from mindmap.cache import CacheStats
+from mindmap.phases import PhaseRecorder
+from mindmap.reader import DateReader, DateTimeReader
+from worklog.entries import TimeEntryCollector
+
+
+@dataclass
+class RunMetrics:
+    """Size of the input, work done and resources used by one export."""
+
+    input: str
+    formatter: str
+    input_bytes: int
+    elements: int
+    nodes: int
+    date_nodes: int
+    # Extracted again after the export: not part of the timed phases
+    entries: int
+    output_bytes: int
+    cache_hits: int
+    cache_misses: int
+    issues: int
+    # Wall and CPU milliseconds of each phase
+    phases: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    peak_rss_bytes: Optional[int] = None
+    # tracemalloc peak over all phases, when memory was traced
+    traced_peak_bytes: Optional[int] = None
+    timestamp: str = field(
+        default_factory=lambda: datetime.now(timezone.utc).isoformat(timespec="seconds")
+    )
+
+    @staticmethod
+    def collect(
+        path: str,
+        formatter_name: str,
+        root: xml.Element,
+        output_bytes: int,
+        cache_stats: CacheStats,
+        recorder: PhaseRecorder,
+        issues: int = 0,
+    ) -> RunMetrics:
+        """Measure the run that exported `root` from `path`.
+
+        The nodes are counted and the time entries extracted after the
+        export, outside the timed phases, so this extra work does not
+        show in the phase durations.
+
+        :param output_bytes: UTF-8 bytes written to the output stream
+        """
+        elements = nodes = date_nodes = 0
+        for element in root.iter():
+            elements += 1
+            if element.tag == "node":
+                nodes += 1
+                is_date = DateReader.read_date(element) is not None
+                if is_date and not DateTimeReader.is_datetime_node(element):
+                    date_nodes += 1
+
+        traced_peak = None
+        if recorder.trace_memory:
+            traced_peak = max(
+                (stats.peak_memory for stats in recorder.phases.values()), default=0
+            )
+
+        return RunMetrics(
+            input=path,
+            formatter=formatter_name,
+            input_bytes=os.path.getsize(path),
+            elements=elements,
+            nodes=nodes,
+            date_nodes=date_nodes,
+            entries=len(TimeEntryCollector.collect(root)),
+            output_bytes=output_bytes,
+            cache_hits=cache_stats.hits,
+            cache_misses=cache_stats.misses,
+            issues=issues,
+            phases={
+                name: {
+                    "wall_ms": round(stats.wall * 1000, 3),
+                    "cpu_ms": round(stats.cpu * 1000, 3),
+                }
+                for name, stats in recorder.phases.items()
+            },
+            peak_rss_bytes=peak_rss(),
+            traced_peak_bytes=traced_peak,
+        )
+
+    def to_json(self, indent: Optional[int] = None) -> str:
+        return json.dumps(asdict(self), indent=indent)
+
+    def write(self, path: str) -> None:
+        """Write the metrics as one JSON document, replacing the file."""
+        with open(path, "w") as file:
+            file.write(self.to_json(indent=2) + "\n")
+
+    def append(self, path: str) -> None:
+        """Append the metrics as one line of an NDJSON log."""
+        with open(path, "a") as file:
+            file.write(self.to_json() + "\n")
+
+
+class CountingWriter:
+    """Counts the UTF-8 bytes written through it to a text stream.
+
+    Like the exporters, it looks sys.stdout up on each write when no stream
+    is given.
+    """
+
+    def __init__(self, target: Optional[TextIO] = None) -> None:
+        self._target = target
+        self.bytes_written = 0
+
+    @property
+    def target(self) -> TextIO:
+        return self._target if self._target is not None else sys.stdout
+
+    def write(self, text: str) -> int:
+        self.bytes_written += len(text.encode("utf-8"))
+        return self.target.write(text)
+
+    def flush(self) -> None:
+        self.target.flush()
+
+
+def peak_rss() -> Optional[int]:
+    """Peak resident set size of this process in bytes, if it can be read."""
+    if sys.platform == "win32":
+        return None
+    import resource
+
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS, in kilobytes elsewhere
+    return int(max_rss if sys.platform == "darwin" else max_rss * 1024)
@@ -0,0 +1,280 @@
+"""
+Full-text index of the node texts and notes of mindmaps, in SQLite FTS5.
+
+Every node with an ID is a row: its TEXT, the text of its NOTE, the date of
+the nearest date node above it and its path. Updating the index from a map
+skips the map when its size and modification time did not change, and
+otherwise only re-indexes the text of the nodes whose MODIFIED stamp
+changed; the date and path of the other nodes are refreshed in place.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import sqlite3
+import xml.etree.ElementTree as xml
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from mindmap.reader import DateReader, MapReader
+
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE maps (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE TABLE nodes (
+    id INTEGER PRIMARY KEY,
+    map TEXT NOT NULL REFERENCES maps(path) ON DELETE CASCADE,
+    node_id TEXT NOT NULL,
+    modified TEXT NOT NULL,
+    date TEXT,
+    path TEXT NOT NULL,
+    text TEXT NOT NULL,
+    note TEXT NOT NULL,
+    UNIQUE (map, node_id)
+);
+CREATE VIRTUAL TABLE node_text USING fts5(
+    text, note,
+    content='nodes', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER nodes_insert AFTER INSERT ON nodes BEGIN
+    INSERT INTO node_text(rowid, text, note) VALUES (new.id, new.text, new.note);
+END;
+CREATE TRIGGER nodes_delete AFTER DELETE ON nodes BEGIN
+    INSERT INTO node_text(node_text, rowid, text, note)
+    VALUES ('delete', old.id, old.text, old.note);
+END;
+CREATE TRIGGER nodes_update AFTER UPDATE OF text, note ON nodes BEGIN
+    INSERT INTO node_text(node_text, rowid, text, note)
+    VALUES ('delete', old.id, old.text, old.note);
+    INSERT INTO node_text(rowid, text, note) VALUES (new.id, new.text, new.note);
+END;
+"""
+
+
+@dataclass(frozen=True)
+class IndexedNode:
+    """What the index stores about one node."""
+
+    node_id: str
+    modified: str
+    date: Optional[str]
+    path: str
+    text: str
+    note: str
+
+
+@dataclass(frozen=True)
+class UpdateStats:
+    """Nodes written by one update of the index from a map."""
+
+    map: str
+    skipped: bool = False
+    added: int = 0
+    changed: int = 0
+    moved: int = 0
+    removed: int = 0
+
+    def format_line(self) -> str:
+        if self.skipped:
+            return f"{self.map}: unchanged"
+        return (
+            f"{self.map}: {self.added} added, {self.changed} changed, "
+            f"{self.moved} moved, {self.removed} removed"
+        )
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    """A node matching a search, best matches first."""
+
+    map: str
+    node_id: str
+    date: Optional[str]
+    path: str
+    # Matching text of the node or of its note, with the matches in [brackets]
+    snippet: str
+
+    def format_line(self) -> str:
+        """Format as: YYYY-MM-DD path (map#ID): snippet"""
+        date = self.date or "-" * 10
+        return (
+            f"{date} {self.path} ({os.path.basename(self.map)}#{self.node_id}): "
+            f"{self.snippet}"
+        )
+
+
+class SearchIndex:
+    """A full-text index of maps stored in a SQLite database file."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        (version,) = self.connection.execute("PRAGMA user_version").fetchone()
+        if version != SCHEMA_VERSION:
+            self._create()
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self) -> SearchIndex:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def update(self, map_path: str) -> UpdateStats:
+        """Bring the index of one map file up to date."""
+        map_path = os.path.abspath(map_path)
+        stat = os.stat(map_path)
+        known = self.connection.execute(
+            "SELECT size, mtime_ns FROM maps WHERE path = ?", (map_path,)
+        ).fetchone()
+        if known == (stat.st_size, stat.st_mtime_ns):
+            return UpdateStats(map_path, skipped=True)
+
+        with open(map_path, "rb") as file:
+            root = MapReader.from_bytes(file.read())
+        with self.connection:
+            self.connection.execute(
+                "INSERT INTO maps(path, size, mtime_ns) VALUES (?, ?, ?) "
+                "ON CONFLICT(path) DO UPDATE SET "
+                "size = excluded.size, mtime_ns = excluded.mtime_ns",
+                (map_path, stat.st_size, stat.st_mtime_ns),
+            )
+            return self._update_nodes(map_path, iter_indexed_nodes(root))
+
+    def remove(self, map_path: str) -> None:
+        """Drop a map and its nodes from the index."""
+        with self.connection:
+            self.connection.execute(
+                "DELETE FROM maps WHERE path = ?", (os.path.abspath(map_path),)
+            )
+
+    def search(self, query: str, limit: int = 20) -> List[SearchHit]:
+        """Return the nodes matching an FTS5 query, best matches first.
+
+        Words must all match, `word*` matches a prefix, `"two words"` a
+        phrase, and `text:word` or `note:word` looks in one column only.
+
+        :raises sqlite3.OperationalError: if the query is not valid FTS5
+        """
+        rows = self.connection.execute(
+            "SELECT nodes.map, nodes.node_id, nodes.date, nodes.path, "
+            "  snippet(node_text, -1, '[', ']', '...', 12) "
+            "FROM node_text JOIN nodes ON nodes.id = node_text.rowid "
+            "WHERE node_text MATCH ? "
+            "ORDER BY rank LIMIT ?",
+            (query, limit),
+        )
+        return [SearchHit(*row) for row in rows]
+
+    def _create(self) -> None:
+        with self.connection:
+            for table in ("node_text", "nodes", "maps"):
+                self.connection.execute(f"DROP TABLE IF EXISTS {table}")
+            self.connection.executescript(SCHEMA)
+            self.connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def _update_nodes(self, map_path: str, nodes: Iterator[IndexedNode]) -> UpdateStats:
+        stored: Dict[str, Tuple[int, str, Optional[str], str]] = {
+            node_id: (rowid, modified, date, path)
+            for rowid, node_id, modified, date, path in self.connection.execute(
+                "SELECT id, node_id, modified, date, path FROM nodes WHERE map = ?",
+                (map_path,),
+            )
+        }
+        added = changed = moved = 0
+        for node in nodes:
+            previous = stored.pop(node.node_id, None)
+            if previous is None:
+                added += 1
+                self.connection.execute(
+                    "INSERT INTO nodes(map, node_id, modified, date, path, text, note) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        map_path,
+                        node.node_id,
+                        node.modified,
+                        node.date,
+                        node.path,
+                        node.text,
+                        node.note,
+                    ),
+                )
+            elif previous[1] != node.modified:
+                changed += 1
+                self.connection.execute(
+                    "UPDATE nodes SET modified = ?, date = ?, path = ?, text = ?, "
+                    "note = ? WHERE id = ?",
+                    (
+                        node.modified,
+                        node.date,
+                        node.path,
+                        node.text,
+                        node.note,
+                        previous[0],
+                    ),
+                )
+            elif previous[2:] != (node.date, node.path):
+                # Moved, or an ancestor was renamed: the text index stays
+                moved += 1
+                self.connection.execute(
+                    "UPDATE nodes SET date = ?, path = ? WHERE id = ?",
+                    (node.date, node.path, previous[0]),
+                )
+
+        self.connection.executemany(
+            "DELETE FROM nodes WHERE id = ?", [(row[0],) for row in stored.values()]
+        )
+        return UpdateStats(map_path, False, added, changed, moved, len(stored))
+
+
+def iter_indexed_nodes(root: xml.Element) -> Iterator[IndexedNode]:
+    """Yield the nodes with an ID under `root`, in document order.
+
+    Nodes without ID cannot be followed across saves and are left out.
+    """
+    pending: List[Tuple[xml.Element, str, Optional[str]]] = [
+        (root, root.get("TEXT", ""), None)
+    ]
+    while pending:
+        node, path, date = pending.pop()
+        date_value = DateReader.read_date(node)
+        if date_value is not None:
+            date = date_value.value.isoformat()
+        node_id = node.get("ID")
+        if node_id:
+            yield IndexedNode(
+                node_id=node_id,
+                # Nodes without stamp are compared by content instead
+                modified=node.get("MODIFIED") or _content_stamp(node),
+                date=date,
+                path=path,
+                text=node.get("TEXT", ""),
+                note=note_text(node),
+            )
+        pending.extend(
+            (child, f"{path} / {child.get('TEXT', '')}", date)
+            for child in reversed(node)
+            if child.tag == "node"
+        )
+
+
+def note_text(node: xml.Element) -> str:
+    """Return the plain text of the NOTE of a node, or "" if it has none."""
+    for child in node:
+        if child.tag == "richcontent" and child.get("TYPE") == "NOTE":
+            return re.sub(r"\s+", " ", "".join(child.itertext())).strip()
+    return ""
+
+
+def _content_stamp(node: xml.Element) -> str:
+    return f"text:{node.get('TEXT', '')}\0{note_text(node)}"
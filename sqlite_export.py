@@ -0,0 +1,375 @@
+from mindmap_exporter import MindmapExporter
+import hashlib
+import sqlite3
+import xml.etree.ElementTree as xml
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Set, TextIO, Tuple
+from mindmap.hashing import SubtreeHashes
+from mindmap.reader import DateReader, DateTimeReader
+from worklog.entries import TimeEntryCollector
+from worklog.helpers import DurationFormatter
+from worklog.models import TaskEntry
+
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE maps (
+    id INTEGER PRIMARY KEY,
+    -- ID of the root node, or its text when it has none
+    key TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL
+);
+CREATE TABLE dates (
+    id INTEGER PRIMARY KEY,
+    map_id INTEGER NOT NULL REFERENCES maps(id) ON DELETE CASCADE,
+    date TEXT NOT NULL,
+    -- Content digest of the date nodes, to skip unchanged dates on upsert
+    digest BLOB NOT NULL,
+    UNIQUE (map_id, date)
+);
+CREATE INDEX dates_date ON dates(date);
+CREATE TABLE sections (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE projects (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE tasks (
+    id INTEGER PRIMARY KEY,
+    project_id INTEGER NOT NULL REFERENCES projects(id),
+    -- Empty for the times logged directly under the project
+    name TEXT NOT NULL,
+    UNIQUE (project_id, name)
+);
+CREATE TABLE tags (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE entries (
+    id INTEGER PRIMARY KEY,
+    date_id INTEGER NOT NULL REFERENCES dates(id) ON DELETE CASCADE,
+    section_id INTEGER NOT NULL REFERENCES sections(id),
+    -- NULL for the entries logged directly in a section
+    task_id INTEGER REFERENCES tasks(id),
+    description TEXT NOT NULL,
+    start_time TEXT NOT NULL,
+    end_time TEXT,
+    minutes INTEGER NOT NULL
+);
+CREATE INDEX entries_date ON entries(date_id);
+CREATE INDEX entries_task ON entries(task_id);
+CREATE INDEX entries_start ON entries(start_time);
+CREATE TABLE entry_tags (
+    entry_id INTEGER NOT NULL REFERENCES entries(id) ON DELETE CASCADE,
+    tag_id INTEGER NOT NULL REFERENCES tags(id),
+    PRIMARY KEY (entry_id, tag_id)
+) WITHOUT ROWID;
+CREATE INDEX entry_tags_tag ON entry_tags(tag_id);
+CREATE TABLE comments (
+    entry_id INTEGER NOT NULL REFERENCES entries(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    PRIMARY KEY (entry_id, position)
+) WITHOUT ROWID;
+CREATE VIEW time_entries AS
+SELECT
+    entries.id AS entry_id,
+    maps.name AS map,
+    dates.date AS date,
+    sections.name AS section,
+    projects.name AS project,
+    tasks.name AS task,
+    entries.description AS description,
+    entries.start_time AS start_time,
+    entries.end_time AS end_time,
+    entries.minutes AS minutes
+FROM entries
+JOIN dates ON dates.id = entries.date_id
+JOIN maps ON maps.id = dates.map_id
+JOIN sections ON sections.id = entries.section_id
+LEFT JOIN tasks ON tasks.id = entries.task_id
+LEFT JOIN projects ON projects.id = tasks.project_id;
+"""
+
+TABLES = (
+    "comments",
+    "entry_tags",
+    "entries",
+    "tags",
+    "tasks",
+    "projects",
+    "sections",
+    "dates",
+    "maps",
+)
+
+
+@dataclass(frozen=True)
+class DateRecord:
+    """The time entries of one date of the map, with the digest of its nodes."""
+
+    date: date
+    digest: bytes
+    entries: List[TaskEntry]
+
+
+@dataclass(frozen=True)
+class ExportStats:
+    """Dates and entries written by one export into the database."""
+
+    map: str
+    written: int
+    unchanged: int
+    removed: int
+    entries: int
+
+    def format_line(self) -> str:
+        return (
+            f"{self.map}: {self.written} dates written, {self.unchanged} unchanged, "
+            f"{self.removed} removed, {self.entries} entries"
+        )
+
+
+class Formatter(MindmapExporter):
+    """
+    Writes the time entries of the map into a normalized SQLite database:
+    dates, sections, projects, tasks, entries, tags and comments, with a
+    `time_entries` view joining them. Entries are extracted like the orgmode
+    formatter does, end times included.
+
+    By default the database is rebuilt. With `upsert`, the other maps stored
+    in it are kept and only the dates of this map whose content changed since
+    the last export are written again. The printed output is a summary.
+    """
+
+    def __init__(
+        self,
+        output: Optional[TextIO] = None,
+        database: Optional[str] = None,
+        upsert: bool = False,
+    ) -> None:
+        """
+        :param database: path of the SQLite database file
+        :param upsert: update the map in the database instead of rebuilding it
+        """
+        super().__init__(output)
+        if database is None:
+            raise ValueError("sqlite_export needs a database file")
+        self.database = database
+        self.upsert = upsert
+
+    def parse(self, tree: xml.Element) -> None:
+        """Group the time entries by date, with the digest of each date."""
+        hashes = SubtreeHashes.compute(tree)
+        date_nodes: Dict[date, List[xml.Element]] = {}
+        for node in DateReader.find_all_date_nodes(tree):
+            date_value = DateReader.read_date(node)
+            if date_value is not None and not DateTimeReader.is_datetime_node(node):
+                date_nodes.setdefault(date_value.value, []).append(node)
+
+        records: List[DateRecord] = []
+        # A date node can be nested in another date node
+        seen: Set[int] = set()
+        for day in sorted(date_nodes):
+            nodes = date_nodes[day]
+            entries = []
+            for node in nodes:
+                for start_node, entry in TimeEntryCollector.iter_entry_nodes(node):
+                    if id(start_node) not in seen:
+                        seen.add(id(start_node))
+                        entries.append(entry)
+            digest = hashlib.blake2b(
+                b"".join(hashes[node] for node in nodes), digest_size=16
+            ).digest()
+            records.append(
+                DateRecord(
+                    day, digest, TimeEntryCollector.fill_missing_end_times(entries)
+                )
+            )
+        self.map_key = tree.get("ID") or tree.get("TEXT", "")
+        self.map_name = tree.get("TEXT", "")
+        self.result = records
+
+    def format(self) -> list[str]:
+        connection = sqlite3.connect(self.database)
+        try:
+            connection.execute("PRAGMA foreign_keys = ON")
+            (version,) = connection.execute("PRAGMA user_version").fetchone()
+            if not self.upsert or version != SCHEMA_VERSION:
+                self._create(connection)
+            with connection:
+                stats = self._write(connection, self.result)
+        finally:
+            connection.close()
+        return [stats.format_line()]
+
+    def _create(self, connection: sqlite3.Connection) -> None:
+        with connection:
+            connection.execute("DROP VIEW IF EXISTS time_entries")
+            for table in TABLES:
+                connection.execute(f"DROP TABLE IF EXISTS {table}")
+            connection.executescript(SCHEMA)
+            connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def _write(
+        self, connection: sqlite3.Connection, records: List[DateRecord]
+    ) -> ExportStats:
+        connection.execute(
+            "INSERT INTO maps(key, name) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET name = excluded.name",
+            (self.map_key, self.map_name),
+        )
+        (map_id,) = connection.execute(
+            "SELECT id FROM maps WHERE key = ?", (self.map_key,)
+        ).fetchone()
+        stored: Dict[str, Tuple[int, bytes]] = {
+            day: (date_id, digest)
+            for date_id, day, digest in connection.execute(
+                "SELECT id, date, digest FROM dates WHERE map_id = ?", (map_id,)
+            )
+        }
+        changed: List[DateRecord] = []
+        # Changed dates are deleted with their entries and written again
+        stale: List[int] = []
+        for record in records:
+            previous = stored.pop(record.date.isoformat(), None)
+            if previous is not None and previous[1] == record.digest:
+                continue
+            if previous is not None:
+                stale.append(previous[0])
+            changed.append(record)
+        stale.extend(date_id for date_id, _ in stored.values())
+        connection.executemany(
+            "DELETE FROM dates WHERE id = ?", [(date_id,) for date_id in stale]
+        )
+
+        if stale:
+            _delete_unused_names(connection)
+        entry_count = self._insert(connection, map_id, changed)
+        return ExportStats(
+            map=self.map_name,
+            written=len(changed),
+            unchanged=len(records) - len(changed),
+            removed=len(stored),
+            entries=entry_count,
+        )
+
+    def _insert(
+        self, connection: sqlite3.Connection, map_id: int, records: List[DateRecord]
+    ) -> int:
+        """Insert the dates and their entries, each table in one executemany."""
+        entries = [(record, entry) for record in records for entry in record.entries]
+        sections = _name_ids(
+            connection, "sections", (entry.section_name for _, entry in entries)
+        )
+        projects = _name_ids(
+            connection,
+            "projects",
+            (entry.project for _, entry in entries if entry.project),
+        )
+        tags = _name_ids(
+            connection, "tags", (tag for _, entry in entries for tag in entry.tags)
+        )
+        connection.executemany(
+            "INSERT OR IGNORE INTO tasks(project_id, name) VALUES (?, ?)",
+            sorted(
+                {
+                    (projects[entry.project], entry.task_name)
+                    for _, entry in entries
+                    if entry.project
+                }
+            ),
+        )
+        tasks = {
+            (project_id, name): task_id
+            for task_id, project_id, name in connection.execute(
+                "SELECT id, project_id, name FROM tasks"
+            )
+        }
+        connection.executemany(
+            "INSERT INTO dates(map_id, date, digest) VALUES (?, ?, ?)",
+            [(map_id, record.date.isoformat(), record.digest) for record in records],
+        )
+        date_ids = {
+            day: date_id
+            for date_id, day in connection.execute(
+                "SELECT id, date FROM dates WHERE map_id = ?", (map_id,)
+            )
+        }
+
+        # Entry IDs are assigned here so tags and comments can refer to them
+        (next_id,) = connection.execute(
+            "SELECT COALESCE(MAX(id), 0) + 1 FROM entries"
+        ).fetchone()
+        entry_rows = []
+        tag_rows: List[Tuple[int, int]] = []
+        comment_rows: List[Tuple[int, int, str]] = []
+        for entry_id, (record, entry) in enumerate(entries, start=next_id):
+            entry_rows.append(
+                (
+                    entry_id,
+                    date_ids[record.date.isoformat()],
+                    sections[entry.section_name],
+                    tasks[(projects[entry.project], entry.task_name)]
+                    if entry.project
+                    else None,
+                    "" if entry.project else entry.task_name,
+                    entry.start.isoformat(timespec="minutes"),
+                    entry.end.isoformat(timespec="minutes") if entry.end else None,
+                    DurationFormatter.calculate_duration_minutes(
+                        {"start": entry.start, "end": entry.end}
+                    ),
+                )
+            )
+            tag_rows.extend((entry_id, tags[tag]) for tag in dict.fromkeys(entry.tags))
+            comment_rows.extend(
+                (entry_id, position, text)
+                for position, text in enumerate(entry.comments)
+            )
+        connection.executemany(
+            "INSERT INTO entries(id, date_id, section_id, task_id, description, "
+            "start_time, end_time, minutes) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            entry_rows,
+        )
+        connection.executemany(
+            "INSERT INTO entry_tags(entry_id, tag_id) VALUES (?, ?)", tag_rows
+        )
+        connection.executemany(
+            "INSERT INTO comments(entry_id, position, text) VALUES (?, ?, ?)",
+            comment_rows,
+        )
+        return len(entry_rows)
+
+
+def _name_ids(
+    connection: sqlite3.Connection, table: str, names: Iterable[str]
+) -> Dict[str, int]:
+    """Add the missing names to a name table and return the ID of every name."""
+    connection.executemany(
+        f"INSERT OR IGNORE INTO {table}(name) VALUES (?)",
+        [(name,) for name in sorted(set(names))],
+    )
+    return {
+        name: row_id
+        for row_id, name in connection.execute(f"SELECT id, name FROM {table}")
+    }
+
+
+def _delete_unused_names(connection: sqlite3.Connection) -> None:
+    """Delete the tasks, projects, sections and tags no entry refers to anymore."""
+    connection.execute(
+        "DELETE FROM tasks WHERE id NOT IN "
+        "(SELECT task_id FROM entries WHERE task_id IS NOT NULL)"
+    )
+    connection.execute(
+        "DELETE FROM projects WHERE id NOT IN (SELECT project_id FROM tasks)"
+    )
+    connection.execute(
+        "DELETE FROM sections WHERE id NOT IN (SELECT section_id FROM entries)"
+    )
+    connection.execute(
+        "DELETE FROM tags WHERE id NOT IN (SELECT tag_id FROM entry_tags)"
+    )
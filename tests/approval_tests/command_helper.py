@@ -1,7 +1,14 @@
+import io
 import os
 import re
 import subprocess
 import sys
+import traceback
+from contextlib import redirect_stderr, redirect_stdout
+
+# Set to 1 to run every command in a `python3` subprocess, as a smoke check
+# of the real command line. By default `python3 main.py` commands run in-process.
+SUBPROCESS_ENV = "APPROVAL_TESTS_SUBPROCESS"
 
 
 class CommandHelper:
@@ -28,12 +35,54 @@ Standard Error (starting on the new line):
 
     @staticmethod
     def _run_command(command: list[str]) -> subprocess.CompletedProcess[str]:
-        # Change to project root directory
+        in_process = command[:2] == ["python3", "main.py"]
+        if not in_process or os.environ.get(SUBPROCESS_ENV) == "1":
+            return CommandHelper._run_subprocess(command)
+        return CommandHelper._run_in_process(command)
+
+    @staticmethod
+    def _project_root() -> str:
         # Get the directory of this file (tests/approval_tests/command_helper.py)
         # Go up two levels to reach project root
         current_file = os.path.abspath(__file__)
-        project_root = os.path.dirname(os.path.dirname(os.path.dirname(current_file)))
-        return subprocess.run(command, capture_output=True, text=True, cwd=project_root)
+        return os.path.dirname(os.path.dirname(os.path.dirname(current_file)))
+
+    @staticmethod
+    def _run_subprocess(command: list[str]) -> subprocess.CompletedProcess[str]:
+        # Change to project root directory
+        return subprocess.run(
+            command, capture_output=True, text=True, cwd=CommandHelper._project_root()
+        )
+
+    @staticmethod
+    def _run_in_process(command: list[str]) -> subprocess.CompletedProcess[str]:
+        """Run `python3 main.py ...` by calling main() with captured output.
+
+        Produces the same result as the subprocess: the exit status of main(),
+        or of SystemExit (argparse errors), or 1 with the traceback on stderr.
+        """
+        from main import main
+
+        stdout, stderr = io.StringIO(), io.StringIO()
+        previous_directory, previous_argv = os.getcwd(), sys.argv
+        os.chdir(CommandHelper._project_root())
+        # argparse names the program after sys.argv[0]
+        sys.argv = command[1:]
+        try:
+            with redirect_stdout(stdout), redirect_stderr(stderr):
+                try:
+                    returncode = main(command[2:])
+                except SystemExit as exit:
+                    returncode = exit.code if isinstance(exit.code, int) else 1
+                except Exception:
+                    traceback.print_exc()
+                    returncode = 1
+        finally:
+            os.chdir(previous_directory)
+            sys.argv = previous_argv
+        return subprocess.CompletedProcess(
+            command, returncode, stdout.getvalue(), stderr.getvalue()
+        )
 
     def to_list(self, command: str) -> list[str]:
         return re.compile(r"\s+").split(command.strip())
@@ -17,6 +17,26 @@ class MyTestCase(unittest.TestCase):
         )
         self.assertEqual(["a", "b"], self.to_list("a  b"))
 
+    def test_in_process_run_matches_subprocess(self) -> None:
+        command = self.to_list(
+            "python3 main.py --input ./data/FreePlane/orgmode_test3.mm "
+            "--formatter orgmode.py --check"
+        )
+        in_process = CommandHelper._run_in_process(command)
+        subprocess = CommandHelper._run_subprocess(command)
+
+        self.assertEqual(
+            (subprocess.returncode, subprocess.stdout, subprocess.stderr),
+            (in_process.returncode, in_process.stdout, in_process.stderr),
+        )
+
+    def test_in_process_run_reports_usage_errors(self) -> None:
+        result = CommandHelper._run_in_process(["python3", "main.py", "--input"])
+
+        self.assertEqual(2, result.returncode)
+        self.assertTrue(result.stderr.startswith("usage: main.py"))
+        self.assertIn("expected one argument", result.stderr)
+
     def to_list(self, param: str) -> list[str]:
         return CommandHelper().to_list(param)
 
@@ -0,0 +1,101 @@
+import io
+import os
+import tempfile
+import unittest
+
+from batch_export import BatchExporter, BatchReport, FileResult, ParsedTreeCache
+from main import MindMapFormatter
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+
+
+def export_single(path: str, formatter_name: str) -> str:
+    output = io.StringIO()
+    MindMapFormatter(path, formatter_name, output).read()
+    return output.getvalue()
+
+
+class TestParsedTreeCache(unittest.TestCase):
+    SOURCE = b'<map><node TEXT="Root"><node TEXT="Child"/></node></map>'
+
+    def test_same_content_is_parsed_once(self) -> None:
+        cache = ParsedTreeCache()
+
+        first = cache.get(self.SOURCE)
+        second = cache.get(self.SOURCE)
+
+        self.assertIs(first, second)
+        self.assertEqual("Root", first.get("TEXT"))
+        self.assertEqual((1, 1), (cache.hits, cache.misses))
+
+    def test_least_recently_used_tree_is_evicted(self) -> None:
+        cache = ParsedTreeCache(max_size=1)
+        other = b'<map><node TEXT="Other"/></map>'
+
+        cache.get(self.SOURCE)
+        cache.get(other)
+        cache.get(self.SOURCE)
+
+        self.assertEqual((0, 3), (cache.hits, cache.misses))
+
+
+class TestBatchReport(unittest.TestCase):
+    def test_latency_percentiles_use_nearest_rank(self) -> None:
+        results = [FileResult(f"{i}.mm", latency=i / 1000) for i in range(1, 101)]
+        report = BatchReport(results, elapsed=1.0)
+
+        self.assertEqual(0.05, report.latency_percentile(50))
+        self.assertEqual(0.099, report.latency_percentile(99))
+        self.assertEqual(0.1, report.latency_percentile(100))
+
+    def test_format_lines_lists_failures_first(self) -> None:
+        results = [
+            FileResult("a.mm", latency=0.01),
+            FileResult("b.mm", latency=0.02, error="broken"),
+        ]
+        lines = BatchReport(results, elapsed=0.5).format_lines()
+
+        self.assertEqual("b.mm: broken", lines[0])
+        self.assertEqual("Exported 2 maps (1 failed) in 0.50s", lines[1])
+        self.assertTrue(lines[2].startswith("Per-file latency: p50 10.0ms"))
+
+
+class TestBatchExporter(unittest.TestCase):
+    def test_outputs_match_single_exports(self) -> None:
+        paths = [
+            os.path.join(DATA_DIR, "FreePlane", name)
+            for name in ("mm1.mm", "mm3.mm", "orgmode_test3.mm")
+        ]
+        formatters = ["orgmode_date_sections", "titles", "json_formatter"]
+
+        with tempfile.TemporaryDirectory() as output_dir:
+            report = BatchExporter(formatters, output_dir, workers=2).run(paths)
+
+            self.assertEqual([], report.failures)
+            for path in paths:
+                name = os.path.splitext(os.path.basename(path))[0]
+                for formatter_name in formatters:
+                    output_path = os.path.join(
+                        output_dir, f"{name}.{formatter_name}.txt"
+                    )
+                    with open(output_path) as file:
+                        self.assertEqual(
+                            export_single(path, formatter_name), file.read()
+                        )
+
+    def test_missing_and_clashing_maps_are_reported(self) -> None:
+        paths = [
+            os.path.join(DATA_DIR, "Freemind", "test1.mm"),
+            os.path.join(DATA_DIR, "Freemind", "test1.mm"),
+            os.path.join(DATA_DIR, "missing.mm"),
+        ]
+
+        with tempfile.TemporaryDirectory() as output_dir:
+            report = BatchExporter(["titles"], output_dir, workers=1).run(paths)
+
+        self.assertEqual(paths[1:], [result.path for result in report.failures])
+        self.assertIn("clash", report.results[1].error or "")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import os
+import tempfile
+import unittest
+
+from benchmarks.suite import (
+    STAGES,
+    CaseResult,
+    format_report,
+    run_case,
+    scaling_exponent,
+    scaling_exponents,
+)
+from benchmarks.regression import compare, load_baseline, save_baseline
+from mindmap.generator import GeneratorConfig, MapGenerator
+
+
+def case(formatter: str, nodes: int, seconds: float) -> CaseResult:
+    return CaseResult(
+        formatter=formatter,
+        days=nodes,
+        nodes=nodes,
+        seconds={"read": 1.0, "parse": seconds, "format": 0.0, "print": 0.0},
+        trials={stage: [] for stage in STAGES},
+        traced_peaks={stage: 2**20 for stage in STAGES},
+        peak_rss=None,
+    )
+
+
+class TestScaling(unittest.TestCase):
+    def test_scaling_exponent_of_power_laws(self) -> None:
+        sizes = [100, 1000, 10000]
+        self.assertAlmostEqual(1.0, scaling_exponent([(n, n * 1e-6) for n in sizes]))
+        self.assertAlmostEqual(
+            2.0, scaling_exponent([(n, n * n * 1e-9) for n in sizes])
+        )
+
+    def test_read_time_is_left_out_of_the_exponent(self) -> None:
+        results = [case("linear", n, n * 1e-6) for n in (100, 1000)]
+        self.assertAlmostEqual(1.0, scaling_exponents(results)["linear"])
+
+    def test_report_flags_super_linear_formatters(self) -> None:
+        results = [case("linear", n, n * 1e-6) for n in (100, 1000)]
+        results += [case("quadratic", n, n * n * 1e-9) for n in (100, 1000)]
+
+        lines = format_report(results, max_exponent=1.2)
+
+        self.assertIn("linear                     1.00", lines)
+        self.assertIn("quadratic                  2.00  SUPER-LINEAR", lines)
+
+
+def timed_case(formatter: str, parse_trials: list[float]) -> CaseResult:
+    result = case(formatter, 100, min(parse_trials))
+    result.trials = {stage: [0.01] * len(parse_trials) for stage in STAGES}
+    result.trials["parse"] = parse_trials
+    return result
+
+
+class TestRegressionGate(unittest.TestCase):
+    def test_slower_median_beyond_threshold_is_a_regression(self) -> None:
+        baseline = [timed_case("titles", [0.100, 0.101, 0.099])]
+        current = [timed_case("titles", [0.130, 0.131, 0.129])]
+
+        regressions = compare(baseline, current, max_regression=10, min_seconds=0.001)
+
+        self.assertEqual(["parse"], [r.stage for r in regressions])
+        self.assertEqual(
+            "titles (100 days) parse: 100.0ms -> 130.0ms (+30%)",
+            regressions[0].format_line(),
+        )
+
+    def test_growth_below_threshold_is_accepted(self) -> None:
+        baseline = [timed_case("titles", [0.100, 0.101, 0.099])]
+        current = [timed_case("titles", [0.105, 0.106, 0.104])]
+
+        self.assertEqual([], compare(baseline, current, 10, 0.001))
+
+    def test_growth_within_trial_noise_is_accepted(self) -> None:
+        baseline = [timed_case("titles", [0.100, 0.080, 0.120])]
+        current = [timed_case("titles", [0.125, 0.100, 0.150])]
+
+        self.assertEqual([], compare(baseline, current, 10, 0.001))
+
+    def test_growth_below_min_seconds_is_accepted(self) -> None:
+        baseline = [timed_case("titles", [0.0001] * 3)]
+        current = [timed_case("titles", [0.0005] * 3)]
+
+        self.assertEqual([], compare(baseline, current, 10, 0.001))
+
+    def test_baseline_round_trip(self) -> None:
+        settings = {"days": [100], "formatters": ["titles"], "repeat": 3, "seed": 0}
+        results = [timed_case("titles", [0.1, 0.2, 0.3])]
+        with tempfile.TemporaryDirectory() as workdir:
+            path = os.path.join(workdir, "baseline.json")
+            save_baseline(path, settings, results)
+            self.assertEqual((settings, results), load_baseline(path))
+
+
+class TestRunCase(unittest.TestCase):
+    def test_run_case_measures_every_stage(self) -> None:
+        with tempfile.TemporaryDirectory() as workdir:
+            path = os.path.join(workdir, "map.mm")
+            MapGenerator(GeneratorConfig(days=2)).write_file(path)
+
+            result = run_case("orgmode", path, days=2, repeat=1)
+
+        self.assertEqual(set(STAGES), set(result.seconds))
+        self.assertEqual(set(STAGES), set(result.traced_peaks))
+        self.assertGreater(result.nodes, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
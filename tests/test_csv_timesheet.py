@@ -0,0 +1,174 @@
+import csv
+import glob
+import os
+import tempfile
+import unittest
+from io import StringIO
+from unittest.mock import patch
+
+import csv_timesheet
+import orgmode
+from main import main, read_mindmap
+from mindmap.reader import MapReader
+from worklog.helpers import DurationFormatter
+
+MM3 = "data/FreePlane/mm3.mm"
+
+DATE = "org.freeplane.features.format.FormattedDate|{}|date"
+DATETIME = "org.freeplane.features.format.FormattedDate|{}+0100|datetime"
+
+
+def release_day(day: str, start: str, end: str) -> str:
+    return f"""<node TEXT="{day}" OBJECT="{DATE.format(day)}">
+<node TEXT="WORKLOG">
+<node TEXT="Release">
+<node TEXT="{start}" OBJECT="{DATETIME.format(f"{day}T{start}")}">
+<node TEXT="{end}" OBJECT="{DATETIME.format(f"{day}T{end}")}"/>
+</node>
+</node>
+</node>
+</node>"""
+
+
+# The same project on two dates
+RELEASES = f"""<map version="freeplane 1.12.1">
+<node TEXT="Root">
+{release_day("2026-01-14", "09:00", "10:00")}
+{release_day("2026-01-15", "09:00", "09:30")}
+</node>
+</map>"""
+
+
+def export_rows(path: str) -> list[list[str]]:
+    output = StringIO()
+    csv_timesheet.Formatter(output).export(read_mindmap(path))
+    return list(csv.reader(StringIO(output.getvalue())))
+
+
+def orgmode_totals(path: str) -> dict[tuple[str, str], str]:
+    """Return the `Total:` lines of the orgmode output, by project name (with
+    an empty date: a project total covers all its dates) or by date and
+    section for the entries outside projects."""
+    output = StringIO()
+    orgmode.Formatter(output).export(read_mindmap(path))
+    totals: dict[tuple[str, str], str] = {}
+    day = ""
+    day_key = ("", "")
+    for line in output.getvalue().splitlines():
+        if line.startswith("** PROJ ["):
+            day = line[len("** PROJ [") :][:10]
+        elif line.startswith("**** PROJ "):
+            day_key = ("", line[len("**** PROJ ") :].split(" :")[0])
+        elif line.startswith("*** PROJ ") and line != "*** PROJ Projects":
+            day_key = (day, line[len("*** PROJ ") :])
+        elif line.startswith("Total: "):
+            totals[day_key] = line[len("Total: ") :]
+    return totals
+
+
+def csv_totals(rows: list[list[str]]) -> dict[tuple[str, str], str]:
+    """Return the minutes of the rows like orgmode_totals()."""
+    minutes: dict[tuple[str, str], int] = {}
+    for day, section, project, *_, row_minutes, _ in rows[1:]:
+        key = ("", project) if project else (day, section)
+        minutes[key] = minutes.get(key, 0) + int(row_minutes)
+    return {
+        key: DurationFormatter.format_duration(total)
+        for key, total in minutes.items()
+        if total > 0
+    }
+
+
+class TestCsvTimesheet(unittest.TestCase):
+    def test_one_row_per_entry_in_date_order(self) -> None:
+        rows = export_rows(MM3)
+
+        self.assertEqual(list(csv_timesheet.HEADER), rows[0])
+        self.assertEqual(14, len(rows))
+        # The 15th comes first in the map
+        dates = [row[0] for row in rows[1:]]
+        self.assertEqual(sorted(dates), dates)
+        self.assertEqual(
+            [
+                "2026-01-14",
+                "TIMES",
+                "",
+                "14/1, Work on this",
+                "11:14",
+                "11:21",
+                "7",
+                "",
+            ],
+            rows[1],
+        )
+        self.assertEqual(
+            ["2026-01-15", "WORKLOG", "Another project", "Task 1"],
+            rows[8][:4],
+        )
+
+    def test_end_times_are_filled_like_orgmode(self) -> None:
+        rows = export_rows(MM3)
+
+        # Standalone entries end when the next one starts, the last stays open
+        times = [
+            row[3:7] for row in rows if row[0] == "2026-01-14" and row[1] == "TIMES"
+        ]
+        self.assertEqual(
+            [
+                ["14/1, Work on this", "11:14", "11:21", "7"],
+                ["14/1, Work on that", "11:21", "11:35", "14"],
+                ["14/1, Work on Foo", "11:35", "", "0"],
+            ],
+            times,
+        )
+        # Project entries are never filled
+        self.assertIn(
+            [
+                "2026-01-15",
+                "WORKLOG",
+                "Another project",
+                "Task 2",
+                "11:59",
+                "",
+                "0",
+                "",
+            ],
+            rows,
+        )
+
+    def test_totals_reconcile_with_orgmode(self) -> None:
+        for path in sorted(glob.glob("data/FreePlane/*.mm")):
+            with self.subTest(path=path):
+                self.assertEqual(orgmode_totals(path), csv_totals(export_rows(path)))
+
+    def test_project_repeated_on_another_date(self) -> None:
+        output = StringIO()
+        csv_timesheet.Formatter(output).export(MapReader.from_bytes(RELEASES.encode()))
+        rows = list(csv.reader(StringIO(output.getvalue())))
+
+        # Like the orgmode formatter, only the first project node is kept
+        self.assertEqual(
+            [["2026-01-14", "Release", "60"]],
+            [[row[0], row[2], row[6]] for row in rows[1:]],
+        )
+        orgmode_output = StringIO()
+        orgmode.Formatter(orgmode_output).export(
+            MapReader.from_bytes(RELEASES.encode())
+        )
+        self.assertEqual(1, orgmode_output.getvalue().count("**** PROJ Release"))
+        self.assertIn("Total: 1h\n", orgmode_output.getvalue())
+
+    def test_output_file_is_streamed(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "timesheet.csv")
+            argv = ["--input", MM3, "--formatter", "csv_timesheet.py"]
+            # The rows go to the file, not to an in-memory buffer
+            with patch("main.io.StringIO", side_effect=AssertionError("buffered")):
+                main([*argv, "--output", path])
+
+            with open(path, newline="") as file:
+                self.assertEqual(export_rows(MM3), list(csv.reader(file)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -112,6 +112,30 @@ python3 main.py --input ./data/FreePlane/orgmode_lists/input.mm --formatter orgm
             )
         )
 
+    def test_worklog_lint(self) -> None:
+        verify(
+            self.command_helper.invoke_command(
+                self.command_helper.to_list("""\
+python3 main.py --input ./data/FreePlane/orgmode_test3.mm --formatter worklog_lint.py""")
+            )
+        )
+
+    def test_mindmap_orgmode_check(self) -> None:
+        verify(
+            self.command_helper.invoke_command(
+                self.command_helper.to_list("""\
+python3 main.py --input ./data/FreePlane/orgmode_test3.mm --formatter orgmode.py --check""")
+            )
+        )
+
+    def test_query_time_entries_at(self) -> None:
+        verify(
+            self.command_helper.invoke_command(
+                self.command_helper.to_list("""\
+python3 main.py query --input ./data/FreePlane/mm3.mm --at 2026-01-15T11:22""")
+            )
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
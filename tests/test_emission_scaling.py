@@ -0,0 +1,62 @@
+import unittest
+import xml.etree.ElementTree as xml
+from typing import Callable
+
+import latex_slides
+import leaf_as_text
+import titles
+from benchmarks.bench_emission_scaling import deep_map, render, wide_map
+from mindmap.reader import NodeTreeHelper
+
+
+class TestEmissionScaling(unittest.TestCase):
+    """The formatters consume one walk yielding every node once on the way in
+    and once on the way out, on deep as well as on wide maps, so the emission
+    is linear in the size of the map.
+
+    The timings are measured by benchmarks.bench_emission_scaling.
+    """
+
+    SIZE = 1000
+
+    def assert_nodes_walked_once(self, build: Callable[[int], xml.Element]) -> None:
+        root = build(self.SIZE)
+        walk = list(NodeTreeHelper.walk_titled_nodes(root, 1))
+
+        entered = [node for node, _, entering in walk if entering]
+        self.assertEqual(list(root.iter("node")), entered)
+        self.assertEqual(2 * len(entered), len(walk))
+
+    def test_wide_maps_walk_each_node_once(self) -> None:
+        self.assert_nodes_walked_once(wide_map)
+
+    def test_deep_maps_walk_each_node_once(self) -> None:
+        self.assert_nodes_walked_once(deep_map)
+
+    def test_nodes_without_text_are_walked_through(self) -> None:
+        root = xml.fromstring(
+            '<map><node TEXT="Root"><node><node TEXT="Child"/></node></node></map>'
+        )
+        self.assertEqual(
+            [
+                ("Root", 1, True),
+                ("Child", 2, True),
+                ("Child", 2, False),
+                ("Root", 1, False),
+            ],
+            [
+                (node.get("TEXT"), level, entering)
+                for node, level, entering in NodeTreeHelper.walk_titled_nodes(root, 1)
+            ],
+        )
+
+    def test_deep_maps_do_not_hit_the_recursion_limit(self) -> None:
+        root = deep_map(5000)
+        self.assertEqual(10001, len(render(titles, root)))
+        self.assertEqual("#" * 5001 + " Branch 4999", render(titles, root)[-1])
+        self.assertEqual(["Branch 4999", ""], render(leaf_as_text, root)[-2:])
+        self.assertEqual("\\end{frame}", render(latex_slides, root)[-1])
+
+
+if __name__ == "__main__":
+    unittest.main()
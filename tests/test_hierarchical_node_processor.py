@@ -0,0 +1,58 @@
+import unittest
+import xml.etree.ElementTree as xml
+
+from worklog.helpers import HierarchicalNodeProcessor
+
+
+class TestHierarchicalNodeProcessor(unittest.TestCase):
+    XML = """<node TEXT="Parent">
+        <node TEXT="! Todo leaf"/>
+        <node TEXT="Branch A"><node TEXT="Child"/></node>
+        <font SIZE="10"/>
+        <node TEXT="Leaf A"/>
+        <node TEXT="!Todo branch"><node TEXT="Child"/></node>
+        <node TEXT="Leaf B"><icon BUILTIN="yes"/></node>
+    </node>"""
+
+    def test_classify_children_buckets_in_document_order(self) -> None:
+        children = HierarchicalNodeProcessor.classify_children(xml.fromstring(self.XML))
+
+        self.assertEqual(["Leaf A", "Leaf B"], [n.get("TEXT") for n in children.leaves])
+        self.assertEqual(["Branch A"], [n.get("TEXT") for n in children.branches])
+        self.assertEqual(
+            [("! Todo leaf", True), ("!Todo branch", False)],
+            [(n.get("TEXT"), is_leaf) for n, is_leaf in children.todos],
+        )
+
+    def test_in_order_yields_three_phases_with_flags(self) -> None:
+        children = HierarchicalNodeProcessor.classify_children(xml.fromstring(self.XML))
+
+        self.assertEqual(
+            [
+                ("Leaf A", True, False),
+                ("Leaf B", True, False),
+                ("Branch A", False, False),
+                ("! Todo leaf", True, True),
+                ("!Todo branch", False, True),
+            ],
+            [(n.get("TEXT"), leaf, todo) for n, leaf, todo in children.in_order()],
+        )
+
+    def test_process_hierarchical_order_calls_back_in_three_phases(self) -> None:
+        visited: list[str] = []
+
+        def callback(node: xml.Element, prefix: str) -> None:
+            visited.append(prefix + node.get("TEXT", ""))
+
+        HierarchicalNodeProcessor.process_hierarchical_order(
+            xml.fromstring(self.XML), callback, (">",)
+        )
+
+        self.assertEqual(
+            [">Leaf A", ">Leaf B", ">Branch A", ">! Todo leaf", ">!Todo branch"],
+            visited,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import os
+import tempfile
+import unittest
+from html.parser import HTMLParser
+from io import StringIO
+from typing import List, Optional, Tuple
+
+import html_outline
+from main import read_mindmap
+
+MM3 = "data/FreePlane/mm3.mm"
+
+# Elements without end tag
+VOID = ("meta",)
+
+
+class TagBalance(HTMLParser):
+    """Checks that every element is closed, in order."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.open: List[str] = []
+        self.errors: List[Tuple[str, Optional[str]]] = []
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        if tag not in VOID:
+            self.open.append(tag)
+
+    def handle_endtag(self, tag: str) -> None:
+        expected = self.open.pop() if self.open else None
+        if expected != tag:
+            self.errors.append((tag, expected))
+
+
+def assert_balanced(test: unittest.TestCase, page: str) -> None:
+    parser = TagBalance()
+    parser.feed(page)
+    test.assertEqual([], parser.errors)
+    test.assertEqual([], parser.open)
+
+
+class TestHtmlOutline(unittest.TestCase):
+    def test_page_of_the_map(self) -> None:
+        output = StringIO()
+        html_outline.Formatter(output).export(read_mindmap(MM3))
+        page = output.getvalue()
+
+        self.assertTrue(page.startswith("<!DOCTYPE html>\n"))
+        assert_balanced(self, page)
+        self.assertIn("<h2>15/01/2026</h2>\n<ul>\n<li>WORKLOG\n<ul>\n", page)
+        self.assertIn("<li>Comment: End of task</li>\n", page)
+
+    def test_text_is_escaped(self) -> None:
+        output = StringIO()
+        root = read_mindmap(MM3)
+        root.set("TEXT", "<Team> & co")
+        html_outline.Formatter(output).export(root)
+
+        self.assertIn("<title>&lt;Team&gt; &amp; co</title>", output.getvalue())
+
+    def test_chunk_pages_link_back_to_the_index(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            html_outline.Formatter(StringIO(), chunk_dir=directory).export(
+                read_mindmap(MM3)
+            )
+
+            pages = sorted(os.listdir(directory))
+            self.assertEqual("index.html", pages[-1])
+            for name in pages:
+                with open(os.path.join(directory, name), encoding="utf-8") as file:
+                    page = file.read()
+                assert_balanced(self, page)
+                if name != "index.html":
+                    self.assertIn('<nav><a href="index.html">Index</a></nav>', page)
+                    self.assertIn(f'<a href="{name}">', self._index(directory))
+
+    def _index(self, directory: str) -> str:
+        with open(os.path.join(directory, "index.html"), encoding="utf-8") as file:
+            return file.read()
+
+
+if __name__ == "__main__":
+    unittest.main()
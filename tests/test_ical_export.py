@@ -0,0 +1,149 @@
+import os
+import tempfile
+import unittest
+from io import StringIO
+from typing import Optional
+from unittest.mock import patch
+
+import ical_export
+from main import main
+from mindmap.reader import MapReader
+
+DATETIME = "org.freeplane.features.format.FormattedDate|{}+0100|datetime"
+
+MAP = f"""<map version="freeplane 1.12.1">
+<node TEXT="Root" ID="ID_root" MODIFIED="1000">
+<node TEXT="14/01/2026" OBJECT="org.freeplane.features.format.FormattedDate|2026-01-14|date" ID="ID_d14" MODIFIED="1000">
+<node TEXT="TIMES" ID="ID_times" MODIFIED="1000">
+<node TEXT="09:00" OBJECT="{DATETIME.format("2026-01-14T09:00")}" ID="ID_t1" MODIFIED="1768377600000">
+<node TEXT="10:30" OBJECT="{DATETIME.format("2026-01-14T10:30")}" ID="ID_t2" MODIFIED="1768377600000"/>
+<node TEXT="Review, then merge; fast" ID="ID_r" MODIFIED="1768377600000"/>
+</node>
+<node TEXT="11:00" OBJECT="{DATETIME.format("2026-01-14T11:00")}" ID="ID_t3" MODIFIED="1768381200000">
+<node TEXT="{"Write the release notes of the next version " * 3}" ID="ID_n" MODIFIED="1768381200000"/>
+</node>
+</node>
+</node>
+</node>
+</map>"""
+
+
+def export(source: str, watermark: Optional[str] = None) -> str:
+    output = StringIO()
+    formatter = ical_export.Formatter(output, watermark=watermark)
+    formatter.export(MapReader.from_bytes(source.encode()))
+    formatter.commit()
+    return output.getvalue()
+
+
+def events(calendar: str) -> list[str]:
+    return calendar.split("BEGIN:VEVENT\r\n")[1:]
+
+
+class TestIcalExport(unittest.TestCase):
+    def test_calendar_of_the_entries(self) -> None:
+        calendar = export(MAP)
+
+        self.assertTrue(calendar.startswith("BEGIN:VCALENDAR\r\nVERSION:2.0\r\n"))
+        self.assertTrue(calendar.endswith("END:VCALENDAR\r\n"))
+        first, second = events(calendar)
+        self.assertEqual(
+            "UID:ID_t1@mindmap\r\n"
+            "DTSTAMP:20260114T080000Z\r\n"
+            "DTSTART:20260114T090000\r\n"
+            "DTEND:20260114T103000\r\n"
+            "SUMMARY:Review\\, then merge\\; fast\r\n"
+            "CATEGORIES:TIMES\r\n"
+            "END:VEVENT\r\n",
+            first,
+        )
+        # No end time: no DTEND
+        self.assertNotIn("DTEND", second)
+
+    def test_long_lines_are_folded(self) -> None:
+        calendar = export(MAP)
+
+        lines = calendar.split("\r\n")
+        self.assertTrue(all(len(line.encode()) <= 75 for line in lines))
+        summary = next(line for line in lines if line.startswith("SUMMARY:Write"))
+        continued = lines[lines.index(summary) + 1]
+        self.assertTrue(continued.startswith(" "))
+        unfolded = calendar.replace("\r\n ", "")
+        self.assertIn(
+            "SUMMARY:" + "Write the release notes of the next version " * 2, unfolded
+        )
+
+    def test_watermark_only_exports_modified_entries(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            watermark = os.path.join(directory, "calendar.watermark")
+
+            self.assertEqual(2, len(events(export(MAP, watermark))))
+            with open(watermark) as file:
+                self.assertEqual("1768381200000\n", file.read())
+            self.assertEqual([], events(export(MAP, watermark)))
+
+            # Editing the end time stamps the end node only
+            edited = MAP.replace(
+                'ID="ID_t2" MODIFIED="1768377600000"',
+                'ID="ID_t2" MODIFIED="1768390000000"',
+            )
+            (event,) = events(export(edited, watermark))
+
+            self.assertIn("UID:ID_t1@mindmap", event)
+            with open(watermark) as file:
+                self.assertEqual("1768390000000\n", file.read())
+
+    def test_corrupt_watermark_exports_every_entry(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            watermark = os.path.join(directory, "calendar.watermark")
+            # Not a number, padded by a crash while writing, not text
+            for content in (b"stamp", b"17683\x00\x00\x00", b"\xff\xfe"):
+                with self.subTest(content=content):
+                    with open(watermark, "wb") as file:
+                        file.write(content)
+
+                    self.assertEqual(2, len(events(export(MAP, watermark))))
+                    with open(watermark) as file:
+                        self.assertEqual("1768381200000\n", file.read())
+
+    def test_watermark_only_moves_once_the_output_is_written(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            watermark = os.path.join(directory, "calendar.watermark")
+            formatter = ical_export.Formatter(StringIO(), watermark=watermark)
+            formatter.export(MapReader.from_bytes(MAP.encode()))
+            self.assertFalse(os.path.exists(watermark))
+
+            formatter.commit()
+            with open(watermark) as file:
+                self.assertEqual("1768381200000\n", file.read())
+
+    def test_failed_output_keeps_the_watermark(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            source = os.path.join(directory, "work.mm")
+            with open(source, "w", encoding="utf-8") as file:
+                file.write(MAP)
+            watermark = os.path.join(directory, "calendar.watermark")
+            argv = ["--input", source, "--formatter", "ical_export.py"]
+            argv += ["--watermark", watermark]
+            argv += ["--output", os.path.join(directory, "changes.ics")]
+
+            with patch("output_cache.os.replace", side_effect=OSError("full")):
+                with self.assertRaises(OSError):
+                    main(argv)
+            self.assertFalse(os.path.exists(watermark))
+
+            main(argv)
+            with open(watermark) as file:
+                self.assertEqual("1768381200000\n", file.read())
+
+    def test_stamp_without_modified_is_reproducible(self) -> None:
+        unstamped = MAP.replace('MODIFIED="1768377600000"', "")
+
+        calendar = export(unstamped)
+
+        self.assertEqual(calendar, export(unstamped))
+        self.assertIn("DTSTAMP:20260114T090000Z", events(calendar)[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import random
+import unittest
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from worklog.interval_index import IntervalIndex
+from worklog.models import TaskEntry
+
+BASE = datetime(2026, 3, 4, 8, 0)
+
+
+def entry(start_minute: int, end_minute: Optional[int], name: str = "") -> TaskEntry:
+    start = BASE + timedelta(minutes=start_minute)
+    end = BASE + timedelta(minutes=end_minute) if end_minute is not None else None
+    return TaskEntry(
+        task_name=name or f"{start_minute}-{end_minute}",
+        start=start,
+        end=end,
+        date=start.date(),
+        tags=[],
+    )
+
+
+def at(minute: int) -> datetime:
+    return BASE + timedelta(minutes=minute)
+
+
+class TestIntervalIndex(unittest.TestCase):
+    def names(self, entries: List[TaskEntry]) -> List[str]:
+        return [e.task_name for e in entries]
+
+    def test_empty_index(self) -> None:
+        index = IntervalIndex([])
+        self.assertEqual(0, len(index))
+        self.assertEqual([], index.at(at(0)))
+        self.assertEqual([], index.between(at(0), at(60)))
+
+    def test_point_query_is_half_open(self) -> None:
+        index = IntervalIndex([entry(0, 60, "A"), entry(60, 120, "B")])
+        self.assertEqual(["A"], self.names(index.at(at(0))))
+        self.assertEqual(["B"], self.names(index.at(at(60))))
+        self.assertEqual([], index.at(at(120)))
+
+    def test_point_query_returns_all_running_entries_sorted(self) -> None:
+        index = IntervalIndex(
+            [entry(30, 90, "Meeting"), entry(0, 240, "Long"), entry(100, 110, "Other")]
+        )
+        self.assertEqual(["Long", "Meeting"], self.names(index.at(at(45))))
+
+    def test_range_query(self) -> None:
+        index = IntervalIndex(
+            [entry(0, 30, "A"), entry(30, 60, "B"), entry(90, 120, "C")]
+        )
+        self.assertEqual(["B"], self.names(index.between(at(40), at(90))))
+        self.assertEqual(["A", "B", "C"], self.names(index.between(at(0), at(95))))
+
+    def test_open_entries_are_instants(self) -> None:
+        index = IntervalIndex([entry(30, None, "Open")])
+        self.assertEqual(["Open"], self.names(index.at(at(30))))
+        self.assertEqual([], index.at(at(31)))
+        self.assertEqual(["Open"], self.names(index.between(at(0), at(30))))
+
+    def test_matches_brute_force(self) -> None:
+        rng = random.Random(42)
+        entries = []
+        for i in range(500):
+            start = rng.randrange(0, 10_000)
+            end = start + rng.randrange(0, 300) if rng.random() > 0.1 else None
+            entries.append(entry(start, end, str(i)))
+        index = IntervalIndex(entries)
+
+        def brute(lo: datetime, hi: datetime) -> List[str]:
+            result = []
+            for e in sorted(entries, key=lambda e: e.start):
+                end = e.end or e.start
+                if e.start == end:
+                    hit = lo <= e.start <= hi
+                elif lo == hi:
+                    hit = e.start <= lo < end
+                else:
+                    hit = e.start < hi and end > lo
+                if hit:
+                    result.append(e.task_name)
+            return sorted(result)
+
+        for _ in range(200):
+            lo = rng.randrange(0, 10_500)
+            hi = lo + rng.choice([0, rng.randrange(1, 500)])
+            self.assertEqual(
+                brute(at(lo), at(hi)), sorted(self.names(index.between(at(lo), at(hi))))
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import io
+import unittest
+import xml.etree.ElementTree as xml
+from datetime import date
+
+from mindmap.generator import GeneratorConfig, MapGenerator
+from mindmap.reader import DateReader, MapReader
+from worklog.entries import TimeEntryCollector
+
+
+def generate(config: GeneratorConfig) -> str:
+    out = io.StringIO()
+    MapGenerator(config).write(out)
+    return out.getvalue()
+
+
+class TestMapGenerator(unittest.TestCase):
+    def test_same_seed_writes_same_map(self) -> None:
+        config = GeneratorConfig(seed=7, days=5, note_density=0.5)
+        generator = MapGenerator(config)
+        first, second = io.StringIO(), io.StringIO()
+
+        generator.write(first)
+        generator.write(second)
+
+        self.assertEqual(first.getvalue(), second.getvalue())
+        self.assertEqual(first.getvalue(), generate(config))
+        self.assertNotEqual(first.getvalue(), generate(GeneratorConfig(seed=8, days=5)))
+
+    def test_dates_are_grouped_by_month(self) -> None:
+        root = MapReader.get_root_node(
+            xml.fromstring(generate(GeneratorConfig(start=date(2026, 1, 30), days=3)))
+        )
+
+        months = [child.get("TEXT") for child in root if child.tag == "node"]
+        dates = [DateReader.read_date(node) for node in root.findall("node/node")]
+
+        self.assertEqual(["Jan/26", "Feb/26"], months)
+        self.assertEqual(
+            ["2026-01-30", "2026-01-31", "2026-02-01"],
+            [d.value.isoformat() for d in dates if d],
+        )
+
+    def test_time_entries_per_date(self) -> None:
+        config = GeneratorConfig(days=4, projects=2, tasks=3, entries_per_day=5)
+        root = MapReader.get_root_node(xml.fromstring(generate(config)))
+
+        entries = TimeEntryCollector.collect(root)
+
+        self.assertEqual(4 * 5, sum(1 for e in entries if e.section_name == "TIMES"))
+        self.assertEqual(4 * 2 * 3, sum(1 for e in entries if e.project))
+
+    def test_start_times_stay_in_the_working_day(self) -> None:
+        config = GeneratorConfig(days=1, sections=("TIMES",), entries_per_day=1000)
+        root = MapReader.get_root_node(xml.fromstring(generate(config)))
+
+        starts = [entry.start for entry in TimeEntryCollector.collect(root)]
+
+        self.assertEqual(1000, len(starts))
+        self.assertEqual(sorted(starts), starts)
+        self.assertEqual({date(2026, 1, 1)}, {start.date() for start in starts})
+        self.assertGreaterEqual(min(starts).hour, 8)
+        self.assertLess(max(starts).hour, 20)
+
+    def test_tree_sections_follow_depth_and_fan_out(self) -> None:
+        config = GeneratorConfig(days=1, sections=("LEARNLOG",), depth=3, fan_out=2)
+        root = MapReader.get_root_node(xml.fromstring(generate(config)))
+
+        learnlog = root.find("node/node/node")
+        assert learnlog is not None
+        self.assertEqual("LEARNLOG", learnlog.get("TEXT"))
+        self.assertEqual(2 + 4 + 8, len(learnlog.findall(".//node")))
+
+    def test_densities_and_style_bloat(self) -> None:
+        config = GeneratorConfig(
+            days=2, icon_density=1.0, note_density=1.0, style_bloat=25
+        )
+        map_root = xml.fromstring(generate(config))
+
+        self.assertEqual(25, len(map_root.findall(".//stylenode[@TEXT]")))
+        day = MapReader.get_root_node(map_root).find("node/node")
+        assert day is not None
+        learnlog_leaf = day.find("node[@TEXT='LEARNLOG']/node/node")
+        assert learnlog_leaf is not None
+        self.assertIsNotNone(learnlog_leaf.find("icon"))
+        self.assertIsNotNone(learnlog_leaf.find("richcontent[@TYPE='NOTE']/html"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+import os
+import tempfile
+import unittest
+from io import StringIO
+from typing import Optional
+
+import markdown_outline
+from mindmap.reader import MapReader
+
+DATE = "org.freeplane.features.format.FormattedDate|{}|date"
+
+MAP = f"""<map version="freeplane 1.12.1">
+<node TEXT="Notebook" ID="ID_root">
+<node TEXT="Reading" ID="ID_reading">
+<node TEXT="Papers" ID="ID_papers">
+<node TEXT="Dynamo" LINK="https://example.org/dynamo paper.pdf" ID="ID_dynamo"/>
+</node>
+<node ID="ID_rich">
+<node TEXT="Under a rich text node" ID="ID_under"/>
+</node>
+</node>
+<node TEXT="Days" ID="ID_days">
+<node TEXT="31/01/2026" OBJECT="{DATE.format("2026-01-31")}" ID="ID_d31">
+<node TEXT="Release" ID="ID_release"/>
+</node>
+<node TEXT="01/02/2026" OBJECT="{DATE.format("2026-02-01")}" ID="ID_d01"/>
+<node TEXT="30/01/2026" OBJECT="{DATE.format("2026-01-30")}" ID="ID_d30"/>
+</node>
+</node>
+</map>"""
+
+
+def export(chunk_dir: Optional[str] = None, split: str = "branch") -> str:
+    output = StringIO()
+    markdown_outline.Formatter(output, chunk_dir=chunk_dir, split=split).export(
+        MapReader.from_bytes(MAP.encode())
+    )
+    return output.getvalue()
+
+
+def read(directory: str, name: str) -> str:
+    with open(os.path.join(directory, name), encoding="utf-8") as file:
+        return file.read()
+
+
+class TestMarkdownOutline(unittest.TestCase):
+    def test_outline_of_the_map(self) -> None:
+        self.assertEqual(
+            "# Notebook\n"
+            "\n## Reading\n\n"
+            "- Papers\n"
+            "  - [Dynamo](<https://example.org/dynamo paper.pdf>)\n"
+            "- Under a rich text node\n"
+            "\n## Days\n\n"
+            "- 31/01/2026\n"
+            "  - Release\n"
+            "- 01/02/2026\n"
+            "- 30/01/2026\n",
+            export(),
+        )
+
+    def test_chunks_by_branch(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            summary = export(directory)
+
+            self.assertEqual(
+                ["001-reading.md", "002-days.md", "index.md"],
+                sorted(os.listdir(directory)),
+            )
+            self.assertEqual(f"2 chunks, 9 nodes written to {directory}\n", summary)
+            self.assertEqual(
+                "# Notebook\n\n"
+                "- [Reading](001-reading.md) (4 nodes)\n"
+                "- [Days](002-days.md) (5 nodes)\n",
+                read(directory, "index.md"),
+            )
+            self.assertTrue(
+                read(directory, "002-days.md").startswith(
+                    "# Days\n\n[Index](index.md)\n\n## Days\n"
+                )
+            )
+
+    def test_chunks_by_month(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            export(directory, split="month")
+
+            self.assertEqual(
+                ["2026-01.md", "2026-02.md", "index.md", "other.md"],
+                sorted(os.listdir(directory)),
+            )
+            january = read(directory, "2026-01.md")
+            # Dates are sorted, each with its subtree
+            self.assertEqual(
+                "# January 2026\n\n[Index](index.md)\n"
+                "\n## 30/01/2026\n\n"
+                "\n## 31/01/2026\n\n"
+                "- Release\n",
+                january,
+            )
+            self.assertIn("## Reading", read(directory, "other.md"))
+            self.assertNotIn("Days", read(directory, "other.md"))
+
+    def test_unknown_split(self) -> None:
+        with self.assertRaises(ValueError):
+            markdown_outline.Formatter(StringIO(), split="week")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,158 @@
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from main import main
+from mindmap_diff import MapDiff
+
+MAP = """<map version="freeplane 1.12.1">
+<node TEXT="Root" ID="ID_root" MODIFIED="1">
+<node TEXT="14/01/2026" OBJECT="org.freeplane.features.format.FormattedDate|2026-01-14|date" ID="ID_d14">
+<node TEXT="WORKLOG" ID="ID_w14">
+<node TEXT="Project A" ID="ID_pa">
+<node TEXT="14/01/2026 09:00" OBJECT="org.freeplane.features.format.FormattedDate|2026-01-14T09:00+0100|datetime" ID="ID_t1">
+<node TEXT="14/01/2026 10:00" OBJECT="org.freeplane.features.format.FormattedDate|2026-01-14T10:00+0100|datetime" ID="ID_t2"/>
+</node>
+</node>
+</node>
+</node>
+<node TEXT="Ideas" ID="ID_ideas">
+<node TEXT="First idea" ID="ID_i1"/>
+<node TEXT="Second idea" ID="ID_i2"/>
+</node>
+<node TEXT="Archive" ID="ID_archive"/>
+</node>
+</map>"""
+
+
+def diff_lines(old: str, new: str) -> list[str]:
+    return MapDiff.between(old.encode(), new.encode()).format_lines()
+
+
+class TestMapDiff(unittest.TestCase):
+    def test_layout_changes_are_no_difference(self) -> None:
+        churned = MAP.replace('MODIFIED="1"', 'MODIFIED="2" FOLDED="true"')
+
+        diff = MapDiff.between(MAP.encode(), churned.encode())
+
+        self.assertFalse(diff)
+        self.assertEqual([], diff.format_lines())
+
+    def test_edited_node(self) -> None:
+        edited = MAP.replace('TEXT="First idea"', 'TEXT="Best idea"').replace(
+            'ID="ID_i2"/>', 'ID="ID_i2"><icon BUILTIN="stop-sign"/></node>'
+        )
+
+        self.assertEqual(
+            [
+                "edited    Root / Ideas / Best idea: text 'First idea' -> 'Best idea'",
+                "edited    Root / Ideas / Second idea: icons [] -> ['StopSign']",
+            ],
+            diff_lines(MAP, edited),
+        )
+
+    def test_added_and_removed_nodes(self) -> None:
+        changed = MAP.replace(
+            '<node TEXT="Second idea" ID="ID_i2"/>',
+            '<node TEXT="Third idea" ID="ID_i3"><node TEXT="Detail" ID="ID_i4"/></node>',
+        )
+
+        self.assertEqual(
+            [
+                "removed   Root / Ideas / Second idea",
+                "added     Root / Ideas / Third idea: 2 nodes",
+            ],
+            diff_lines(MAP, changed),
+        )
+
+    def test_moved_node_is_matched_by_id(self) -> None:
+        moved = MAP.replace('<node TEXT="First idea" ID="ID_i1"/>', "").replace(
+            '<node TEXT="Archive" ID="ID_archive"/>',
+            '<node TEXT="Archive" ID="ID_archive">'
+            '<node TEXT="First idea, done" ID="ID_i1"/></node>',
+        )
+
+        self.assertEqual(
+            [
+                "moved     Root / Ideas / First idea: to Root / Archive / First idea, done",
+                "edited    Root / Archive / First idea, done: "
+                "text 'First idea' -> 'First idea, done'",
+            ],
+            diff_lines(MAP, moved),
+        )
+
+    def test_node_with_a_new_id_is_matched_by_digest(self) -> None:
+        moved = MAP.replace('<node TEXT="First idea" ID="ID_i1"/>', "").replace(
+            '<node TEXT="Archive" ID="ID_archive"/>',
+            '<node TEXT="Archive" ID="ID_archive">'
+            '<node TEXT="First idea" ID="ID_copy"/></node>',
+        )
+        renumbered = MAP.replace('ID="ID_i1"', 'ID="ID_other"')
+
+        self.assertEqual(
+            ["moved     Root / Ideas / First idea: to Root / Archive / First idea"],
+            diff_lines(MAP, moved),
+        )
+        self.assertEqual([], diff_lines(MAP, renumbered))
+
+    def test_reordered_children(self) -> None:
+        first = '<node TEXT="First idea" ID="ID_i1"/>\n'
+        second = '<node TEXT="Second idea" ID="ID_i2"/>\n'
+        reordered = MAP.replace(first + second, second + first)
+
+        self.assertEqual(["reordered Root / Ideas"], diff_lines(MAP, reordered))
+
+    def test_changed_time_entries(self) -> None:
+        changed = MAP.replace("2026-01-14T10:00", "2026-01-14T10:30").replace(
+            'TEXT="Project A"', 'TEXT="Project B"'
+        )
+
+        lines = diff_lines(MAP, changed)
+
+        self.assertEqual(
+            [
+                "entry - 2026-01-14 09:00 - 10:00 Project A [WORKLOG]",
+                "entry + 2026-01-14 09:00 - 10:30 Project B [WORKLOG]",
+            ],
+            lines[-2:],
+        )
+
+    def test_removed_date_removes_its_entries(self) -> None:
+        start = MAP.index('<node TEXT="14/01/2026"')
+        end = MAP.index('<node TEXT="Ideas"')
+        removed = MAP[:start] + MAP[end:]
+
+        self.assertEqual(
+            [
+                "removed   Root / 14/01/2026: 5 nodes",
+                "entry - 2026-01-14 09:00 - 10:00 Project A [WORKLOG]",
+            ],
+            diff_lines(MAP, removed),
+        )
+
+
+class TestDiffCommand(unittest.TestCase):
+    def run_diff(self, old: str, new: str) -> tuple[int, str]:
+        with tempfile.TemporaryDirectory() as directory:
+            paths = [os.path.join(directory, name) for name in ("old.mm", "new.mm")]
+            for path, content in zip(paths, (old, new)):
+                with open(path, "w") as file:
+                    file.write(content)
+            output = StringIO()
+            with redirect_stdout(output):
+                status = main(["diff", *paths])
+        return status, output.getvalue()
+
+    def test_exit_status_tells_whether_revisions_differ(self) -> None:
+        self.assertEqual((0, ""), self.run_diff(MAP, MAP))
+
+        status, output = self.run_diff(MAP, MAP.replace("Second idea", "Other"))
+
+        self.assertEqual(1, status)
+        self.assertIn("edited    Root / Ideas / Other", output)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import unittest
+from io import StringIO
+import xml.etree.ElementTree as xml
+
+import orgmode
+from mindmap.cache import NodePropertyCache
+from mindmap.reader import DateReader, DateTimeReader, NodeTreeHelper
+from worklog.format import TodoHelper
+
+FORMATTED_DATE = "org.freeplane.features.format.FormattedDate"
+DATETIME_NODE = '<node TEXT="08:36" OBJECT="org.freeplane.features.format.FormattedDate|2026-01-14T08:36+0400|datetime"/>'
+
+
+class TestNodePropertyCache(unittest.TestCase):
+    def test_no_cache_outside_of_an_export(self) -> None:
+        self.assertIsNone(NodePropertyCache.current())
+        self.assertTrue(NodeTreeHelper.is_leaf(xml.fromstring('<node TEXT="a"/>')))
+
+    def test_properties_are_computed_once_per_node(self) -> None:
+        node = xml.fromstring(DATETIME_NODE)
+        with NodePropertyCache.activate() as cache:
+            first = DateTimeReader.read_datetime(node)
+            second = DateTimeReader.read_datetime(node)
+            DateReader.read_date(node)
+            # Cheaper to compute than to look up: not memoized
+            DateTimeReader.is_datetime_node(node)
+            TodoHelper.is_todo(node)
+            NodeTreeHelper.is_leaf(node)
+
+        self.assertIs(first, second)
+        self.assertEqual((1, 2), (cache.hits, cache.misses))
+
+    def test_nested_activation_shares_the_outer_cache(self) -> None:
+        node = xml.fromstring(DATETIME_NODE)
+        with NodePropertyCache.activate() as outer:
+            DateReader.read_date(node)
+            with NodePropertyCache.activate() as inner:
+                DateReader.read_date(node)
+            self.assertIs(outer, inner)
+            self.assertIs(outer, NodePropertyCache.current())
+
+        self.assertEqual((1, 1), (outer.hits, outer.misses))
+        self.assertIsNone(NodePropertyCache.current())
+
+    def test_cache_is_released_when_the_block_exits(self) -> None:
+        node = xml.fromstring(DATETIME_NODE)
+        with NodePropertyCache.activate() as cache:
+            DateReader.read_date(node)
+            DateReader.read_date(node)
+
+        self.assertEqual({}, cache._tables)
+        self.assertEqual(
+            "node cache: 1 hits, 1 misses (50.0% hit rate)", cache.stats().format_line()
+        )
+
+    def test_values_are_not_shared_between_distinct_nodes(self) -> None:
+        with NodePropertyCache.activate() as cache:
+            for day in ("2026-01-14", "2026-01-15", "2026-01-14"):
+                node = xml.Element("node", OBJECT=f"{FORMATTED_DATE}|{day}|date")
+                value = DateReader.read_date(node)
+                assert value is not None
+                self.assertEqual(day, value.value.isoformat())
+        self.assertEqual(0, cache.hits)
+
+    def test_export_records_the_stats_of_the_active_cache(self) -> None:
+        xml_str = """
+        <node TEXT="Root">
+            <node TEXT="14/01/2026" OBJECT="org.freeplane.features.format.FormattedDate|2026-01-14T00:00+0400|date">
+                <node TEXT="WORKLOG">
+                    <node TEXT="Project">
+                        <node TEXT="Task">
+                            <node TEXT="09:00" OBJECT="org.freeplane.features.format.FormattedDate|2026-01-14T09:00+0400|datetime"/>
+                        </node>
+                    </node>
+                </node>
+            </node>
+        </node>
+        """
+        root = xml.fromstring(xml_str)
+        formatter = orgmode.Formatter(output=StringIO())
+        formatter.export(root)
+        # A single export runs without cache
+        self.assertIsNone(formatter.cache_stats)
+        self.assertIsNone(NodePropertyCache.current())
+
+        # Passes sharing an active cache read the dates once
+        with NodePropertyCache.activate():
+            orgmode.Formatter(output=StringIO()).export(root)
+            formatter.export(root)
+
+        assert formatter.cache_stats is not None
+        self.assertGreater(formatter.cache_stats.hits, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
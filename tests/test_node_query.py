@@ -0,0 +1,142 @@
+import unittest
+import xml.etree.ElementTree as xml
+from contextlib import redirect_stderr, redirect_stdout
+from datetime import date
+from io import StringIO
+
+from main import main
+from mindmap.reader import MapReader
+from node_query import NodeFilter, NodeIndex
+
+MAP = """<map version="freeplane 1.12.1">
+<node TEXT="Root">
+<node TEXT="14/01/2026" OBJECT="org.freeplane.features.format.FormattedDate|2026-01-14|date">
+<node TEXT="TODO">
+<node TEXT="!Fix export"><icon BUILTIN="stop-sign"/></node>
+<node TEXT="Done thing"/>
+</node>
+<node TEXT="WORKLOG">
+<node TEXT="!Review notes"><icon BUILTIN="stop-sign"/><icon BUILTIN="checked"/></node>
+</node>
+</node>
+<node TEXT="15/01/2026" OBJECT="org.freeplane.features.format.FormattedDate|2026-01-15|date">
+<node TEXT="TODO">
+<node TEXT="!Write tests"><node TEXT="Unit"/></node>
+</node>
+</node>
+<node TEXT="Ideas">
+<node TEXT="TODO"/>
+<node TEXT="!Someday"/>
+</node>
+</node>
+</map>"""
+
+
+def texts(index: NodeIndex, node_filter: NodeFilter) -> list[str]:
+    return [index.nodes[p].get("TEXT", "") for p in index.select(node_filter)]
+
+
+class TestNodeIndex(unittest.TestCase):
+    def setUp(self) -> None:
+        self.index = NodeIndex(MapReader.from_bytes(MAP.encode()))
+
+    def test_filters(self) -> None:
+        self.assertEqual(
+            ["!Fix export", "!Review notes", "!Write tests", "!Someday"],
+            texts(self.index, NodeFilter(todo=True)),
+        )
+        self.assertEqual(
+            ["!Fix export", "Done thing", "!Write tests", "Unit"],
+            texts(self.index, NodeFilter(sections=("TODO",))),
+        )
+        self.assertEqual(
+            ["!Fix export", "!Review notes"],
+            texts(self.index, NodeFilter(tags=("StopSign",))),
+        )
+        self.assertEqual(
+            ["!Review notes"],
+            texts(self.index, NodeFilter(tags=("stop-sign", "checked"))),
+        )
+        self.assertEqual([], texts(self.index, NodeFilter(tags=("missing",))))
+        self.assertEqual(
+            ["15/01/2026", "TODO", "!Write tests", "Unit"],
+            texts(self.index, NodeFilter(date_from=date(2026, 1, 15))),
+        )
+        self.assertEqual(
+            ["!Fix export", "!Review notes"],
+            texts(self.index, NodeFilter(todo=True, date_to=date(2026, 1, 14))),
+        )
+        self.assertEqual(
+            ["!Review notes", "!Write tests"],
+            texts(self.index, NodeFilter(todo=True, pattern=r"(?i)notes|tests")),
+        )
+
+    def test_sections_are_only_under_date_nodes(self) -> None:
+        self.assertIsNone(
+            self.index.match(
+                self.index.select(NodeFilter(pattern="Someday"))[0]
+            ).section
+        )
+        match = self.index.match(self.index.select(NodeFilter(pattern="Unit"))[0])
+        self.assertEqual("TODO", match.section)
+        self.assertEqual(date(2026, 1, 15), match.date)
+        self.assertEqual(
+            "2026-01-15 [TODO] Root / 15/01/2026 / TODO / !Write tests / Unit",
+            match.format_line(),
+        )
+
+    def test_prune_keeps_ancestors_and_whole_selected_subtrees(self) -> None:
+        positions = self.index.select(
+            NodeFilter(todo=True, date_from=date(2026, 1, 15))
+        )
+        pruned = self.index.prune(positions)
+
+        self.assertEqual(
+            '<node TEXT="Root"><node TEXT="15/01/2026" OBJECT="org.freeplane.'
+            'features.format.FormattedDate|2026-01-15|date"><node TEXT="TODO">'
+            '<node TEXT="!Write tests"><node TEXT="Unit" /></node></node></node>'
+            "</node>",
+            xml.tostring(pruned, encoding="unicode").replace("\n", ""),
+        )
+        # The map itself is left untouched
+        self.assertEqual(3, len(self.index.nodes[0]))
+
+
+class TestQueryCommand(unittest.TestCase):
+    def query(self, *args: str) -> tuple[int, str]:
+        output = StringIO()
+        with redirect_stdout(output), redirect_stderr(StringIO()):
+            try:
+                status = main(["query", "--input", "data/FreePlane/mm3.mm", *args])
+            except SystemExit as exit:
+                status = int(exit.code or 0)
+        return status, output.getvalue()
+
+    def test_node_filters_list_matches(self) -> None:
+        self.assertEqual(
+            (
+                0,
+                "2026-01-14 [WORKLOG] New Mindmap / Jan/26 / 14/01/2026 / WORKLOG"
+                " / Investigate git-annex\n",
+            ),
+            self.query("--regex", "git-annex", "--date-to", "2026-01-14"),
+        )
+
+    def test_matches_are_rendered_with_a_formatter(self) -> None:
+        status, output = self.query(
+            "--section", "TODO", "--formatter", "orgmode_date_sections.py"
+        )
+
+        self.assertEqual(0, status)
+        self.assertIn("**** TODO Next work", output)
+        self.assertNotIn("WORKLOG", output)
+
+    def test_usage_errors(self) -> None:
+        self.assertEqual(2, self.query()[0])
+        self.assertEqual(2, self.query("--at", "2026-01-15 11:22", "--todo")[0])
+        self.assertEqual(2, self.query("--regex", "(")[0])
+        self.assertEqual(2, self.query("--date-from", "15/01/2026")[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,255 @@
+import glob
+import os
+import unittest
+import xml.etree.ElementTree as xml
+from datetime import datetime
+from io import StringIO
+from typing import Dict, List
+
+import orgmode_date_sections
+from main import read_mindmap
+from mindmap.generator import GeneratorConfig, MapGenerator
+from mindmap.org_import import MapWriter, OrgImporter, import_org
+from mindmap.reader import DateReader, DateTimeReader, MapReader, NoteReader
+from worklog.entries import TimeEntryCollector
+
+MM3 = "data/FreePlane/mm3.mm"
+
+ORG = """\
+* [2026-01-14 Wed]
+** PROJ TIMES
+- 09:00 - 10:30: Review :StopSign:Idea:
+- 23:30 - 00:15: Late deploy
+- 10:30 - noend: Open
+** TODO
+*** PROJ Release
+**** TODO Write the notes
+- First
+  - Nested
+- Second
+** PROJ WORKLOG
+*** TODO Call back
+"""
+
+
+def import_text(text: str) -> xml.Element:
+    output = StringIO()
+    import_org(text.splitlines(keepends=True), output, "Worklog")
+    return MapReader.from_bytes(output.getvalue().encode())
+
+
+def export_org(root: xml.Element) -> list[str]:
+    formatter = orgmode_date_sections.Formatter()
+    formatter.parse(root)
+    return formatter.format()
+
+
+def round_trip(exported: List[str]) -> List[str]:
+    return export_org(import_text("\n".join(exported)))
+
+
+FIXTURES = "data/FreePlane"
+
+
+def find_node(root: xml.Element, text: str) -> xml.Element:
+    node = root.find(f".//node[@TEXT='{text}']")
+    assert node is not None, text
+    return node
+
+
+class TestOrgImport(unittest.TestCase):
+    def test_date_headings_become_date_nodes(self) -> None:
+        root = import_text(ORG)
+
+        date_node = DateReader.find_all_date_nodes(root)[0]
+        self.assertEqual("14/01/2026", date_node.get("TEXT"))
+        self.assertEqual(
+            "org.freeplane.features.format.FormattedDate|2026-01-14|date",
+            date_node.get("OBJECT"),
+        )
+        sections = [child.get("TEXT") for child in date_node if child.tag == "node"]
+        self.assertEqual(["TIMES", "TODO", "WORKLOG"], sections)
+
+    def test_times_lines_become_time_entries(self) -> None:
+        entries = TimeEntryCollector.collect(import_text(ORG))
+
+        self.assertEqual(
+            [
+                ("Review", datetime(2026, 1, 14, 9), datetime(2026, 1, 14, 10, 30)),
+                (
+                    "Late deploy",
+                    datetime(2026, 1, 14, 23, 30),
+                    datetime(2026, 1, 15, 0, 15),
+                ),
+                ("Open", datetime(2026, 1, 14, 10, 30), None),
+            ],
+            [(entry.task_name, entry.start, entry.end) for entry in entries],
+        )
+        self.assertEqual(["StopSign", "Idea"], entries[0].tags)
+
+    def test_todo_headings_and_notes(self) -> None:
+        root = import_text(ORG)
+
+        html = NoteReader.find_note_html(find_node(root, "Write the notes"))
+        assert html is not None
+        self.assertEqual(
+            [(0, "First"), (1, "Nested"), (0, "Second")],
+            NoteReader.read_list_items(html),
+        )
+        # Outside the TODO section, TODO headings were marked nodes
+        find_node(root, "! Call back")
+
+    def test_round_trip_of_the_fixtures(self) -> None:
+        paths = sorted(glob.glob(os.path.join(FIXTURES, "*.mm")))
+        self.assertTrue(paths)
+        for path in paths:
+            with self.subTest(path):
+                exported = export_org(read_mindmap(path))
+
+                self.assertEqual(exported, round_trip(exported))
+
+    def test_round_trip_of_a_generated_map(self) -> None:
+        output = StringIO()
+        MapGenerator(GeneratorConfig(seed=3, days=10)).write(output)
+        exported = export_org(MapReader.from_bytes(output.getvalue().encode()))
+
+        self.assertEqual(exported, round_trip(exported))
+
+    def test_only_the_times_written_again_as_blocks_are_datetime_nodes(self) -> None:
+        def datetime_texts(root: xml.Element) -> List[str]:
+            return sorted(
+                node.get("TEXT", "")
+                for node in root.iter("node")
+                if DateTimeReader.is_datetime_node(node)
+            )
+
+        original = read_mindmap(MM3)
+        imported = import_text("\n".join(export_org(original)))
+
+        # On 14/01 most times are text: they have no block of their own
+        self.assertEqual(datetime_texts(original), datetime_texts(imported))
+
+    def test_time_headings_hold_one_end_time(self) -> None:
+        root = import_text(
+            "* [2026-01-14 Wed]\n"
+            "** PROJ WORKLOG\n"
+            "*** PROJ Release\n"
+            "*** PROJ 14/01/2026 08:00\n"
+            "- 14/01/2026 09:00\n"
+            "  - Comment\n"
+            "- 14/01/2026 10:00\n"
+            "  - Task\n"
+        )
+
+        release = find_node(root, "Release")
+        self.assertEqual(
+            ["14/01/2026 08:00", "14/01/2026 10:00"],
+            [child.get("TEXT") for child in release],
+        )
+        self.assertEqual(
+            ["14/01/2026 09:00"],
+            [child.get("TEXT") for child in find_node(root, "14/01/2026 08:00")],
+        )
+
+    def test_end_times_filled_in_by_the_exporter_are_not_nodes(self) -> None:
+        times = (
+            "* [2026-01-14 Wed]\n"
+            "** PROJ TIMES\n"
+            "- 09:00 - 10:00: Review\n"
+            "- 10:00 - 11:00: Deploy\n"
+            "* [2026-01-14 Wed]\n"
+            "** PROJ {review}\n"
+            "* [2026-01-14 Wed]\n"
+            "** PROJ Deploy\n"
+            "\n"
+            "** PROJ 14/01/2026 11:00\n"
+        )
+
+        def children(text: str) -> Dict[str, List[str]]:
+            root = import_text(text)
+            return {
+                start: [child.get("TEXT", "") for child in find_node(root, start)]
+                for start in ("14/01/2026 09:00", "14/01/2026 10:00")
+            }
+
+        self.assertEqual(
+            {
+                "14/01/2026 09:00": ["Review"],
+                "14/01/2026 10:00": ["Deploy", "14/01/2026 11:00"],
+            },
+            children(times.format(review="Review")),
+        )
+        # Unless the block of the entry lists it
+        self.assertEqual(
+            ["Review", "14/01/2026 10:00"],
+            children(times.format(review="Review\n\n** PROJ 14/01/2026 10:00"))[
+                "14/01/2026 09:00"
+            ],
+        )
+
+    def test_projects_and_tasks_are_rebuilt_from_the_headings(self) -> None:
+        root = import_text(
+            "* [2026-01-14 Wed]\n"
+            "** PROJ WORKLOG\n"
+            "*** PROJ Release\n"
+            "*** PROJ Notes\n"
+            "- 14/01/2026 09:00\n"
+            "  - 14/01/2026 10:00\n"
+            "*** PROJ Tag\n"
+            "- 14/01/2026 10:00\n"
+            "  - 14/01/2026 10:30\n"
+            "*** PROJ Support\n"
+            "*** PROJ Call\n"
+            "- 14/01/2026 11:00\n"
+            "  - 14/01/2026 11:15\n"
+            "* [2026-01-14 Wed]\n"
+            "** PROJ 14/01/2026 10:00\n"
+            "* [2026-01-14 Wed]\n"
+            "** PROJ 14/01/2026 10:30\n"
+            "* [2026-01-14 Wed]\n"
+            "** PROJ 14/01/2026 11:15\n"
+        )
+
+        worklog = find_node(root, "WORKLOG")
+        self.assertEqual(
+            {"Release": ["Notes", "Tag"], "Support": ["Call"]},
+            {
+                project.get("TEXT"): [task.get("TEXT") for task in project]
+                for project in worklog
+            },
+        )
+        self.assertEqual(
+            [("Release", "Notes"), ("Release", "Tag"), ("Support", "Call")],
+            [
+                (entry.project, entry.task_name)
+                for entry in TimeEntryCollector.collect(root)
+            ],
+        )
+
+    def test_blocks_are_written_as_lines_are_fed(self) -> None:
+        output = StringIO()
+        writer = MapWriter(output)
+        writer.begin("Worklog")
+        importer = OrgImporter(writer)
+        for line in ORG.splitlines():
+            importer.feed(line)
+        importer.feed("* [2026-01-15 Thu]")
+
+        # The day is kept while the blocks that follow may be those of its
+        # datetime nodes
+        self.assertNotIn('TEXT="Late deploy"', output.getvalue())
+        importer.feed("** PROJ WORKLOG")
+        importer.feed("* [2026-01-16 Fri]")
+        self.assertIn('TEXT="Late deploy"', output.getvalue())
+        # Only the root is open between the blocks
+        self.assertEqual(1, writer.depth)
+        importer.close()
+        writer.end()
+
+        root = MapReader.from_bytes(output.getvalue().encode())
+        days = [child.get("TEXT") for child in root if child.tag == "node"]
+        self.assertEqual(["14/01/2026", "15/01/2026", "16/01/2026"], days)
+
+
+if __name__ == "__main__":
+    unittest.main()
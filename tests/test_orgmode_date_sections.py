@@ -1,8 +1,12 @@
+import pickle
 import unittest
+from contextlib import redirect_stderr
+from io import StringIO
 import xml.etree.ElementTree as xml
 from datetime import datetime, date
 
-from orgmode_date_sections import Formatter
+from main import main
+from orgmode_date_sections import DatePayload, Formatter
 
 
 class TestOrgmodeDateSections(unittest.TestCase):
@@ -442,6 +446,109 @@ class TestOrgmodeDateSections(unittest.TestCase):
         self.assertIn("*** Header", output)
         self.assertIn("- Child Leaf", output)
 
+    # ========== TODO Notes (richcontent) Tests ==========
+
+    def test_todo_note_renders_list_items(self) -> None:
+        xml_str = """<node TEXT="Root">
+            <node TEXT="2026-01-24" OBJECT="org.freeplane.features.format.FormattedDate|2026-01-24T00:00+0400|date">
+                <node TEXT="TODO">
+                    <node TEXT="Next work">
+                        <richcontent TYPE="NOTE" CONTENT-TYPE="xml/">
+                            <html><head/><body><ul><li>Some notes here</li><li>Another &amp; line</li></ul></body></html>
+                        </richcontent>
+                    </node>
+                </node>
+            </node>
+        </node>"""
+        lines = self.get_output_lines(xml.fromstring(xml_str))
+
+        self.assertEqual(
+            ["*** TODO Next work", "- Some notes here", "- Another & line"],
+            lines[2:],
+        )
+
+    def test_todo_note_with_nested_items_indents_all_but_first(self) -> None:
+        xml_str = """<node TEXT="Root">
+            <node TEXT="2026-01-24" OBJECT="org.freeplane.features.format.FormattedDate|2026-01-24T00:00+0400|date">
+                <node TEXT="TODO">
+                    <node TEXT="Export">
+                        <richcontent TYPE="NOTE" CONTENT-TYPE="xml/">
+                            <html><body><ul><li>TIMES<ul><li>Children <b>too</b></li></ul></li><li>WORKLOG</li></ul></body></html>
+                        </richcontent>
+                    </node>
+                </node>
+            </node>
+        </node>"""
+        lines = self.get_output_lines(xml.fromstring(xml_str))
+
+        self.assertEqual(
+            ["*** TODO Export", "- TIMES", "  - Children too", "  - WORKLOG"],
+            lines[2:],
+        )
+
+    def test_parse_html_list_keeps_nesting_depth(self) -> None:
+        html_text = (
+            "<html><body><ul><li>A<ul><li>B</li></ul></li><li></li></ul></body></html>"
+        )
+        self.assertEqual(["A", "  B"], self.formatter._parse_html_list(html_text))
+
+    # ========== Parallel Rendering Tests ==========
+
+    def build_dates_map(self) -> xml.Element:
+        root = xml.Element("node", TEXT="Root")
+        for day in range(1, 10):
+            text = f"2026-01-{day:02d}"
+            date_node = xml.SubElement(
+                root,
+                "node",
+                TEXT=text,
+                OBJECT=f"org.freeplane.features.format.FormattedDate|{text}T00:00+0400|date",
+                ID=f"ID_{day}",
+            )
+            worklog = xml.SubElement(date_node, "node", TEXT="WORKLOG")
+            project = xml.SubElement(worklog, "node", TEXT=f"Project {day}")
+            xml.SubElement(project, "node", TEXT="Task")
+            todo = xml.SubElement(date_node, "node", TEXT="TODO")
+            item = xml.SubElement(todo, "node", TEXT="Follow up")
+            xml.SubElement(item, "icon", BUILTIN="unchecked")
+            note = xml.SubElement(item, "richcontent", TYPE="NOTE")
+            note.append(
+                xml.fromstring("<html><body><ul><li>Step</li></ul></body></html>")
+            )
+        return root
+
+    def get_parallel_output_lines(self, root: xml.Element, jobs: int) -> list[str]:
+        formatter = Formatter(jobs=jobs)
+        formatter.parse(root)
+        return formatter.format()
+
+    def test_jobs_output_matches_serial(self) -> None:
+        root = self.build_dates_map()
+        self.assertEqual(
+            self.get_output_lines(root), self.get_parallel_output_lines(root, jobs=2)
+        )
+
+    def test_jobs_option_is_rejected_for_other_formatters(self) -> None:
+        with redirect_stderr(StringIO()) as stderr, self.assertRaises(SystemExit):
+            main(["--input", "map.mm", "--formatter", "titles", "--jobs", "2"])
+        self.assertIn(
+            "--jobs is only supported by orgmode_date_sections", stderr.getvalue()
+        )
+
+    def test_date_payload_round_trip_keeps_rendered_content(self) -> None:
+        formatter = Formatter()
+        formatter.parse(self.build_dates_map())
+        date_entry = formatter.result[0]
+
+        # Payloads are pickled to the workers on every start method
+        unpacked = pickle.loads(pickle.dumps(DatePayload.pack(date_entry))).unpack()
+
+        self.assertEqual(
+            formatter._format_date_entry(date_entry),
+            formatter._format_date_entry(unpacked),
+        )
+        self.assertNotIn("ID", unpacked.sections[0].node.attrib)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,188 @@
+import os
+import stat
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from unittest.mock import patch
+
+from main import main
+from output_cache import (
+    OutputCache,
+    _project_sources,
+    formatter_source_digest,
+    replace_if_changed,
+    write_if_changed,
+)
+
+MAP_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), "data", "FreePlane", "mm3.mm"
+)
+
+
+class TestOutputCache(unittest.TestCase):
+    def test_key_depends_on_input_formatter_and_options(self) -> None:
+        key = OutputCache.key(b"<map/>", "titles", {})
+
+        self.assertEqual(key, OutputCache.key(b"<map/>", "titles", {}))
+        self.assertNotEqual(key, OutputCache.key(b"<map />", "titles", {}))
+        self.assertNotEqual(key, OutputCache.key(b"<map/>", "leaf_as_text", {}))
+        self.assertNotEqual(key, OutputCache.key(b"<map/>", "titles", {"jobs": 2}))
+
+    def test_formatter_sources_include_imported_project_modules(self) -> None:
+        sources = [os.path.basename(path) for path in _project_sources("orgmode")]
+
+        self.assertIn("orgmode.py", sources)
+        self.assertIn("mindmap_exporter.py", sources)
+        self.assertIn("helpers.py", sources)
+        self.assertNotIn("main.py", sources)
+        self.assertNotEqual(
+            formatter_source_digest("orgmode"), formatter_source_digest("titles")
+        )
+
+    def test_get_returns_what_was_put(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            cache = OutputCache(directory)
+            self.assertIsNone(cache.get("ab12"))
+            cache.put("ab12", "line\r\nother\n")
+            self.assertEqual("line\r\nother\n", cache.get("ab12"))
+
+
+class TestWriteIfChanged(unittest.TestCase):
+    def test_unchanged_content_leaves_the_file_untouched(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "out.org")
+            self.assertTrue(write_if_changed(path, "* Title\n"))
+            os.chmod(path, 0o640)
+            before = os.stat(path)
+
+            self.assertFalse(write_if_changed(path, "* Title\n"))
+            self.assertEqual(before.st_ino, os.stat(path).st_ino)
+
+            self.assertTrue(write_if_changed(path, "* Other\n"))
+            with open(path) as file:
+                self.assertEqual("* Other\n", file.read())
+            self.assertEqual(0o640, stat.S_IMODE(os.stat(path).st_mode))
+            self.assertEqual(["out.org"], os.listdir(directory))
+
+    def test_crlf_content_is_compared_as_written(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "out.csv")
+            self.assertTrue(write_if_changed(path, "a,b\r\n"))
+
+            self.assertFalse(write_if_changed(path, "a,b\r\n"))
+            with open(path, "rb") as file:
+                self.assertEqual(b"a,b\r\n", file.read())
+
+
+class TestReplaceIfChanged(unittest.TestCase):
+    def test_unchanged_output_leaves_the_file_untouched(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "out.csv")
+            with replace_if_changed(path) as file:
+                file.write("a,b\r\n")
+            os.chmod(path, 0o640)
+            before = os.stat(path)
+
+            with replace_if_changed(path) as file:
+                file.write("a,b\r\n")
+            self.assertEqual(before.st_ino, os.stat(path).st_ino)
+
+            with replace_if_changed(path) as file:
+                file.write("a,c\r\n")
+            with open(path, "rb") as file_bytes:
+                self.assertEqual(b"a,c\r\n", file_bytes.read())
+            self.assertEqual(0o640, stat.S_IMODE(os.stat(path).st_mode))
+            self.assertEqual(["out.csv"], os.listdir(directory))
+
+    def test_outputs_of_the_same_size_are_compared_by_chunks(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "out.org")
+            with replace_if_changed(path) as file:
+                file.write("x" * 10 + "a")
+            with patch("output_cache.COMPARE_CHUNK_SIZE", 4):
+                with replace_if_changed(path) as file:
+                    file.write("x" * 10 + "b")
+
+            with open(path) as text:
+                self.assertEqual("x" * 10 + "b", text.read())
+
+    def test_failed_export_keeps_the_file(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "out.org")
+            write_if_changed(path, "* Title\n")
+
+            with self.assertRaises(RuntimeError):
+                with replace_if_changed(path) as file:
+                    file.write("* Partial")
+                    raise RuntimeError("formatter failed")
+
+            with open(path) as text:
+                self.assertEqual("* Title\n", text.read())
+            self.assertEqual(["out.org"], os.listdir(directory))
+
+
+class TestCachedExport(unittest.TestCase):
+    def export(self, *extra: str) -> int:
+        with redirect_stdout(StringIO()):
+            return main(
+                ["--input", MAP_PATH, "--formatter", "orgmode.py", *extra],
+            )
+
+    def export_with(self, formatter: str, output: str) -> None:
+        main(["--input", MAP_PATH, "--formatter", formatter, "--output", output])
+
+    def test_hit_skips_the_formatter_and_keeps_the_output(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, "out.org")
+            cache_dir = os.path.join(directory, "cache")
+            self.export("--output", output, "--cache-dir", cache_dir)
+            first = os.stat(output)
+
+            with patch("main.MindMapFormatter") as formatter:
+                self.export("--output", output, "--cache-dir", cache_dir)
+
+            formatter.assert_not_called()
+            self.assertEqual(first.st_ino, os.stat(output).st_ino)
+            self.assertEqual(first.st_mtime_ns, os.stat(output).st_mtime_ns)
+
+    def test_hit_restores_a_modified_output(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, "out.org")
+            cache_dir = os.path.join(directory, "cache")
+            self.export("--output", output, "--cache-dir", cache_dir)
+            with open(output) as file:
+                expected = file.read()
+            with open(output, "w") as file:
+                file.write("edited")
+
+            self.export("--output", output, "--cache-dir", cache_dir)
+
+            with open(output) as file:
+                self.assertEqual(expected, file.read())
+
+    def test_unchanged_export_leaves_the_output_untouched(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, "out.txt")
+            # iCalendar lines end with CRLF
+            for formatter in ("orgmode.py", "ical_export.py"):
+                self.export_with(formatter, output)
+                first = os.stat(output)
+
+                self.export_with(formatter, output)
+
+                self.assertEqual(first.st_ino, os.stat(output).st_ino)
+                self.assertEqual(["out.txt"], os.listdir(directory))
+
+    def test_check_bypasses_the_cache(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            cache_dir = os.path.join(directory, "cache")
+            with patch("sys.stderr", StringIO()):
+                status = self.export("--check", "--cache-dir", cache_dir)
+
+            self.assertEqual(1, status)
+            self.assertFalse(os.path.exists(cache_dir))
+
+
+if __name__ == "__main__":
+    unittest.main()
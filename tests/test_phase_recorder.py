@@ -0,0 +1,93 @@
+import io
+import os
+import pstats
+import tempfile
+import unittest
+import xml.etree.ElementTree as xml
+from contextlib import redirect_stderr
+
+from main import MindMapFormatter
+from mindmap.phases import PhaseRecorder
+from titles import Formatter
+
+MAP_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), "data", "FreePlane", "mm3.mm"
+)
+
+
+class TestPhaseRecorder(unittest.TestCase):
+    def test_phase_without_active_recorder_is_a_no_op(self) -> None:
+        recorder = PhaseRecorder()
+        with PhaseRecorder.phase("parse"):
+            pass
+        self.assertIsNone(PhaseRecorder.current())
+        self.assertEqual({}, recorder.phases)
+
+    def test_export_records_parse_format_and_print(self) -> None:
+        root = xml.fromstring('<node TEXT="Root"><node TEXT="Child"/></node>')
+        recorder = PhaseRecorder()
+
+        with recorder.activate():
+            Formatter(output=io.StringIO()).export(root)
+            Formatter(output=io.StringIO()).export(root)
+
+        self.assertEqual(["parse", "format", "print"], list(recorder.phases))
+        self.assertEqual(2, recorder.phases["parse"].calls)
+        self.assertIsNone(PhaseRecorder.current())
+
+    def test_trace_memory_keeps_top_allocations(self) -> None:
+        recorder = PhaseRecorder(trace_memory=True, top=3)
+
+        with recorder.activate():
+            with PhaseRecorder.phase("build"):
+                data = [str(i) * 10 for i in range(10000)]
+
+        stats = recorder.phases["build"]
+        self.assertEqual(10000, len(data))
+        self.assertEqual(3, len(stats.top_allocations))
+        self.assertIn("test_phase_recorder.py", stats.top_allocations[0])
+        self.assertGreater(stats.peak_memory, 100000)
+        self.assertIn("build: peak", "\n".join(recorder.format_lines()))
+
+    def test_format_lines_end_with_total(self) -> None:
+        recorder = PhaseRecorder()
+        with recorder.activate():
+            with PhaseRecorder.phase("read"):
+                pass
+
+        lines = recorder.format_lines()
+
+        self.assertEqual(["phase", "wall", "(ms)", "cpu", "(ms)"], lines[0].split())
+        self.assertEqual("read", lines[1].split()[0])
+        self.assertEqual("total", lines[2].split()[0])
+
+
+class TestMindMapFormatterDiagnostics(unittest.TestCase):
+    def test_timings_are_printed_on_stderr(self) -> None:
+        stderr = io.StringIO()
+        with redirect_stderr(stderr):
+            MindMapFormatter(
+                MAP_PATH, "titles", io.StringIO(), check=True, timings=True
+            ).read()
+
+        phases = [line.split()[0] for line in stderr.getvalue().splitlines()[-7:]]
+        self.assertEqual(
+            ["phase", "read", "check", "parse", "format", "print", "total"], phases
+        )
+
+    def test_profile_writes_cprofile_statistics(self) -> None:
+        with tempfile.TemporaryDirectory() as workdir:
+            profile_path = os.path.join(workdir, "export.prof")
+            MindMapFormatter(
+                MAP_PATH, "titles", io.StringIO(), profile=profile_path
+            ).read()
+
+            functions = pstats.Stats(profile_path).stats  # type: ignore[attr-defined]
+
+        self.assertTrue(
+            any(name == "_print_tree" for _, _, name in functions),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from main import MindMapFormatter, main
+
+MAP_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), "data", "FreePlane", "mm3.mm"
+)
+
+
+class TestRunMetrics(unittest.TestCase):
+    def test_metrics_describe_the_run(self) -> None:
+        output = io.StringIO()
+        formatter = MindMapFormatter(MAP_PATH, "orgmode", output, metrics=True)
+        formatter.read()
+
+        metrics = formatter.metrics
+        assert metrics is not None
+        self.assertEqual("orgmode", metrics.formatter)
+        self.assertEqual(os.path.getsize(MAP_PATH), metrics.input_bytes)
+        self.assertEqual(75, metrics.nodes)
+        self.assertGreater(metrics.elements, metrics.nodes)
+        self.assertEqual(2, metrics.date_nodes)
+        self.assertEqual(14, metrics.entries)
+        self.assertEqual(len(output.getvalue().encode("utf-8")), metrics.output_bytes)
+        # The node cache is only active with --check or --debug-cache
+        self.assertEqual((0, 0), (metrics.cache_hits, metrics.cache_misses))
+        self.assertEqual(["read", "parse", "format", "print"], list(metrics.phases))
+        self.assertIsNone(metrics.traced_peak_bytes)
+
+    def test_output_bytes_of_streaming_formatters(self) -> None:
+        for formatter_name in ("csv_timesheet", "ical_export", "html_outline"):
+            with self.subTest(formatter_name):
+                output = io.StringIO()
+                formatter = MindMapFormatter(
+                    MAP_PATH, formatter_name, output, metrics=True
+                )
+                formatter.read()
+
+                assert formatter.metrics is not None
+                written = len(output.getvalue().encode("utf-8"))
+                self.assertGreater(written, 0)
+                self.assertEqual(written, formatter.metrics.output_bytes)
+
+    def test_no_metrics_unless_requested(self) -> None:
+        formatter = MindMapFormatter(MAP_PATH, "titles", io.StringIO())
+        formatter.read()
+        self.assertIsNone(formatter.metrics)
+
+    def test_metrics_file_and_log(self) -> None:
+        with tempfile.TemporaryDirectory() as workdir:
+            metrics_path = os.path.join(workdir, "metrics.json")
+            log_path = os.path.join(workdir, "metrics.ndjson")
+            for formatter_name in ("titles", "orgmode"):
+                main(
+                    [
+                        "--input",
+                        MAP_PATH,
+                        "--formatter",
+                        formatter_name,
+                        "--output",
+                        os.path.join(workdir, "out.txt"),
+                        "--metrics",
+                        metrics_path,
+                        "--metrics-log",
+                        log_path,
+                    ]
+                )
+
+            with open(metrics_path) as file:
+                record = json.load(file)
+            with open(log_path) as file:
+                log = [json.loads(line) for line in file]
+
+            output_bytes = os.path.getsize(os.path.join(workdir, "out.txt"))
+
+        self.assertEqual("orgmode", record["formatter"])
+        self.assertEqual(output_bytes, record["output_bytes"])
+        self.assertEqual(["titles", "orgmode"], [r["formatter"] for r in log])
+        self.assertEqual(record, log[-1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from io import StringIO
+
+from main import main
+from search_index import SearchIndex
+
+MAP = """<map version="freeplane 1.12.1">
+<node TEXT="Root" ID="ID_root" MODIFIED="1">
+<node TEXT="14/01/2026" OBJECT="org.freeplane.features.format.FormattedDate|2026-01-14|date" ID="ID_d14" MODIFIED="1">
+<node TEXT="WORKLOG" ID="ID_w14" MODIFIED="1">
+<node TEXT="Investigate git-annex" ID="ID_git" MODIFIED="1"/>
+<node TEXT="Next work" ID="ID_next" MODIFIED="1"><richcontent TYPE="NOTE">
+<html><body><ul><li>Caf&#233; migration notes</li></ul></body></html></richcontent></node>
+</node>
+</node>
+<node TEXT="Ideas" ID="ID_ideas" MODIFIED="1">
+<node TEXT="Faster exports" ID="ID_fast" MODIFIED="1"/>
+<node TEXT="No stamp" ID="ID_nostamp"/>
+</node>
+</node>
+</map>"""
+
+
+class TestSearchIndex(unittest.TestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.map_path = os.path.join(directory.name, "work.mm")
+        self.index = SearchIndex(os.path.join(directory.name, "index.sqlite"))
+        self.addCleanup(self.index.close)
+        self.write_map(MAP)
+
+    def write_map(self, content: str) -> None:
+        with open(self.map_path, "w") as file:
+            file.write(content)
+        # Make every rewrite visible, even within the mtime resolution
+        stat = os.stat(self.map_path)
+        os.utime(self.map_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000))
+
+    def node_ids(self, query: str) -> list[str]:
+        return [hit.node_id for hit in self.index.search(query)]
+
+    def test_text_and_notes_are_searched_with_date_context(self) -> None:
+        self.index.update(self.map_path)
+
+        (hit,) = self.index.search("git*")
+        self.assertEqual("ID_git", hit.node_id)
+        self.assertEqual("2026-01-14", hit.date)
+        self.assertEqual(
+            "Root / 14/01/2026 / WORKLOG / Investigate git-annex", hit.path
+        )
+        self.assertEqual("Investigate [git]-annex", hit.snippet)
+
+        self.assertEqual(["ID_next"], self.node_ids("cafe"))
+        self.assertEqual(["ID_next"], self.node_ids("note:migration"))
+        self.assertEqual([], self.node_ids("text:migration"))
+        self.assertEqual(["ID_fast"], self.node_ids('"faster exports"'))
+        self.assertIsNone(self.index.search("faster")[0].date)
+
+    def test_update_follows_modified_stamps(self) -> None:
+        first = self.index.update(self.map_path)
+        self.assertEqual((6 + 2, 0), (first.added, first.changed))
+        self.assertTrue(self.index.update(self.map_path).skipped)
+
+        self.write_map(
+            MAP.replace(
+                'TEXT="Faster exports" ID="ID_fast" MODIFIED="1"',
+                'TEXT="Quicker exports" ID="ID_fast" MODIFIED="2"',
+            )
+            # Without a new stamp the text is not read again
+            .replace('TEXT="Ideas" ID="ID_ideas"', 'TEXT="Plans" ID="ID_ideas"')
+            .replace(
+                '<node TEXT="Investigate git-annex" ID="ID_git" MODIFIED="1"/>', ""
+            )
+        )
+        stats = self.index.update(self.map_path)
+
+        # Renaming "Ideas" moves "No stamp" to another path
+        self.assertEqual(
+            (0, 1, 2, 1), (stats.added, stats.changed, stats.moved, stats.removed)
+        )
+        self.assertEqual(["ID_fast"], self.node_ids("quicker"))
+        self.assertEqual([], self.node_ids("faster"))
+        self.assertEqual([], self.node_ids("git"))
+        self.assertEqual(["ID_ideas"], self.node_ids("ideas"))
+        (hit,) = self.index.search("quicker")
+        self.assertEqual("Root / Plans / Quicker exports", hit.path)
+
+    def test_nodes_without_stamp_are_compared_by_content(self) -> None:
+        self.index.update(self.map_path)
+        self.write_map(MAP.replace('TEXT="No stamp"', 'TEXT="Still no stamp"'))
+
+        stats = self.index.update(self.map_path)
+
+        self.assertEqual(1, stats.changed)
+        self.assertEqual(["ID_nostamp"], self.node_ids("still"))
+
+    def test_remove_drops_the_nodes_of_a_map(self) -> None:
+        self.index.update(self.map_path)
+
+        self.index.remove(self.map_path)
+
+        self.assertEqual([], self.node_ids("exports"))
+        self.assertFalse(self.index.update(self.map_path).skipped)
+
+    def test_invalid_query_raises(self) -> None:
+        with self.assertRaises(sqlite3.OperationalError):
+            self.index.search('"unterminated')
+
+
+class TestSearchCommand(unittest.TestCase):
+    def test_update_and_search(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            map_path = os.path.join(directory, "work.mm")
+            with open(map_path, "w") as file:
+                file.write(MAP)
+            index_path = os.path.join(directory, "index.sqlite")
+            output, errors = StringIO(), StringIO()
+            with redirect_stdout(output), redirect_stderr(errors):
+                status = main(
+                    ["search", "--index", index_path, "--update", map_path, "git*"]
+                )
+                invalid = main(["search", "--index", index_path, '"a'])
+
+        self.assertEqual(0, status)
+        self.assertEqual(2, invalid)
+        self.assertEqual(
+            "2026-01-14 Root / 14/01/2026 / WORKLOG / Investigate git-annex "
+            "(work.mm#ID_git): Investigate [git]-annex\n",
+            output.getvalue(),
+        )
+        self.assertIn("work.mm: 8 added", errors.getvalue())
+        self.assertIn("Invalid query", errors.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
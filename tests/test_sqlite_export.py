@@ -0,0 +1,159 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from io import StringIO
+
+from main import main
+
+DATE = "org.freeplane.features.format.FormattedDate|{}|date"
+DATETIME = "org.freeplane.features.format.FormattedDate|{}+0100|datetime"
+
+MAP = f"""<map version="freeplane 1.12.1">
+<node TEXT="Team" ID="ID_root">
+<node TEXT="14/01/2026" OBJECT="{DATE.format("2026-01-14")}" ID="ID_d14">
+<node TEXT="WORKLOG" ID="ID_w14">
+<node TEXT="Project A" ID="ID_pa">
+<node TEXT="Design" ID="ID_design"><icon BUILTIN="yes"/>
+<node TEXT="09:00" OBJECT="{DATETIME.format("2026-01-14T09:00")}" ID="ID_t1">
+<node TEXT="10:30" OBJECT="{DATETIME.format("2026-01-14T10:30")}" ID="ID_t2"/>
+<node TEXT="Comment: first draft" ID="ID_c1"/>
+</node>
+</node>
+</node>
+</node>
+<node TEXT="TIMES" ID="ID_times14">
+<node TEXT="11:00" OBJECT="{DATETIME.format("2026-01-14T11:00")}" ID="ID_t3">
+<node TEXT="Review" ID="ID_r"/>
+</node>
+<node TEXT="11:20" OBJECT="{DATETIME.format("2026-01-14T11:20")}" ID="ID_t4">
+<node TEXT="Mail" ID="ID_m"/>
+</node>
+</node>
+</node>
+<node TEXT="15/01/2026" OBJECT="{DATE.format("2026-01-15")}" ID="ID_d15">
+<node TEXT="TIMES" ID="ID_times15">
+<node TEXT="08:00" OBJECT="{DATETIME.format("2026-01-15T08:00")}" ID="ID_t5">
+<node TEXT="08:45" OBJECT="{DATETIME.format("2026-01-15T08:45")}" ID="ID_t6"/>
+<node TEXT="Standup" ID="ID_s"/>
+</node>
+</node>
+</node>
+</node>
+</map>"""
+
+
+class TestSqliteExport(unittest.TestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.database = os.path.join(self.directory, "worklog.sqlite")
+
+    def export(self, source: str, *options: str, name: str = "team.mm") -> str:
+        path = os.path.join(self.directory, name)
+        with open(path, "w") as file:
+            file.write(source)
+        output = StringIO()
+        with redirect_stdout(output):
+            status = main(
+                [
+                    "--input",
+                    path,
+                    "--formatter",
+                    "sqlite_export.py",
+                    "--database",
+                    self.database,
+                    *options,
+                ]
+            )
+        self.assertEqual(0, status)
+        return output.getvalue().strip()
+
+    def query(self, sql: str) -> list[tuple[object, ...]]:
+        connection = sqlite3.connect(self.database)
+        try:
+            return connection.execute(sql).fetchall()
+        finally:
+            connection.close()
+
+    def test_entries_are_normalized(self) -> None:
+        summary = self.export(MAP)
+
+        self.assertEqual(
+            "Team: 2 dates written, 0 unchanged, 0 removed, 4 entries", summary
+        )
+        self.assertEqual(
+            [
+                ("2026-01-14", "WORKLOG", "Project A", "Design", "", 90),
+                # Without end time, ends when the next entry starts
+                ("2026-01-14", "TIMES", None, None, "Review", 20),
+                ("2026-01-14", "TIMES", None, None, "Mail", 0),
+                ("2026-01-15", "TIMES", None, None, "Standup", 45),
+            ],
+            self.query(
+                "SELECT date, section, project, task, description, minutes "
+                "FROM time_entries ORDER BY start_time"
+            ),
+        )
+        self.assertEqual(
+            [("Yes", "Comment: first draft")],
+            self.query(
+                "SELECT tags.name, comments.text FROM entry_tags "
+                "JOIN tags ON tags.id = entry_tags.tag_id "
+                "JOIN comments ON comments.entry_id = entry_tags.entry_id"
+            ),
+        )
+
+    def test_upsert_only_writes_changed_dates(self) -> None:
+        self.export(MAP)
+        self.assertEqual(
+            "Team: 0 dates written, 2 unchanged, 0 removed, 0 entries",
+            self.export(MAP, "--upsert"),
+        )
+
+        changed = MAP.replace('TEXT="Project A"', 'TEXT="Project B"')
+        summary = self.export(changed, "--upsert")
+
+        self.assertEqual(
+            "Team: 1 dates written, 1 unchanged, 0 removed, 3 entries", summary
+        )
+        self.assertEqual([("Project B",)], self.query("SELECT name FROM projects"))
+        self.assertEqual([(4,)], self.query("SELECT count(*) FROM time_entries"))
+
+    def test_upsert_removes_deleted_dates(self) -> None:
+        self.export(MAP)
+        start = MAP.index('<node TEXT="15/01/2026"')
+        end = MAP.rindex("</node>\n</node>\n</map>")
+        removed = MAP[:start] + MAP[end + len("</node>\n") :]
+
+        summary = self.export(removed, "--upsert")
+
+        self.assertEqual(
+            "Team: 0 dates written, 1 unchanged, 1 removed, 0 entries", summary
+        )
+        self.assertEqual([("2026-01-14",)], self.query("SELECT date FROM dates"))
+
+    def test_upsert_keeps_other_maps_and_rebuild_drops_them(self) -> None:
+        other = MAP.replace('TEXT="Team" ID="ID_root"', 'TEXT="Other" ID="ID_other"')
+        self.export(MAP)
+        self.export(other, "--upsert", name="other.mm")
+        self.assertEqual(
+            [("Other", 4), ("Team", 4)],
+            self.query(
+                "SELECT map, count(*) FROM time_entries GROUP BY map ORDER BY map"
+            ),
+        )
+
+        self.export(MAP)
+
+        self.assertEqual([("Team",)], self.query("SELECT name FROM maps"))
+
+    def test_database_is_required(self) -> None:
+        with redirect_stderr(StringIO()), self.assertRaises(SystemExit):
+            main(["--input", "map.mm", "--formatter", "sqlite_export.py"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import unittest
+from datetime import date
+
+from mindmap.hashing import SubtreeHashes, changed_keys
+from mindmap.models import DateValue
+from mindmap.reader import DateReader, MapReader
+
+MAP = """<map version="freeplane 1.12.1">
+<node TEXT="Root" ID="ID_1" CREATED="1" MODIFIED="2" FOLDED="false">
+<node TEXT="Jan/26" ID="ID_2" POSITION="bottom_or_right">
+<node TEXT="14/01/2026" OBJECT="org.freeplane.features.format.FormattedDate|2026-01-14|date" ID="ID_3">
+<node TEXT="Project A" ID="ID_4">
+<icon BUILTIN="checked"/>
+<richcontent TYPE="NOTE" CONTENT-TYPE="xml/"><html><body><ul><li>first</li></ul></body></html></richcontent>
+</node>
+</node>
+<node TEXT="15/01/2026" OBJECT="org.freeplane.features.format.FormattedDate|2026-01-15|date" ID="ID_5">
+<node TEXT="Project B" ID="ID_6"/>
+</node>
+</node>
+</node>
+</map>"""
+
+
+def root_digest(source: str) -> bytes:
+    root, hashes = MapReader.parse_with_hashes(source.encode())
+    return hashes[root]
+
+
+class TestSubtreeHashes(unittest.TestCase):
+    def test_parse_pass_matches_hashing_a_parsed_tree(self) -> None:
+        root, hashes = MapReader.parse_with_hashes(MAP.encode(), chunk_size=7)
+        parsed = MapReader.from_bytes(MAP.encode())
+        computed = SubtreeHashes.compute(parsed)
+
+        self.assertEqual(6, len(hashes))
+        self.assertEqual(computed[parsed], hashes[root])
+        self.assertEqual(
+            [computed[node] for node in parsed.iter("node")],
+            [hashes[node] for node in root.iter("node")],
+        )
+
+    def test_layout_and_bookkeeping_attributes_are_ignored(self) -> None:
+        changed = (
+            MAP.replace('MODIFIED="2"', 'MODIFIED="99"')
+            .replace('ID="ID_4"', 'ID="ID_40"')
+            .replace(' POSITION="bottom_or_right"', "")
+            .replace('FOLDED="false"', 'FOLDED="true" STYLE="oval"')
+        )
+
+        self.assertEqual(root_digest(MAP), root_digest(changed))
+
+    def test_content_changes_change_the_digest(self) -> None:
+        edits = [
+            ('TEXT="Project B"', 'TEXT="Project C"'),
+            ("|2026-01-15|date", "|2026-01-16|date"),
+            ('BUILTIN="checked"', 'BUILTIN="stop-sign"'),
+            ("<li>first</li>", "<li>second</li>"),
+            ('TYPE="NOTE"', 'TYPE="DETAILS"'),
+            ('<node TEXT="Project B" ID="ID_6"/>', ""),
+        ]
+        for old, new in edits:
+            with self.subTest(old=old):
+                self.assertNotEqual(
+                    root_digest(MAP), root_digest(MAP.replace(old, new))
+                )
+
+    def test_child_order_is_part_of_the_digest(self) -> None:
+        root, hashes = MapReader.parse_with_hashes(MAP.encode())
+        month = root.find("node")
+        assert month is not None
+        first, second = list(month)
+        month[:] = [second, first]
+
+        self.assertNotEqual(SubtreeHashes.compute(root)[root], hashes[root])
+
+    def test_unhashed_nodes_are_missing(self) -> None:
+        root, hashes = MapReader.parse_with_hashes(MAP.encode())
+        other = MapReader.from_bytes(MAP.encode())
+
+        self.assertIn(root, hashes)
+        self.assertNotIn(other, hashes)
+        self.assertIsNone(hashes.get(other))
+        with self.assertRaises(KeyError):
+            hashes[other]
+
+    def test_changed_date_blocks(self) -> None:
+        edited = MAP.replace('TEXT="Project B"', 'TEXT="Project C"')
+        old_root, old_hashes = MapReader.parse_with_hashes(MAP.encode())
+        new_root, new_hashes = MapReader.parse_with_hashes(edited.encode())
+
+        old = old_hashes.index(old_root, DateReader.read_date)
+        new = new_hashes.index(new_root, DateReader.read_date)
+
+        self.assertEqual(
+            [DateValue(date(2026, 1, 14)), DateValue(date(2026, 1, 15))], list(old)
+        )
+        self.assertEqual({DateValue(date(2026, 1, 15))}, changed_keys(old, new))
+        self.assertEqual(set(), changed_keys(old, old))
+        self.assertEqual(set(old), changed_keys(old, {}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+import unittest
+from contextlib import redirect_stdout
+from datetime import date
+from io import StringIO
+from typing import Optional
+
+import orgmode
+from main import main, read_mindmap
+from worklog_merge import MergeInput, WorklogMerger, iter_date_blocks
+
+MM3 = "data/FreePlane/mm3.mm"
+MULTIPLE_DATES = "data/FreePlane/orgmode_test5.mm"
+
+
+def merged_lines(
+    *specs: str,
+    jobs: int = 1,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+) -> list[str]:
+    merger = WorklogMerger(
+        [MergeInput.parse(spec) for spec in specs], jobs, date_from, date_to
+    )
+    return list(merger.iter_lines())
+
+
+class TestWorklogMerge(unittest.TestCase):
+    def test_input_names(self) -> None:
+        self.assertEqual(MergeInput("alice", "a.mm"), MergeInput.parse("alice=a.mm"))
+        self.assertEqual(
+            MergeInput("mm3", "data/FreePlane/mm3.mm"), MergeInput.parse(MM3)
+        )
+
+    def test_date_blocks_are_the_orgmode_output(self) -> None:
+        formatter = orgmode.Formatter()
+        formatter.parse(read_mindmap(MULTIPLE_DATES))
+        expected = [line for line in formatter.format()[1:] if line]
+
+        lines = []
+        for day, block in iter_date_blocks(MULTIPLE_DATES):
+            lines.append(f"** PROJ [{day.strftime('%Y-%m-%d %a')}]")
+            lines.extend(block)
+
+        self.assertEqual(expected, [line for line in lines if line])
+
+    def test_dates_are_merged_in_order(self) -> None:
+        lines = merged_lines(f"alice={MM3}", f"bob={MULTIPLE_DATES}")
+
+        self.assertEqual("* PROJ Worklog", lines[0])
+        dates = [line for line in lines if line.startswith("** ")]
+        self.assertEqual(
+            [
+                "** PROJ [2026-01-14 Wed]",
+                "** PROJ [2026-01-15 Thu]",
+                "** PROJ [2026-01-20 Tue]",
+                "** PROJ [2026-01-21 Wed]",
+                "** PROJ [2026-01-22 Thu]",
+            ],
+            dates,
+        )
+        self.assertEqual(["", ""], lines[-2:])
+
+    def test_people_are_sub_headings_of_each_date(self) -> None:
+        lines = merged_lines(f"bob={MULTIPLE_DATES}", f"alice={MM3}")
+
+        fifteenth = lines.index("** PROJ [2026-01-15 Thu]")
+        twentieth = lines.index("** PROJ [2026-01-20 Tue]")
+        people = [
+            line for line in lines[fifteenth:twentieth] if line.startswith("*** ")
+        ]
+        # In the order of the inputs
+        self.assertEqual(["*** PROJ bob", "*** PROJ alice"], people)
+        # The orgmode headings of each person are one level deeper
+        self.assertIn("**** PROJ Projects", lines[fifteenth:twentieth])
+        self.assertIn("***** PROJ Investigate git-annex", lines[fifteenth:twentieth])
+        self.assertIn("- 08:36 - 11:16 ; Comment: End of task", lines)
+
+    def test_date_range(self) -> None:
+        lines = merged_lines(
+            f"alice={MM3}",
+            f"bob={MULTIPLE_DATES}",
+            date_from=date(2026, 1, 15),
+            date_to=date(2026, 1, 20),
+        )
+
+        dates = [line for line in lines if line.startswith("** ")]
+        self.assertEqual(
+            ["** PROJ [2026-01-15 Thu]", "** PROJ [2026-01-20 Tue]"], dates
+        )
+
+    def test_parallel_extraction_gives_the_same_worklog(self) -> None:
+        specs = (f"alice={MM3}", f"bob={MULTIPLE_DATES}", MM3)
+
+        self.assertEqual(merged_lines(*specs), merged_lines(*specs, jobs=3))
+
+    def test_merge_command(self) -> None:
+        output = StringIO()
+        with redirect_stdout(output):
+            status = main(["merge", f"alice={MM3}", MULTIPLE_DATES])
+
+        self.assertEqual(0, status)
+        self.assertEqual(
+            merged_lines(f"alice={MM3}", MULTIPLE_DATES),
+            output.getvalue().split("\n")[:-1],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,215 @@
+import unittest
+import xml.etree.ElementTree as xml
+from datetime import date, datetime
+from typing import Optional
+
+import worklog_lint
+from worklog.entries import TimeEntryCollector
+from worklog.models import TaskEntry
+from worklog.validation import TimeEntryValidator, TimeIssue
+
+DATE = "org.freeplane.features.format.FormattedDate|{}T00:00+0400|date"
+DATETIME = "org.freeplane.features.format.FormattedDate|{}+0400|datetime"
+
+
+def entry(
+    start: str, end: Optional[str], name: str = "Task", project: str = ""
+) -> TaskEntry:
+    start_dt = datetime.fromisoformat(f"2026-01-14T{start}")
+    end_dt = datetime.fromisoformat(f"2026-01-14T{end}") if end else None
+    return TaskEntry(
+        task_name=name,
+        start=start_dt,
+        end=end_dt,
+        date=start_dt.date(),
+        tags=[],
+        project=project,
+    )
+
+
+class TestTimeEntryCollector(unittest.TestCase):
+    def test_collects_standalone_project_and_task_entries(self) -> None:
+        xml_str = f"""
+        <node TEXT="Root">
+            <node TEXT="14/01/2026" OBJECT="{DATE.format("2026-01-14")}">
+                <node TEXT="TIMES">
+                    <node TEXT="09:00" OBJECT="{DATETIME.format("2026-01-14T09:00")}">
+                        <icon BUILTIN="stop-sign"/>
+                        <node TEXT="Standup"/>
+                    </node>
+                </node>
+                <node TEXT="WORKLOG">
+                    <node TEXT="Project A">
+                        <node TEXT="10:00" OBJECT="{DATETIME.format("2026-01-14T10:00")}">
+                            <node TEXT="11:00" OBJECT="{DATETIME.format("2026-01-14T11:00")}"/>
+                        </node>
+                    </node>
+                    <node TEXT="Project B">
+                        <node TEXT="Subtask">
+                            <node TEXT="12:00" OBJECT="{DATETIME.format("2026-01-14T12:00")}">
+                                <node TEXT="A comment"/>
+                            </node>
+                        </node>
+                    </node>
+                </node>
+                <node TEXT="TODO">
+                    <node TEXT="13:00" OBJECT="{DATETIME.format("2026-01-14T13:00")}"/>
+                </node>
+            </node>
+        </node>
+        """
+        entries = TimeEntryCollector.collect(xml.fromstring(xml_str))
+
+        self.assertEqual(3, len(entries))
+        standup, project_a, project_b = entries
+        self.assertEqual("Standup", standup.task_name)
+        self.assertEqual("TIMES", standup.section_name)
+        self.assertEqual(["StopSign"], standup.tags)
+        self.assertEqual("", standup.project)
+        self.assertEqual(("Project A", ""), (project_a.project, project_a.task_name))
+        self.assertEqual(datetime(2026, 1, 14, 11, 0), project_a.end)
+        self.assertEqual(
+            ("Project B", "Subtask"), (project_b.project, project_b.task_name)
+        )
+        self.assertEqual(["A comment"], project_b.comments)
+        self.assertEqual(date(2026, 1, 14), project_b.date)
+
+    def test_fill_missing_end_times_uses_next_standalone_entry(self) -> None:
+        entries = [
+            entry("10:00", None, "Second"),
+            entry("09:00", None, "First"),
+            entry("09:30", None, "In project", project="P"),
+        ]
+        filled = TimeEntryCollector.fill_missing_end_times(entries)
+
+        self.assertEqual(
+            ["First", "In project", "Second"], [e.task_name for e in filled]
+        )
+        self.assertEqual(datetime(2026, 1, 14, 10, 0), filled[0].end)
+        self.assertIsNone(filled[1].end)
+        self.assertIsNone(filled[2].end)
+
+    def test_fill_missing_end_times_does_not_cross_dates(self) -> None:
+        first = entry("23:00", None)
+        next_day = TaskEntry(
+            task_name="Next",
+            start=datetime(2026, 1, 15, 8, 0),
+            end=None,
+            date=date(2026, 1, 15),
+            tags=[],
+        )
+        filled = TimeEntryCollector.fill_missing_end_times([first, next_day])
+        self.assertIsNone(filled[0].end)
+
+
+class TestTimeEntryValidator(unittest.TestCase):
+    def kinds(self, *entries: TaskEntry) -> list[str]:
+        return [issue.kind for issue in TimeEntryValidator.validate(entries)]
+
+    def test_no_issues_for_contiguous_entries(self) -> None:
+        self.assertEqual(
+            [], self.kinds(entry("09:00", "10:00"), entry("10:00", "11:00"))
+        )
+
+    def test_reports_overlap(self) -> None:
+        issues = TimeEntryValidator.validate(
+            [entry("09:30", "11:00", "B"), entry("09:00", "10:00", "A")]
+        )
+        self.assertEqual(1, len(issues))
+        self.assertEqual(TimeIssue.OVERLAP, issues[0].kind)
+        self.assertEqual(
+            "2026-01-14 overlap: 09:00 - 10:00 A <-> 09:30 - 11:00 B",
+            issues[0].format_line(),
+        )
+
+    def test_reports_every_overlapping_pair(self) -> None:
+        issues = TimeEntryValidator.validate(
+            [
+                entry("09:00", "12:00", "Long"),
+                entry("09:30", "10:00", "A"),
+                entry("09:45", "10:30", "B"),
+            ]
+        )
+        pairs = [
+            (i.other.task_name if i.other else "", i.entry.task_name) for i in issues
+        ]
+        # The overlaps of B come in heap order: A ends first
+        self.assertEqual([("Long", "A"), ("A", "B"), ("Long", "B")], pairs)
+
+    def test_reports_double_booked_entries(self) -> None:
+        self.assertEqual(
+            [TimeIssue.OVERLAP],
+            self.kinds(entry("09:00", "10:00"), entry("09:00", "10:00")),
+        )
+
+    def test_reports_gap_within_a_day(self) -> None:
+        issues = TimeEntryValidator.validate(
+            [entry("09:00", "10:00", "A"), entry("10:30", "11:00", "B")]
+        )
+        self.assertEqual([TimeIssue.GAP], [i.kind for i in issues])
+        self.assertEqual(
+            "2026-01-14 gap: 10:00 - 10:30 between 09:00 - 10:00 A and 10:30 - 11:00 B",
+            issues[0].format_line(),
+        )
+
+    def test_no_gap_inside_a_longer_entry(self) -> None:
+        self.assertEqual(
+            [TimeIssue.OVERLAP, TimeIssue.OVERLAP],
+            self.kinds(
+                entry("09:00", "12:00"),
+                entry("09:30", "10:00"),
+                entry("10:30", "11:00"),
+            ),
+        )
+
+    def test_reports_zero_length_negative_and_open_entries(self) -> None:
+        self.assertEqual(
+            [TimeIssue.OPEN, TimeIssue.NEGATIVE, TimeIssue.ZERO_LENGTH],
+            self.kinds(
+                entry("08:00", None),
+                entry("09:00", "08:30"),
+                entry("10:00", "10:00"),
+            ),
+        )
+
+
+class TestWorklogLintFormatter(unittest.TestCase):
+    def test_reports_no_issues(self) -> None:
+        formatter = worklog_lint.Formatter()
+        formatter.parse(xml.fromstring('<node TEXT="Root"/>'))
+        self.assertEqual(["No time entry issues found"], formatter.format())
+
+    def test_reports_overlap_after_auto_fill(self) -> None:
+        xml_str = f"""
+        <node TEXT="Root">
+            <node TEXT="14/01/2026" OBJECT="{DATE.format("2026-01-14")}">
+                <node TEXT="WORKLOG">
+                    <node TEXT="Project">
+                        <node TEXT="09:00" OBJECT="{DATETIME.format("2026-01-14T09:00")}">
+                            <node TEXT="12:00" OBJECT="{DATETIME.format("2026-01-14T12:00")}"/>
+                        </node>
+                    </node>
+                    <node TEXT="10:00" OBJECT="{DATETIME.format("2026-01-14T10:00")}">
+                        <node TEXT="Meeting"/>
+                    </node>
+                    <node TEXT="11:00" OBJECT="{DATETIME.format("2026-01-14T11:00")}">
+                        <node TEXT="Review"/>
+                        <node TEXT="11:30" OBJECT="{DATETIME.format("2026-01-14T11:30")}"/>
+                    </node>
+                </node>
+            </node>
+        </node>
+        """
+        formatter = worklog_lint.Formatter()
+        formatter.parse(xml.fromstring(xml_str))
+        self.assertEqual(
+            [
+                "2026-01-14 overlap: 09:00 - 12:00 Project <-> 10:00 - 11:00 Meeting",
+                "2026-01-14 overlap: 09:00 - 12:00 Project <-> 11:00 - 11:30 Review",
+            ],
+            formatter.format(),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,6 @@
 from mindmap_exporter import MindmapExporter
 import xml.etree.ElementTree as xml
+from mindmap.reader import NodeTreeHelper
 
 
 class Formatter(MindmapExporter):
@@ -10,16 +11,10 @@ class Formatter(MindmapExporter):
         return self.lines.copy()
 
     def _format_tree_as_titles(self, root: xml.Element, level: int) -> list[str]:
-        lines: list[str] = []
-
-        if "TEXT" not in root.attrib:
-            for child in root:
-                lines.extend(self._format_tree_as_titles(child, level))
-            return lines
-
-        lines.append(("#" * level) + " " + root.attrib["TEXT"])
-        for child in root:
-            if child.tag == "node":
-                lines.extend(self._format_tree_as_titles(child, level + 1))
-
-        return lines
+        return [
+            ("#" * node_level) + " " + node.attrib["TEXT"]
+            for node, node_level, entering in NodeTreeHelper.walk_titled_nodes(
+                root, level
+            )
+            if entering
+        ]
@@ -1,15 +1,28 @@
 """Worklog formatting and TODO handling utilities."""
 
 from worklog.format import TodoHelper
-from worklog.helpers import DateTimeHelper, DurationFormatter, HierarchicalNodeProcessor
+from worklog.helpers import (
+    ClassifiedChildren,
+    DateTimeHelper,
+    DurationFormatter,
+    HierarchicalNodeProcessor,
+)
 from worklog.models import TaskEntry, TaskInfo, ProjectInfo
+from worklog.entries import TimeEntryCollector
+from worklog.validation import TimeEntryValidator, TimeIssue
+from worklog.interval_index import IntervalIndex
 
 __all__ = [
     "TodoHelper",
     "DateTimeHelper",
     "DurationFormatter",
     "HierarchicalNodeProcessor",
+    "ClassifiedChildren",
     "TaskEntry",
     "TaskInfo",
     "ProjectInfo",
+    "TimeEntryCollector",
+    "TimeEntryValidator",
+    "TimeIssue",
+    "IntervalIndex",
 ]
@@ -0,0 +1,172 @@
+"""Time entry collection from WORKLOG and TIMES sections."""
+
+from __future__ import annotations
+
+import xml.etree.ElementTree as xml
+from dataclasses import replace
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from mindmap.reader import DateReader, DateTimeReader, NodeTreeHelper
+from worklog.helpers import DateTimeHelper
+from worklog.models import TaskEntry
+
+
+class TimeEntryCollector:
+    """Collects time entries from the sections of date nodes.
+
+    Follows the extraction rules of `orgmode.Formatter`:
+    - datetime children of a section are standalone entries
+    - datetime children of a project node are entries of the project
+    - datetime children of a task node (under a project) are task entries
+    """
+
+    TIME_SECTIONS = ("WORKLOG", "TIMES")
+
+    @staticmethod
+    def collect(root: xml.Element) -> List[TaskEntry]:
+        """Return all time entries found under the date nodes of the tree."""
+        return [entry for _, entry in TimeEntryCollector.iter_entry_nodes(root)]
+
+    @staticmethod
+    def iter_entry_nodes(
+        root: xml.Element,
+    ) -> Iterator[Tuple[xml.Element, TaskEntry]]:
+        """Yield (start datetime node, entry) pairs in document order."""
+        for date_node in DateReader.find_all_date_nodes(root):
+            if DateReader.read_date(date_node) is None:
+                continue
+            yield from TimeEntryCollector.iter_date_entry_nodes(date_node)
+
+    @staticmethod
+    def iter_date_entry_nodes(
+        date_node: xml.Element,
+        projects: Optional[Dict[str, xml.Element]] = None,
+    ) -> Iterator[Tuple[xml.Element, TaskEntry]]:
+        """Yield the (start datetime node, entry) pairs of the sections of one
+        date node, without looking into date nodes nested in it.
+
+        :param projects: when given, the entries of a project node are only
+            yielded if it is the node kept for its name (see `first_projects`)
+        """
+        for section_node in TimeEntryCollector._iter_time_sections(date_node):
+            yield from TimeEntryCollector._iter_section(
+                section_node, section_node.get("TEXT", ""), projects
+            )
+
+    @staticmethod
+    def first_projects(root: xml.Element) -> Dict[str, xml.Element]:
+        """Return, by name, the first project node with entries in document order.
+
+        `orgmode.Formatter` reports a project once, from the first node with
+        entries having its name; the entries of later nodes with the same name
+        are dropped, whatever their date.
+        """
+        projects: Dict[str, xml.Element] = {}
+        for date_node in DateReader.find_all_date_nodes(root):
+            if DateReader.read_date(date_node) is None:
+                continue
+            for section_node in TimeEntryCollector._iter_time_sections(date_node):
+                for task_node in NodeTreeHelper.get_node_children(section_node):
+                    name = task_node.get("TEXT", "")
+                    if name in projects or DateTimeReader.is_datetime_node(task_node):
+                        continue
+                    project_entries = TimeEntryCollector._iter_project(
+                        task_node, section_node.get("TEXT", "")
+                    )
+                    if next(project_entries, None) is not None:
+                        projects[name] = task_node
+        return projects
+
+    @staticmethod
+    def fill_missing_end_times(entries: List[TaskEntry]) -> List[TaskEntry]:
+        """Return the entries sorted by start, with missing end times filled.
+
+        Same rule as `orgmode.Formatter`: a standalone entry without end time
+        ends when the next standalone entry of the same day starts. Project
+        entries are never auto-filled.
+        """
+        result = sorted(entries, key=lambda e: e.start)
+        previous = -1
+        for i, entry in enumerate(result):
+            if entry.project:
+                continue
+            if previous >= 0:
+                open_entry = result[previous]
+                if open_entry.end is None and open_entry.date == entry.date:
+                    result[previous] = replace(open_entry, end=entry.start)
+            previous = i
+        return result
+
+    @staticmethod
+    def _iter_time_sections(date_node: xml.Element) -> Iterator[xml.Element]:
+        for section_node in date_node:
+            if (
+                section_node.tag == "node"
+                and section_node.get("TEXT", "") in TimeEntryCollector.TIME_SECTIONS
+            ):
+                yield section_node
+
+    @staticmethod
+    def _iter_section(
+        section_node: xml.Element,
+        section_name: str,
+        projects: Optional[Dict[str, xml.Element]] = None,
+    ) -> Iterator[Tuple[xml.Element, TaskEntry]]:
+        for task_node in NodeTreeHelper.get_node_children(section_node):
+            if DateTimeReader.is_datetime_node(task_node):
+                start = DateTimeReader.read_datetime(task_node)
+                if start:
+                    description, _ = DateTimeHelper.get_task_description(task_node)
+                    yield (
+                        task_node,
+                        TaskEntry(
+                            task_name=description,
+                            start=start.value,
+                            end=DateTimeHelper.find_end_time(task_node),
+                            date=start.value.date(),
+                            tags=NodeTreeHelper.extract_tags_from_node(task_node),
+                            section_name=section_name,
+                        ),
+                    )
+                continue
+
+            if projects is None or projects.get(task_node.get("TEXT", "")) is task_node:
+                yield from TimeEntryCollector._iter_project(task_node, section_name)
+
+    @staticmethod
+    def _iter_project(
+        project_node: xml.Element, section_name: str
+    ) -> Iterator[Tuple[xml.Element, TaskEntry]]:
+        project_name = project_node.get("TEXT", "")
+        children = NodeTreeHelper.get_node_children(project_node)
+        if any(DateTimeReader.is_datetime_node(c) for c in children):
+            yield from TimeEntryCollector._iter_task(
+                project_node, section_name, project_name, ""
+            )
+        else:
+            for child in children:
+                yield from TimeEntryCollector._iter_task(
+                    child, section_name, project_name, child.get("TEXT", "")
+                )
+
+    @staticmethod
+    def _iter_task(
+        task_node: xml.Element, section_name: str, project: str, task_name: str
+    ) -> Iterator[Tuple[xml.Element, TaskEntry]]:
+        tags = NodeTreeHelper.extract_tags_from_node(task_node)
+        for child in NodeTreeHelper.get_node_children(task_node):
+            start = DateTimeReader.read_datetime(child)
+            if start:
+                yield (
+                    child,
+                    TaskEntry(
+                        task_name=task_name,
+                        start=start.value,
+                        end=DateTimeHelper.find_end_time(child),
+                        date=start.value.date(),
+                        tags=tags,
+                        section_name=section_name,
+                        comments=DateTimeHelper.extract_comments(child),
+                        project=project,
+                    ),
+                )
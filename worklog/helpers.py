@@ -3,7 +3,8 @@
 from __future__ import annotations
 
 import xml.etree.ElementTree as xml
-from typing import List, Optional, Callable, Tuple, Any, Dict
+from dataclasses import dataclass
+from typing import List, Optional, Callable, Tuple, Any, Dict, Iterator
 from datetime import datetime
 
 from mindmap.reader import DateTimeReader, NodeTreeHelper
@@ -27,6 +28,34 @@ class DateTimeHelper:
                     return end_time_val.value
         return None
 
+    @staticmethod
+    def get_task_description(time_node: xml.Element) -> Tuple[str, List[str]]:
+        """Find the description and icon tags of a datetime node.
+
+        The description is the first non-datetime child text; when the first
+        child is the end time, its first non-datetime child is used instead.
+        Returns ("", []) if no description is found.
+        """
+        tags: List[str] = []
+        for child in time_node:
+            if child.tag == "icon":
+                tags.append(
+                    "".join(part.title() for part in child.attrib["BUILTIN"].split("-"))
+                )
+            elif child.tag == "node":
+                if not DateTimeReader.read_datetime(child):
+                    text = child.get("TEXT", "").strip()
+                    if text:
+                        return text, tags
+                else:
+                    for grandchild in child:
+                        if grandchild.tag == "node":
+                            if not DateTimeReader.read_datetime(grandchild):
+                                text = grandchild.get("TEXT", "").strip()
+                                if text:
+                                    return text, tags
+        return "", []
+
     @staticmethod
     def extract_comments(node: xml.Element) -> List[str]:
         """Extract comment text from node children, skipping datetime nodes."""
@@ -113,9 +142,49 @@ class DurationFormatter:
         return result
 
 
+@dataclass(frozen=True)
+class ClassifiedChildren:
+    """Children of a node bucketed for the 3-phase order."""
+
+    leaves: List[xml.Element]  # leaf, non-TODO
+    branches: List[xml.Element]  # non-leaf, non-TODO
+    todos: List[Tuple[xml.Element, bool]]  # (node, is_leaf), TODO
+
+    def in_order(self) -> Iterator[Tuple[xml.Element, bool, bool]]:
+        """Yield (node, is_leaf, is_todo) in 3-phase order: leaves, non-leaves, TODOs."""
+        for node in self.leaves:
+            yield node, True, False
+        for node in self.branches:
+            yield node, False, False
+        for node, is_leaf in self.todos:
+            yield node, is_leaf, True
+
+
 class HierarchicalNodeProcessor:
     """Mixin for processing nodes in hierarchical 3-phase order."""
 
+    @staticmethod
+    def classify_children(node: xml.Element) -> ClassifiedChildren:
+        """Bucket node children into leaves, non-leaves and TODOs in one pass.
+
+        The leaf and TODO flags are computed once per child; each bucket
+        keeps the document order of the children.
+        """
+        leaves: List[xml.Element] = []
+        branches: List[xml.Element] = []
+        todos: List[Tuple[xml.Element, bool]] = []
+        for child in node:
+            if child.tag != "node":
+                continue
+            is_leaf = NodeTreeHelper.is_leaf(child)
+            if TodoHelper.is_todo(child):
+                todos.append((child, is_leaf))
+            elif is_leaf:
+                leaves.append(child)
+            else:
+                branches.append(child)
+        return ClassifiedChildren(leaves=leaves, branches=branches, todos=todos)
+
     @staticmethod
     def process_hierarchical_phase(
         nodes: List[xml.Element],
@@ -176,30 +245,5 @@ class HierarchicalNodeProcessor:
             callback: Function to call for each child (receives node + callback_args)
             callback_args: Extra arguments to pass to callback after (node,)
         """
-        children = NodeTreeHelper.get_node_children(node)
-
-        # Phase 1: Leaf items (non-TODO)
-        HierarchicalNodeProcessor.process_hierarchical_phase(
-            children,
-            is_leaf_filter=True,
-            is_todo_filter=False,
-            callback=callback,
-            callback_args=callback_args,
-        )
-
-        # Phase 2: Non-leaf children (non-TODO)
-        HierarchicalNodeProcessor.process_hierarchical_phase(
-            children,
-            is_leaf_filter=False,
-            is_todo_filter=False,
-            callback=callback,
-            callback_args=callback_args,
-        )
-
-        # Phase 3: TODO children (any leaf status)
-        HierarchicalNodeProcessor.filter_and_process(
-            children,
-            is_todo_filter=True,
-            callback=callback,
-            callback_args=callback_args,
-        )
+        for child, _, _ in HierarchicalNodeProcessor.classify_children(node).in_order():
+            callback(child, *callback_args)
@@ -0,0 +1,89 @@
+"""Interval index for point-in-time and range queries over time entries."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Iterable, List
+
+from worklog.models import TaskEntry
+
+
+class IntervalIndex:
+    """Static interval tree over time entries.
+
+    Entries are sorted by start time once and laid out as an implicit
+    balanced binary search tree (the middle of every slice is its root).
+    Each tree node stores the latest end time of its subtree, so queries
+    prune every subtree that ends before the queried time or starts after
+    it: a lookup costs O(log n + k) for k matching entries.
+
+    Entries are half-open intervals [start, end). Entries without an end
+    time are indexed as instants that only match their own start.
+    """
+
+    def __init__(self, entries: Iterable[TaskEntry]) -> None:
+        self._entries = sorted(entries, key=lambda e: e.start)
+        self._starts = [e.start for e in self._entries]
+        self._ends = [e.end if e.end is not None else e.start for e in self._entries]
+        self._max_end = list(self._ends)
+        self._build(0, len(self._entries))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def at(self, moment: datetime) -> List[TaskEntry]:
+        """Return the entries running at the given moment, sorted by start."""
+        return self.between(moment, moment)
+
+    def between(self, start: datetime, end: datetime) -> List[TaskEntry]:
+        """Return the entries overlapping [start, end], sorted by start.
+
+        A zero-length query (start == end) is a point-in-time lookup.
+        """
+        matches: List[TaskEntry] = []
+        self._collect(0, len(self._entries), start, end, matches)
+        return matches
+
+    def _build(self, lo: int, hi: int) -> None:
+        if lo >= hi:
+            return
+        mid = (lo + hi) // 2
+        self._build(lo, mid)
+        self._build(mid + 1, hi)
+        if lo < mid:
+            self._max_end[mid] = max(self._max_end[mid], self._max_end[(lo + mid) // 2])
+        if mid + 1 < hi:
+            self._max_end[mid] = max(
+                self._max_end[mid], self._max_end[(mid + 1 + hi) // 2]
+            )
+
+    def _collect(
+        self,
+        lo: int,
+        hi: int,
+        start: datetime,
+        end: datetime,
+        matches: List[TaskEntry],
+    ) -> None:
+        if lo >= hi:
+            return
+        mid = (lo + hi) // 2
+        if self._max_end[mid] < start:
+            # Every entry of this subtree ends before the query
+            return
+        self._collect(lo, mid, start, end, matches)
+        if self._starts[mid] > end:
+            # This entry and the right subtree start after the query
+            return
+        if self._overlaps(mid, start, end):
+            matches.append(self._entries[mid])
+        self._collect(mid + 1, hi, start, end, matches)
+
+    def _overlaps(self, i: int, start: datetime, end: datetime) -> bool:
+        entry_start = self._starts[i]
+        entry_end = self._ends[i]
+        if entry_start == entry_end:
+            return start <= entry_start <= end
+        if start == end:
+            return entry_start <= start < entry_end
+        return entry_start < end and entry_end > start
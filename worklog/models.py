@@ -18,6 +18,18 @@ class TaskEntry:
     tags: List[str]
     section_name: str = "WORKLOG"
     comments: List[str] = field(default_factory=list)
+    project: str = ""
+
+    def label(self) -> str:
+        """Return 'project / task', falling back to the section name."""
+        return " / ".join(n for n in (self.project, self.task_name) if n) or (
+            self.section_name
+        )
+
+    def format_span(self) -> str:
+        """Format as: HH:MM - HH:MM label ('noend' when there is no end time)"""
+        end_str = self.end.strftime("%H:%M") if self.end else "noend"
+        return f"{self.start.strftime('%H:%M')} - {end_str} {self.label()}".rstrip()
 
 
 @dataclass(frozen=True)
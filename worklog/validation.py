@@ -0,0 +1,97 @@
+"""Validation of time entries: overlaps, gaps and empty intervals."""
+
+from __future__ import annotations
+
+import heapq
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+
+from worklog.helpers import DurationFormatter
+from worklog.models import TaskEntry
+
+
+@dataclass(frozen=True)
+class TimeIssue:
+    """Represents a problem found between time entries."""
+
+    OVERLAP = "overlap"
+    GAP = "gap"
+    ZERO_LENGTH = "zero-length"
+    NEGATIVE = "negative"
+    OPEN = "open"
+
+    kind: str
+    entry: TaskEntry
+    other: Optional[TaskEntry] = None
+
+    def format_line(self) -> str:
+        """Format as: YYYY-MM-DD kind: HH:MM - HH:MM label [<-> HH:MM - HH:MM label]"""
+        line = f"{self.entry.date.isoformat()} {self.kind}: "
+        if self.kind == TimeIssue.GAP and self.other is not None:
+            # A gap spans from the end of the covered time to the next start
+            assert self.other.end is not None
+            gap_start = DurationFormatter.format_time_str(self.other.end)
+            gap_end = DurationFormatter.format_time_str(self.entry.start)
+            return (
+                f"{line}{gap_start} - {gap_end} between "
+                f"{self.other.format_span()} and {self.entry.format_span()}"
+            )
+        if self.other is not None:
+            return f"{line}{self.other.format_span()} <-> {self.entry.format_span()}"
+        return f"{line}{self.entry.format_span()}"
+
+
+class TimeEntryValidator:
+    """Finds overlapping, gapped and empty time entries with a sort-and-sweep pass.
+
+    Entries are sorted once by start time. The sweep keeps a min-heap of the
+    intervals still open at the current start, so every overlapping pair is
+    reported in O(n log n + k) for k overlaps. The overlaps of an entry are
+    reported in the order of that heap, which only depends on the entries.
+    """
+
+    @staticmethod
+    def validate(entries: Iterable[TaskEntry]) -> List[TimeIssue]:
+        """Return the issues found in the entries, ordered by start time."""
+        issues: List[TimeIssue] = []
+        active: List[Tuple[datetime, int, TaskEntry]] = []
+        last_covering: Optional[TaskEntry] = None
+
+        ordered = sorted(entries, key=lambda e: (e.start, e.end or e.start))
+        for seq, entry in enumerate(ordered):
+            if entry.end is None:
+                issues.append(TimeIssue(TimeIssue.OPEN, entry))
+                continue
+            if entry.end == entry.start:
+                issues.append(TimeIssue(TimeIssue.ZERO_LENGTH, entry))
+                continue
+            if entry.end < entry.start:
+                issues.append(TimeIssue(TimeIssue.NEGATIVE, entry))
+                continue
+
+            while active and active[0][0] <= entry.start:
+                heapq.heappop(active)
+
+            for _, _, other in active:
+                issues.append(TimeIssue(TimeIssue.OVERLAP, entry, other))
+
+            if (
+                not active
+                and last_covering is not None
+                and last_covering.date == entry.date
+                and last_covering.end is not None
+                and last_covering.end < entry.start
+            ):
+                issues.append(TimeIssue(TimeIssue.GAP, entry, last_covering))
+
+            heapq.heappush(active, (entry.end, seq, entry))
+            if (
+                last_covering is None
+                or last_covering.date != entry.date
+                or last_covering.end is None
+                or entry.end > last_covering.end
+            ):
+                last_covering = entry
+
+        return issues
@@ -0,0 +1,26 @@
+from mindmap_exporter import MindmapExporter
+import xml.etree.ElementTree as xml
+from worklog.entries import TimeEntryCollector
+from worklog.validation import TimeEntryValidator
+
+
+class Formatter(MindmapExporter):
+    """
+    Reports problems in the time entries of WORKLOG and TIMES sections:
+    overlapping (double-booked) entries, gaps inside a day, zero-length
+    and negative entries, and entries left without an end time.
+
+    Missing end times are auto-filled first, using the same rule as
+    `orgmode.Formatter`, so only the entries it would print open are reported.
+    """
+
+    def parse(self, tree: xml.Element) -> None:
+        entries = TimeEntryCollector.fill_missing_end_times(
+            TimeEntryCollector.collect(tree)
+        )
+        self.result = TimeEntryValidator.validate(entries)
+
+    def format(self) -> list[str]:
+        if not self.result:
+            return ["No time entry issues found"]
+        return [issue.format_line() for issue in self.result]
@@ -0,0 +1,169 @@
+"""
+Merge the orgmode worklogs of several maps, one per person, into one.
+
+Each map is parsed and formatted by `orgmode.Formatter`, one date at a time,
+into a spool file holding its date blocks in date order. The spools are then
+merged like sorted runs, with a heap holding the next date block of each
+map, so the merge keeps one block per map in memory however many dates the
+maps have. Maps can be spooled in parallel, in a process pool.
+
+The result is a single `* PROJ Worklog` tree: every date has one heading,
+under which each person's day is a sub-heading holding what
+`orgmode.Formatter` prints for that date, one level deeper.
+"""
+
+from __future__ import annotations
+
+import heapq
+import json
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import date
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import orgmode
+from mindmap.reader import MapReader
+
+
+@dataclass(frozen=True)
+class MergeInput:
+    """A map to merge and the person it belongs to."""
+
+    person: str
+    path: str
+
+    @staticmethod
+    def parse(spec: str) -> MergeInput:
+        """Read `NAME=PATH`, or a bare PATH named after its file."""
+        name, separator, path = spec.partition("=")
+        if separator and name and path:
+            return MergeInput(name, path)
+        return MergeInput(os.path.splitext(os.path.basename(spec))[0], spec)
+
+
+@dataclass(frozen=True)
+class DateBlock:
+    """What one person logged on one date, as orgmode lines."""
+
+    date: date
+    # Position of the person in the inputs, to keep their order within a date
+    index: int
+    lines: List[str]
+
+
+def iter_date_blocks(
+    path: str, date_from: Optional[date] = None, date_to: Optional[date] = None
+) -> Iterator[Tuple[date, List[str]]]:
+    """Yield the orgmode lines of each date of a map, in date order."""
+    with open(path, "rb") as file:
+        root = MapReader.from_bytes(file.read())
+    formatter = orgmode.Formatter()
+    formatter.parse(root)
+    for day, lines in formatter.iter_date_blocks():
+        if date_from is not None and day < date_from:
+            continue
+        if date_to is not None and day > date_to:
+            break
+        yield day, lines
+
+
+def spool_date_blocks(
+    path: str,
+    spool_path: str,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+) -> int:
+    """Write the date blocks of a map to a spool file, one JSON line each.
+
+    :return: the number of date blocks written
+    """
+    count = 0
+    with open(spool_path, "w") as spool:
+        for day, lines in iter_date_blocks(path, date_from, date_to):
+            spool.write(json.dumps([day.isoformat(), lines]) + "\n")
+            count += 1
+    return count
+
+
+def read_spool(spool_path: str, index: int) -> Iterator[DateBlock]:
+    """Yield the date blocks of a spool file, reading one line at a time."""
+    with open(spool_path) as spool:
+        for line in spool:
+            day, lines = json.loads(line)
+            yield DateBlock(date.fromisoformat(day), index, lines)
+
+
+class WorklogMerger:
+    """
+    Merges the worklogs of `inputs` into one orgmode tree.
+
+    :param jobs: processes spooling the maps; 1 spools them one after the
+        other in this process, keeping a single parsed map in memory
+    """
+
+    def __init__(
+        self,
+        inputs: Sequence[MergeInput],
+        jobs: int = 1,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+    ) -> None:
+        self.inputs = list(inputs)
+        self.jobs = jobs
+        self.date_from = date_from
+        self.date_to = date_to
+
+    def iter_lines(self) -> Iterator[str]:
+        """Yield the lines of the merged worklog."""
+        with tempfile.TemporaryDirectory(prefix="worklog-merge-") as spool_dir:
+            spool_paths = [
+                os.path.join(spool_dir, f"{index}.jsonl")
+                for index in range(len(self.inputs))
+            ]
+            self._spool(spool_paths)
+            streams = [
+                read_spool(spool_path, index)
+                for index, spool_path in enumerate(spool_paths)
+            ]
+            yield from self._format(
+                heapq.merge(*streams, key=lambda block: (block.date, block.index))
+            )
+
+    def _spool(self, spool_paths: List[str]) -> None:
+        arguments = [
+            (merge_input.path, spool_path, self.date_from, self.date_to)
+            for merge_input, spool_path in zip(self.inputs, spool_paths)
+        ]
+        if self.jobs <= 1 or len(self.inputs) <= 1:
+            for argument in arguments:
+                spool_date_blocks(*argument)
+            return
+        with ProcessPoolExecutor(max_workers=min(self.jobs, len(self.inputs))) as pool:
+            # Reading the results raises the error of a map that failed
+            for _ in pool.map(spool_date_blocks, *zip(*arguments)):
+                pass
+
+    def _format(self, blocks: Iterator[DateBlock]) -> Iterator[str]:
+        yield "* PROJ Worklog"
+        current: Optional[date] = None
+        # Whether a person was already printed under the current date
+        has_person = False
+        for block in blocks:
+            if block.date != current:
+                if current is not None:
+                    yield ""
+                current = block.date
+                has_person = False
+                yield f"** PROJ [{block.date.strftime('%Y-%m-%d %a')}]"
+            if not block.lines:
+                continue
+            if has_person:
+                yield ""
+            has_person = True
+            yield f"*** PROJ {self.inputs[block.index].person}"
+            for line in block.lines:
+                yield "*" + line if line.startswith("*") else line
+        yield ""
+        yield ""